@@ -1,19 +1,124 @@
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, request, jsonify, render_template_string
 import os
 import json
 import csv
-import io
+import queue
 import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Response
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
 
+from ocr import OCRPool
+from cache import ExtractionCache, file_sha256
+from jobs import JobManager
+from batch import ArchiveLimitError, is_archive, expand_archive, remove_dir
+from pdf_extraction import iter_pdf_pages
+from xml_extraction import iter_xml_events, parse_element_filters
+from csv_extraction import iter_csv_events
+from compression import accepted_encoding, compress, compressible
+from sniffing import sniff_source
+from uploads import SpoolingRequest, default_spool_dir, upload_hash, upload_source
+from extractors import (
+    ExtractionContext, ExtractionResult, ExtractorScheduler, registry as extractor_registry, csv_limits, extraction_options,
+    option_enabled, resolve_pdf_backend, validate_options
+)
+
 # Create Flask app
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.request_class = SpoolingRequest
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 1024 * 1024 * 1024))  # Default upload limit (1GB)
+app.config['UPLOAD_LIMITS'] = {  # Per-endpoint upload limits, override MAX_CONTENT_LENGTH
+    'extract_document': int(os.environ.get('UPLOAD_LIMIT_EXTRACT', app.config['MAX_CONTENT_LENGTH'])),
+    'extract_docx_only': int(os.environ.get('UPLOAD_LIMIT_DOCX', 100 * 1024 * 1024)),
+    'create_job': int(os.environ.get('UPLOAD_LIMIT_JOBS', app.config['MAX_CONTENT_LENGTH'])),
+    'extract_batch': int(os.environ.get('UPLOAD_LIMIT_BATCH', 4 * 1024 * 1024 * 1024))
+}
+app.config['UPLOAD_FOLDER'] = 'uploads'  # Uploads that outlive the request (jobs, streams, batches)
+app.config['UPLOAD_MEMORY_LIMIT'] = int(os.environ.get('UPLOAD_MEMORY_LIMIT', 8 * 1024 * 1024))  # Smaller requests are parsed from memory
+app.config['UPLOAD_SPOOL_DIR'] = os.environ.get('UPLOAD_SPOOL_DIR') or default_spool_dir()  # Larger uploads spill here, tmpfs if available
+app.config['OCR_POOL_SIZE'] = int(os.environ.get('OCR_POOL_SIZE', os.cpu_count() or 2))  # 0 disables the pool
+app.config['OCR_EARLY_EXIT_CONFIDENCE'] = float(os.environ.get('OCR_EARLY_EXIT_CONFIDENCE', 90))  # >100 runs every pass
+app.config['CACHE_MAX_BYTES'] = int(os.environ.get('CACHE_MAX_BYTES', 128 * 1024 * 1024))  # In-process LRU tier
+app.config['CACHE_TTL'] = int(os.environ.get('CACHE_TTL', 24 * 60 * 60))  # Redis tier expiry in seconds
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL')  # e.g. redis://redis:6379/0, unset disables the Redis tier
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))  # Background workers for /jobs
+app.config['JOB_RETENTION_SECONDS'] = int(os.environ.get('JOB_RETENTION_SECONDS', 60 * 60))  # Keep finished job results this long
+app.config['PDF_BACKEND'] = os.environ.get('PDF_BACKEND', 'pypdf2')  # pypdf2, pdfium or pdfminer
+app.config['PDF_OCR_MAX_PAGES'] = int(os.environ.get('PDF_OCR_MAX_PAGES', 3))  # Default OCR page budget for scanned PDFs
+app.config['PDF_OCR_PAGE_LIMIT'] = int(os.environ.get('PDF_OCR_PAGE_LIMIT', 100))  # Upper bound for ocr_max_pages requests
+app.config['PDF_OCR_DPI'] = int(os.environ.get('PDF_OCR_DPI', 200))
+app.config['SPREADSHEET_MAX_ROWS'] = int(os.environ.get('SPREADSHEET_MAX_ROWS', 10000))  # Default rows read per XLSX/ODS sheet
+app.config['SPREADSHEET_ROW_LIMIT'] = int(os.environ.get('SPREADSHEET_ROW_LIMIT', 1000000))  # Upper bound for max_rows requests
+app.config['SPREADSHEET_MAX_CELLS'] = int(os.environ.get('SPREADSHEET_MAX_CELLS', 500000))  # Default cells read per workbook
+app.config['SPREADSHEET_CELL_LIMIT'] = int(os.environ.get('SPREADSHEET_CELL_LIMIT', 5000000))  # Upper bound for max_cells requests
+app.config['CSV_MAX_ROWS'] = int(os.environ.get('CSV_MAX_ROWS', 100000))  # Default rows in a CSV JSON response; streamed CSV has no default limit
+app.config['CSV_ROW_LIMIT'] = int(os.environ.get('CSV_ROW_LIMIT', 10000000))  # Upper bound for max_rows requests on CSV JSON responses
+app.config['JSON_MAX_CHARS'] = int(os.environ.get('JSON_MAX_CHARS', 10000000))  # Default output size for JSON files
+app.config['JSON_CHAR_LIMIT'] = int(os.environ.get('JSON_CHAR_LIMIT', 100000000))  # Upper bound for max_chars requests
+app.config['COMPRESSION_MIN_BYTES'] = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))  # Smaller responses are sent uncompressed
+app.config['SLIDE_WORKERS'] = int(os.environ.get('SLIDE_WORKERS', os.cpu_count() or 2))  # Processes parsing PPTX slides, <= 1 parses in the request thread
+app.config['SLIDE_OCR_IMAGES'] = os.environ.get('SLIDE_OCR_IMAGES', '0') == '1'  # OCR slide images unless the request sets ocr_images
+app.config['SLIDE_OCR_MAX_IMAGES'] = int(os.environ.get('SLIDE_OCR_MAX_IMAGES', 20))  # Per presentation
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 2))  # Concurrent files per /extract/batch
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', 5000))
+app.config['BATCH_MAX_ARCHIVE_BYTES'] = int(os.environ.get('BATCH_MAX_ARCHIVE_BYTES', 2 * 1024 * 1024 * 1024))  # Uncompressed
+app.config['LIGHT_EXTRACT_WORKERS'] = int(os.environ.get('LIGHT_EXTRACT_WORKERS', os.cpu_count() or 2))  # Text-like formats
+app.config['HEAVY_EXTRACT_WORKERS'] = int(os.environ.get('HEAVY_EXTRACT_WORKERS', 2))  # PDF/image extractions that render or OCR
+app.config['PRELOAD_EXTRACTORS'] = os.environ.get('PRELOAD_EXTRACTORS', '1') == '1'  # Import extractor dependencies at startup
+app.config['KREUZBERG_FORMATS'] = set(os.environ.get('KREUZBERG_FORMATS', 'doc,xls,ppt,odt,epub').split(','))  # Served by DocumentProcessor under asgi.py
+app.config['ASGI_WSGI_WORKERS'] = int(os.environ.get('ASGI_WSGI_WORKERS', 10))  # Threads for the Flask routes mounted in asgi.py
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Long-lived Tesseract workers shared by all OCR paths (started on first use)
+ocr_pool = OCRPool(app.config['OCR_POOL_SIZE'])
+
+# Extraction results keyed by upload content + parameters
+result_cache = ExtractionCache(
+    max_bytes=app.config['CACHE_MAX_BYTES'],
+    redis_url=app.config['REDIS_URL'],
+    ttl=app.config['CACHE_TTL']
+)
+
+
+def cache_key_for(ctx, endpoint, content_hash=None, **params):
+    """Cache key for an upload: file content hash plus everything that shapes the extraction
+
+    That is the detected format and the extraction options, not the filename
+    or output options (format, csv_split, stream, mode): those are applied to
+    the cached extraction per request. Pass content_hash when it is already
+    known (computed while the upload was received) to skip re-reading the file.
+    """
+    return ExtractionCache.make_key(content_hash or file_sha256(ctx.source), {
+        "endpoint": endpoint,
+        "file_format": ctx.file_format,
+        **extraction_options(ctx.options),
+        **params
+    })
+
+# Background extraction jobs for /jobs
+job_manager = JobManager(
+    workers=app.config['JOB_WORKERS'],
+    retention_seconds=app.config['JOB_RETENTION_SECONDS']
+)
+
+# Shared by all /extract/batch requests so concurrent batches can't oversubscribe the host
+batch_executor = ThreadPoolExecutor(max_workers=app.config['BATCH_WORKERS'], thread_name_prefix='extract-batch')
+
+# Per-format extractors, light and heavy formats on separate pools
+extractor_scheduler = ExtractorScheduler(
+    extractor_registry,
+    light_workers=app.config['LIGHT_EXTRACT_WORKERS'],
+    heavy_workers=app.config['HEAVY_EXTRACT_WORKERS']
+)
+missing_extractor_dependencies = extractor_registry.preload() if app.config['PRELOAD_EXTRACTORS'] else {}
+for name, missing in missing_extractor_dependencies.items():
+    if missing:
+        print(f"Extractor {name} is missing dependencies: {', '.join(missing)}")
+
 # Define allowed extensions
 ALLOWED_EXTENSIONS = {
     'pdf', 'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'tif',
@@ -22,6 +127,36 @@ ALLOWED_EXTENSIONS = {
     'odt', 'ods', 'odp', 'epub', 'md', 'json'
 }
 
+@app.before_request
+def apply_upload_limit():
+    """Per-endpoint upload limit, enforced while the body is read"""
+    limit = app.config['UPLOAD_LIMITS'].get(request.endpoint)
+    if limit is not None:
+        request.max_content_length = limit
+
+@app.after_request
+def compress_response(response):
+    """gzip or brotli, as Accept-Encoding allows, for buffered text responses
+
+    Streamed responses (NDJSON/SSE events, CSV downloads) go out as they are.
+    """
+    if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers
+            or not compressible(response.mimetype, response.content_length or 0, app.config['COMPRESSION_MIN_BYTES'])):
+        return response
+    response.vary.add('Accept-Encoding')
+    coding = accepted_encoding(request.headers.get('Accept-Encoding'))
+    if coding is not None:
+        response.set_data(compress(response.get_data(), coding))
+        response.headers['Content-Encoding'] = coding
+    return response
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    return jsonify({
+        "error": "Upload too large",
+        "max_bytes": request.max_content_length
+    }), 413
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -293,7 +428,7 @@ HTML_TEMPLATE = '''
                     </p>
                     
                     <div class="file-input-wrapper">
-                        <input type="file" id="file" name="file" class="file-input" accept=".pdf,.txt,.docx,.doc,.xlsx,.xls,.pptx,.ppt,.jpg,.jpeg,.png,.gif,.bmp,.tiff,.html,.xml,.odt,.epub,.rtf,.csv,.md,.json" required>
+                        <input type="file" id="file" name="file" class="file-input" accept=".pdf,.txt,.docx,.doc,.xlsx,.xls,.ods,.pptx,.ppt,.odp,.jpg,.jpeg,.png,.gif,.bmp,.tiff,.html,.xml,.odt,.epub,.rtf,.csv,.md,.json" required>
                         <button type="button" class="file-input-button" onclick="document.getElementById('file').click()">
                             📎 Select File
                         </button>
@@ -329,9 +464,9 @@ HTML_TEMPLATE = '''
                     <div class="format-tag">DOCX ✅</div>
                     <div class="format-tag">DOC ⚠️</div>
                     <div class="format-tag">DOC</div>
-                    <div class="format-tag">XLSX</div>
+                    <div class="format-tag">XLSX ✅</div>
                     <div class="format-tag">XLS</div>
-                    <div class="format-tag">PPTX</div>
+                    <div class="format-tag">PPTX ✅</div>
                     <div class="format-tag">PPT</div>
                     <div class="format-tag">TXT</div>
                     <div class="format-tag">RTF</div>
@@ -339,6 +474,8 @@ HTML_TEMPLATE = '''
                     <div class="format-tag">HTML</div>
                     <div class="format-tag">XML</div>
                     <div class="format-tag">ODT</div>
+                    <div class="format-tag">ODS ✅</div>
+                    <div class="format-tag">ODP ✅</div>
                     <div class="format-tag">EPUB</div>
                     <div class="format-tag">JPG</div>
                     <div class="format-tag">PNG</div>
@@ -507,6 +644,19 @@ def available_languages():
             "note": "Tesseract may not be properly installed"
         })
 
+def build_docx_result(filename, extraction, full_text):
+    """Detailed DOCX analysis returned by /extract/docx"""
+    return {
+        "filename": filename,
+        "file_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "extraction_method": extraction.method,
+        **extraction.details,
+        "full_text": full_text,
+        "word_count": len(full_text.split()) if full_text else 0,
+        "character_count": len(full_text),
+        "status": "success" if full_text else "no_content"
+    }
+
 @app.route('/extract/docx', methods=['POST'])
 def extract_docx_only():
     """Dedicated endpoint for DOCX extraction"""
@@ -526,66 +676,28 @@ def extract_docx_only():
                 "note": "Use /extract for other file types or convert DOC to DOCX"
             }), 400
         
-        # Save and process
+        # Process straight from the upload buffer (or its spooled temp file)
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        source = upload_source(file)
+        options = {'mode': 'raw'} if request.form.get('mode', '').lower() == 'raw' else {}
         
         try:
-            from docx import Document
-            
-            doc = Document(filepath)
-            
-            # Detailed DOCX analysis
-            result = {
-                "filename": filename,
-                "file_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "extraction_method": "python-docx (dedicated DOCX processor)",
-                "document_stats": {
-                    "total_paragraphs": len(doc.paragraphs),
-                    "total_tables": len(doc.tables),
-                    "total_sections": len(doc.sections)
-                }
-            }
-            
-            # Extract all content
-            all_text_parts = []
-            
-            # Paragraphs
-            paragraph_texts = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    paragraph_texts.append(para.text.strip())
-            
-            if paragraph_texts:
-                all_text_parts.append("=== PARAGRAPHS ===")
-                all_text_parts.extend(paragraph_texts)
-            
-            # Tables
-            if doc.tables:
-                all_text_parts.append("\n=== TABLES ===")
-                for i, table in enumerate(doc.tables, 1):
-                    all_text_parts.append(f"\n--- Table {i} ---")
-                    for row in table.rows:
-                        row_data = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-                        if row_data:
-                            all_text_parts.append(" | ".join(row_data))
-            
-            full_text = "\n".join(all_text_parts)
-            
-            result.update({
-                "full_text": full_text,
-                "word_count": len(full_text.split()) if full_text else 0,
-                "character_count": len(full_text),
-                "status": "success" if full_text else "no_content"
-            })
+            ctx = ExtractionContext(source, filename, options, ocr_pool=ocr_pool, config=app.config)
+            extraction, full_text, cache_hit = extract_cached(
+                ctx, 'extract/docx', upload_hash(file), extractor_registry.get_by_name('docx_summary')
+            )
+            if 'error' in extraction.extras:
+                return jsonify({"error": f"DOCX processing failed: {extraction.extras['error']}"}), 500
             
+            result = build_docx_result(filename, extraction, full_text)
+            result['cache_hit'] = cache_hit
             return jsonify(result)
             
         finally:
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            file.close()
                 
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({"error": f"DOCX processing failed: {str(e)}"}), 500
     """Show all available OCR languages"""
@@ -616,11 +728,268 @@ def health_check():
         "status": "healthy", 
         "message": "Document extraction API is running",
         "ocr_languages_available": lang_count,
+        "ocr_pool": ocr_pool.status(),
+        "cache": result_cache.stats(),
+        "jobs": job_manager.stats(),
         "endpoints": {
-            "/languages": "GET - View all available OCR languages"
+            "/extractors": "GET - Registered extractors, their cost class and timings",
+            "/languages": "GET - View all available OCR languages",
+            "/cache/stats": "GET - Extraction cache hit/miss counters",
+            "/jobs": "POST - Queue an extraction, poll /jobs/<id> for progress and result",
+            "/extract/batch": "POST - Many files or one ZIP/TAR archive, results streamed as NDJSON"
         }
     })
 
+@app.route('/cache/stats')
+def cache_stats():
+    """Hit/miss counters for the extraction result cache"""
+    return jsonify(result_cache.stats())
+
+@app.route('/extractors')
+def list_extractors():
+    """Registered extractors with their cost class, dependencies and timings"""
+    timings = extractor_scheduler.timings()
+    extractors = []
+    for extractor in extractor_registry.describe():
+        missing = missing_extractor_dependencies.get(extractor['name'])
+        if missing is None:
+            missing = extractor_registry.get_by_name(extractor['name']).missing_dependencies()
+        extractors.append({
+            **extractor,
+            "available": not missing,
+            "missing_dependencies": missing,
+            "timings": timings.get(extractor['name'])
+        })
+    return jsonify({"extractors": extractors})
+
+def extract_cached(ctx, endpoint='extract', content_hash=None, extractor=None):
+    """(extraction, full_text, cache_hit) for ctx, the extraction served from the cache when possible
+
+    The extractor is picked from the registry by detected format (unless
+    given) and runs on the scheduler's pool for its cost class. Only the
+    extraction is cached; full_text is rendered for this request's filename
+    and mode.
+    """
+    cache_key = cache_key_for(ctx, endpoint, content_hash)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        extraction = ExtractionResult.from_dict(cached)
+        return extraction, extractor_scheduler.render(extraction, ctx), True
+    
+    extraction, full_text = extractor_scheduler.run(ctx, extractor)
+    # Don't cache failed or partial results (e.g. an OCR outage), they may be transient
+    if not extraction.degraded:
+        result_cache.set(cache_key, extraction.as_dict())
+    return extraction, full_text, False
+
+def content_type_info(ctx):
+    """What the upload's bytes say it is, and whether that agrees with its extension"""
+    return {
+        "format": ctx.file_format,
+        "mime": ctx.mime_type,
+        "detected_by": ctx.detected_by,
+        "matches_extension": ctx.extension_matches
+    }
+
+def build_result(ctx, extraction, extracted_text):
+    """JSON result for an extractor's output"""
+    result = {
+        "filename": ctx.filename,
+        "file_extension": ctx.file_extension,
+        "file_size_bytes": ctx.file_size,
+        "extraction_method": extraction.method,
+        "full_text": extracted_text,
+        "word_count": len(extracted_text.split()) if extracted_text else 0,
+        "character_count": len(extracted_text) if extracted_text else 0,
+        "total_pages": 1,
+        "status": "success",
+        "note": "This is a test version. Full Kreuzberg processing available in production version.",
+        "content_type": content_type_info(ctx)
+    }
+    result.update(extraction.details)
+    if extraction.degraded:
+        result["degraded"] = extraction.degraded
+    if ctx.raw:
+        # Text and structured fields only; failures are reported as such rather than as text
+        del result["note"]
+        if 'error' in extraction.extras:
+            result["status"] = "error"
+            result["error"] = extraction.extras['error']
+    
+    return result
+
+def save_upload_unique(file):
+    """Save an upload under a unique name for files that outlive the request"""
+    filename = secure_filename(file.filename)
+    fd, filepath = tempfile.mkstemp(dir=app.config['UPLOAD_FOLDER'], suffix=f"_{filename}")
+    with os.fdopen(fd, 'wb') as f:
+        file.save(f)
+    return filepath, filename
+
+STREAM_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'  # Don't let nginx buffer the stream
+}
+
+def encode_events(events, stream_format, cleanup=None):
+    """Encode extraction events as NDJSON lines or Server-Sent Events, then run cleanup"""
+    try:
+        for event in events:
+            if stream_format == 'sse':
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+def stream_mimetype(stream_format):
+    return 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+
+def stream_response(events, stream_format, cleanup=None):
+    """Send extraction events as NDJSON lines or Server-Sent Events as they are produced"""
+    return Response(encode_events(events, stream_format, cleanup),
+                    mimetype=stream_mimetype(stream_format), headers=STREAM_HEADERS)
+
+def extract_upload(source, filename, options, progress=None, content_hash=None):
+    """(extraction, JSON result with cache_hit) for an upload (file path or in-memory buffer)
+
+    progress, if given, is called as progress(done, total) as pages or OCR
+    passes complete.
+    """
+    ctx = ExtractionContext(source, filename, options, progress, ocr_pool=ocr_pool, config=app.config)
+    extraction, full_text, cache_hit = extract_cached(ctx, content_hash=content_hash)
+    result = build_result(ctx, extraction, full_text)
+    result['cache_hit'] = cache_hit
+    return extraction, result
+
+def extract_with_cache(source, filename, options, progress=None, content_hash=None):
+    """extract_upload's JSON result"""
+    return extract_upload(source, filename, options, progress, content_hash)[1]
+
+def extract_job(filepath, filename, options, progress=None, content_hash=None):
+    """Body of a /jobs job: the JSON result, and the extraction behind it for CSV downloads"""
+    extraction, result = extract_upload(filepath, filename, options, progress, content_hash)
+    return {"result": result, "extraction": extraction}
+
+def job_report(job):
+    """A job snapshot as /jobs shows it: the result without the extraction kept for CSV"""
+    return {**job, "result": job['result'] and job['result']['result']}
+
+# csv_split values: the whole text in one row, or one row per page or paragraph
+CSV_SPLITS = ('document', 'page', 'paragraph')
+CSV_HEADER = ['Filename', 'Extension', 'Text', 'Word_Count', 'Char_Count', 'Method']
+CSV_PART_HEADER = ['Filename', 'Extension', 'Part', 'Text', 'Word_Count', 'Char_Count', 'Method']
+
+class CsvLine:
+    """Write target for csv.writer that hands each formatted row back instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+def text_lines(text):
+    """Non-blank lines of text, without splitting it into a list first"""
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start)
+        if end == -1:
+            end = len(text)
+        if text[start:end].strip():
+            yield text[start:end].strip()
+        start = end + 1
+
+def csv_rows(result, extraction, split='document'):
+    """An extraction result as CSV lines, one at a time
+
+    document: header plus one row holding the whole text (line breaks kept,
+    quoted). page/paragraph: a Part column and one row per page or per
+    non-blank line of the extraction itself, so no banner text gets in. PDF
+    pages read by OCR or without any text get their row too, with how each
+    one was handled as its Method.
+    """
+    writer = csv.writer(CsvLine())
+    if split == 'document':
+        yield writer.writerow(CSV_HEADER)
+        yield writer.writerow([result['filename'], result['file_extension'], result['full_text'],
+                               result['word_count'], result['character_count'], result['extraction_method']])
+        return
+    
+    if split == 'page':
+        parts = extraction.page_texts()
+    else:
+        lines = (line for _, page_text, _ in extraction.page_texts() for line in text_lines(page_text))
+        parts = ((number, line, extraction.method) for number, line in enumerate(lines, 1))
+    yield from part_rows(result['filename'], parts)
+
+def part_rows(filename, parts):
+    """CSV header and one line per (number, text, method) part, each written as it arrives"""
+    writer = csv.writer(CsvLine())
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'unknown'
+    yield writer.writerow(CSV_PART_HEADER)
+    for number, part_text, method in parts:
+        yield writer.writerow([filename, extension, number, part_text, len(part_text.split()), len(part_text), method])
+
+def iter_settled_pages(source, filename, options, content_hash=None):
+    """(page number, text, method) per page of an upload, each as soon as it is settled
+
+    A cached extraction gives all its pages at once. Otherwise the extraction
+    runs on the scheduler and pages are passed on in order as the extractor
+    settles them (PDF text layer pages while the rest still wait for OCR),
+    then the finished extraction is cached. Formats that aren't paged come
+    out as one page when done.
+    """
+    settled = queue.Queue()
+    ctx = ExtractionContext(source, filename, options, ocr_pool=ocr_pool, config=app.config,
+                            on_page=lambda *page: settled.put(page))
+    cache_key = cache_key_for(ctx, 'extract', content_hash)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        yield from ExtractionResult.from_dict(cached).page_texts()
+        return
+    
+    future = extractor_scheduler.submit(ctx)
+    future.add_done_callback(lambda _: settled.put(None))
+    try:
+        waiting, next_page = {}, 1
+        for page in iter(settled.get, None):
+            waiting[page[0]] = page
+            while next_page in waiting:
+                yield waiting.pop(next_page)
+                next_page += 1
+        
+        extraction, _ = future.result()
+        if not extraction.degraded:
+            result_cache.set(cache_key, extraction.as_dict())
+        if next_page == 1 and not waiting:
+            # Nothing was reported page by page: not a paged format, or the extraction failed
+            yield from extraction.page_texts()
+        elif 'error' in extraction.extras:
+            # Failed after some pages went out
+            yield '', extraction.extras['error'], extraction.method
+    finally:
+        # Don't let the caller remove the upload while the extractor still reads it
+        if not future.cancel():
+            future.result()
+
+def encode_csv(rows, cleanup=None):
+    """Encode CSV lines as they are produced, then run cleanup"""
+    try:
+        for row in rows:
+            yield row.encode()
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+def csv_download_name(filename):
+    return f"{os.path.splitext(filename)[0]}_extracted.csv"
+
+def csv_response(rows, filename, cleanup=None):
+    """Send CSV lines as a download, each one as soon as it is written"""
+    return Response(encode_csv(rows, cleanup), mimetype='text/csv', headers={
+        **STREAM_HEADERS,
+        'Content-Disposition': f'attachment; filename="{csv_download_name(filename)}"'
+    })
+
 @app.route('/extract', methods=['POST'])
 def extract_document():
     try:
@@ -640,689 +1009,243 @@ def extract_document():
         
         # Get output format
         output_format = request.form.get('format', 'json').lower()
+        csv_split = request.form.get('csv_split', 'document').lower()
+        if output_format == 'csv' and csv_split not in CSV_SPLITS:
+            return jsonify({"error": f"csv_split must be one of {list(CSV_SPLITS)}"}), 400
         
-        # Save the file temporarily
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        options = request.form.to_dict()
+        try:
+            validate_options(options)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Basic file info
-        file_size = os.path.getsize(filepath)
-        file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'unknown'
+        # Streaming mode: PDF pages, XML text chunks or CSV row batches as events instead of one response at the end
+        stream_format = request.form.get('stream', '').lower()
+        if stream_format:
+            if stream_format not in ('ndjson', 'sse'):
+                return jsonify({"error": "stream must be 'ndjson' or 'sse'"}), 400
+            
+            filepath, filename = save_upload_unique(file)
+            content_hash = upload_hash(file)
+            
+            def cleanup():
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+            
+            def whole_document():
+                # Other formats are not paged: send the whole result as one event
+                yield {"event": "result", **extract_with_cache(filepath, filename, options, content_hash=content_hash)}
+            
+            extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'unknown'
+            file_format = sniff_source(filepath, extension)[0]
+            if file_format == 'pdf':
+                backend, _ = resolve_pdf_backend(options, app.config)
+                events = iter_pdf_pages(filepath, filename, backend)
+            elif file_format == 'xml':
+                events = iter_xml_events(filepath, filename, parse_element_filters(options.get('xml_elements')))
+            elif file_format == 'csv':
+                max_rows, max_columns = csv_limits(options, app.config, stream=True)
+                events = iter_csv_events(filepath, filename, max_rows, max_columns, option_enabled(options, 'csv_rows'))
+            else:
+                events = whole_document()
+            return stream_response(events, stream_format, cleanup)
         
-        # Basic text extraction for common formats
-        extracted_text = ""
-        method = "Basic extraction"
+        # CSV by page: each row goes out as soon as its page is settled
+        if output_format == 'csv' and csv_split == 'page':
+            filepath, filename = save_upload_unique(file)
+            pages = iter_settled_pages(filepath, filename, options, upload_hash(file))
+            
+            def cleanup():
+                # Waits for an unfinished extraction before the file goes
+                pages.close()
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+            
+            return csv_response(part_rows(filename, pages), filename, cleanup)
         
+        # Extract from memory, or from the upload's own spooled temp file when it is large
+        filename = secure_filename(file.filename)
         try:
-            if file_extension == 'txt':
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    extracted_text = f.read()
-                method = "Direct text reading"
-                
-            elif file_extension == 'html':
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    html_content = f.read()
-                    # Basic HTML tag removal
-                    import re
-                    # Remove script and style elements
-                    html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-                    html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-                    # Remove HTML tags
-                    extracted_text = re.sub(r'<[^>]+>', '', html_content)
-                    # Clean up whitespace
-                    extracted_text = re.sub(r'\s+', ' ', extracted_text).strip()
-                method = "HTML text extraction"
-                
-            elif file_extension == 'csv':
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    import csv as csv_module
-                    csv_reader = csv_module.reader(f)
-                    rows = []
-                    for row in csv_reader:
-                        rows.append(' | '.join(row))
-                    extracted_text = '\n'.join(rows)
-                method = "CSV text extraction"
-                
-            elif file_extension == 'json':
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    json_content = f.read()
-                    try:
-                        # Try to parse and format JSON
-                        import json
-                        parsed_json = json.loads(json_content)
-                        extracted_text = json.dumps(parsed_json, indent=2)
-                    except:
-                        # If parsing fails, just return raw content
-                        extracted_text = json_content
-                method = "JSON text extraction"
-                
-            elif file_extension in ['md', 'markdown']:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    extracted_text = f.read()
-                method = "Markdown text reading"
-                
-            elif file_extension == 'rtf':
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    rtf_content = f.read()
-                    # Basic RTF tag removal (very simple)
-                    import re
-                    extracted_text = re.sub(r'\\[a-zA-Z]+\d*', '', rtf_content)
-                    extracted_text = re.sub(r'[{}]', '', extracted_text)
-                    extracted_text = extracted_text.replace('\\', '').strip()
-                method = "Basic RTF text extraction"
-                
-            elif file_extension == 'xml':
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    xml_content = f.read()
-                    # Basic XML tag removal
-                    import re
-                    extracted_text = re.sub(r'<[^>]+>', '', xml_content)
-                    extracted_text = re.sub(r'\s+', ' ', extracted_text).strip()
-                method = "XML text extraction"
-                
-            elif file_extension == 'pdf':
-                # Real PDF text extraction
-                try:
-                    import PyPDF2
-                    
-                    with open(filepath, 'rb') as pdf_file:
-                        pdf_reader = PyPDF2.PdfReader(pdf_file)
-                        num_pages = len(pdf_reader.pages)
-                        
-                        # Extract text from all pages
-                        all_text = []
-                        for page_num in range(num_pages):
-                            page = pdf_reader.pages[page_num]
-                            page_text = page.extract_text()
-                            if page_text.strip():
-                                all_text.append(f"--- Page {page_num + 1} ---\n{page_text}")
-                        
-                        if all_text:
-                            extracted_text = f"""📄 PDF Text Extraction Results
-
-✅ TEXT EXTRACTED SUCCESSFULLY!
-
-Document: {filename}
-Pages: {num_pages}
-Method: Direct PDF text extraction
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-==================== EXTRACTED TEXT ====================
-
-{chr(10).join(all_text)}
-
-=======================================================
-
-Extraction completed using PyPDF2 library."""
-                            method = f"PDF Text Extraction ({num_pages} pages)"
-                        else:
-                            # If no text found, try OCR on PDF
-                            try:
-                                from pdf2image import convert_from_path
-                                import pytesseract
-                                from PIL import Image
-                                
-                                # Convert PDF to images and OCR
-                                pages = convert_from_path(filepath, dpi=200)
-                                ocr_results = []
-                                
-                                for i, page in enumerate(pages[:3]):  # Limit to first 3 pages
-                                    ocr_text = pytesseract.image_to_string(page)
-                                    if ocr_text.strip():
-                                        ocr_results.append(f"--- Page {i + 1} (OCR) ---\n{ocr_text}")
-                                
-                                if ocr_results:
-                                    extracted_text = f"""📄 PDF OCR Extraction Results
-
-✅ TEXT EXTRACTED VIA OCR!
-
-Document: {filename}
-Pages: {num_pages} (OCR processed: {len(ocr_results)})
-Method: PDF to Image + OCR (No direct text found)
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-==================== EXTRACTED TEXT ====================
-
-{chr(10).join(ocr_results)}
-
-=======================================================
-
-Note: This PDF appears to be image-based, so OCR was used."""
-                                    method = f"PDF OCR Extraction ({len(ocr_results)} pages)"
-                                else:
-                                    extracted_text = f"""📄 PDF Processing Complete - No Text Found
-
-Document: {filename}
-Pages: {num_pages}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-This PDF appears to contain no extractable text. This could be because:
-- The PDF contains only images
-- The PDF is password protected
-- The PDF is corrupted
-- Text is embedded as non-extractable content"""
-                                    method = "PDF Processing (No text found)"
-                            except:
-                                extracted_text = f"""📄 PDF Text Extraction Attempted
-
-Document: {filename}
-Pages: {num_pages}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-Direct text extraction found no readable text.
-OCR processing is not available in this configuration.
-
-The PDF may contain:
-- Image-based content requiring OCR
-- Protected or encrypted text
-- Non-standard text encoding"""
-                                method = "PDF Processing (Limited)"
-                                
-                except Exception as pdf_error:
-                    extracted_text = f"""❌ PDF Processing Error
-
-Document: {filename}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-Error: {str(pdf_error)}
-
-This could be due to:
-- Corrupted PDF file
-- Password-protected PDF
-- Unsupported PDF format
-- Processing configuration issue"""
-                    method = "PDF Error"
-                    
-            elif file_extension in ['docx']:
-                # Real DOCX text extraction using python-docx
-                try:
-                    from docx import Document
-                    
-                    # Open the DOCX document
-                    doc = Document(filepath)
-                    
-                    # Extract text from paragraphs
-                    paragraphs = []
-                    for para in doc.paragraphs:
-                        if para.text.strip():
-                            paragraphs.append(para.text.strip())
-                    
-                    # Extract text from tables
-                    table_data = []
-                    for table in doc.tables:
-                        for row in table.rows:
-                            row_data = []
-                            for cell in row.cells:
-                                if cell.text.strip():
-                                    row_data.append(cell.text.strip())
-                            if row_data:
-                                table_data.append(" | ".join(row_data))
-                    
-                    # Extract headers and footers
-                    headers_footers = []
-                    for section in doc.sections:
-                        # Headers
-                        if section.header:
-                            for para in section.header.paragraphs:
-                                if para.text.strip():
-                                    headers_footers.append(f"[HEADER] {para.text.strip()}")
-                        # Footers
-                        if section.footer:
-                            for para in section.footer.paragraphs:
-                                if para.text.strip():
-                                    headers_footers.append(f"[FOOTER] {para.text.strip()}")
-                    
-                    # Combine all extracted content
-                    all_content = []
-                    
-                    if headers_footers:
-                        all_content.append("=== HEADERS & FOOTERS ===")
-                        all_content.extend(headers_footers)
-                        all_content.append("")
-                    
-                    if paragraphs:
-                        all_content.append("=== DOCUMENT CONTENT ===")
-                        all_content.extend(paragraphs)
-                        all_content.append("")
-                    
-                    if table_data:
-                        all_content.append("=== TABLES ===")
-                        all_content.extend(table_data)
-                        all_content.append("")
-                    
-                    if all_content:
-                        full_extracted_text = "\n".join(all_content)
-                        
-                        # Document statistics
-                        total_paragraphs = len(paragraphs)
-                        total_tables = len(doc.tables)
-                        total_sections = len(doc.sections)
-                        
-                        extracted_text = f"""📄 DOCX Document Extraction Results
-
-✅ TEXT EXTRACTED SUCCESSFULLY!
-
-Document: {filename}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-Extraction Method: python-docx library
-
-📊 Document Structure:
-- Paragraphs: {total_paragraphs}
-- Tables: {total_tables}
-- Sections: {total_sections}
-- Headers/Footers: {len(headers_footers)}
-
-==================== EXTRACTED CONTENT ====================
-
-{full_extracted_text}
-
-=======================================================
-
-🔧 Technical Details:
-- Library: python-docx (specialized DOCX parser)
-- Content Types: Paragraphs, Tables, Headers, Footers
-- Formatting: Preserved structure with section markers
-- Text Processing: Cleaned whitespace and empty elements
-
-💡 DOCX Extraction Features:
-✅ Full paragraph text extraction
-✅ Table content with cell separation
-✅ Headers and footers from all sections
-✅ Maintains document structure
-✅ Handles complex DOCX formatting
-✅ Preserves text content accurately"""
-
-                        method = f"python-docx extraction ({total_paragraphs} paragraphs, {total_tables} tables)"
-                        
-                    else:
-                        extracted_text = f"""📄 DOCX Document Processed - No Text Content Found
-
-Document: {filename}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-Document Structure: {len(doc.paragraphs)} paragraphs, {len(doc.tables)} tables
-
-This DOCX document appears to contain:
-- Empty paragraphs or only formatting
-- Images without text content
-- Complex embedded objects
-- Non-text elements only
-
-The document was successfully opened but no readable text was found."""
-                        method = "python-docx extraction (No text content)"
-                        
-                except Exception as docx_error:
-                    extracted_text = f"""❌ DOCX Processing Error
-
-Document: {filename}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-Error: {str(docx_error)}
-
-This could be due to:
-- Corrupted DOCX file
-- Password-protected document
-- Unsupported DOCX format/version
-- Document contains complex elements not supported
-- File is not a valid DOCX format
-
-Please ensure the file is a valid, unprotected DOCX document."""
-                    method = "python-docx error"
-                    
-            elif file_extension in ['doc']:
-                # Legacy DOC format note
-                extracted_text = f"""📄 Legacy DOC Format Detected
-
-Document: {filename}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-Format: Microsoft Word DOC (legacy format)
-
-⚠️ LIMITED SUPPORT FOR .DOC FILES
-
-The .DOC format is a legacy binary format that requires specialized libraries.
-This system is optimized for modern .DOCX files using python-docx.
-
-Recommendations:
-1. Convert .DOC to .DOCX using Microsoft Word or LibreOffice
-2. Use "Save As" → "Word Document (.docx)" 
-3. Re-upload the .DOCX version for full text extraction
-
-For .DOCX files, you'll get:
-✅ Complete text extraction
-✅ Table content parsing  
-✅ Headers and footers
-✅ Document structure preservation
-
-Alternative: If this is actually a .DOCX file with wrong extension, try renaming it to .docx"""
-                method = "Legacy DOC format (limited support)"
-                
-            elif file_extension in ['xlsx', 'pptx']:
-                extracted_text = f"""📊 {file_extension.upper()} Document Detected
-
-Document: {filename}
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-Format: Microsoft {file_extension.upper()}
-
-📝 SPECIALIZED EXTRACTION NEEDED
-
-This system currently has full extraction support for:
-✅ DOCX (Microsoft Word) - Complete text extraction
-✅ PDF - Text extraction + OCR fallback  
-✅ Images - Multilingual OCR
-✅ TXT, HTML, CSV, JSON - Direct text reading
-
-For {file_extension.upper()} files, specialized libraries would be needed:
-- XLSX: openpyxl or xlrd for spreadsheet data
-- PPTX: python-pptx for presentation content
-
-With full Kreuzberg integration, these formats would be fully supported.
-
-Current capability: Basic file recognition and metadata extraction."""
-                method = f"{file_extension.upper()} format detection"
-                extracted_text = f"""📄 {file_extension.upper()} Document Detected
-
-IMPORTANT: This is a preview version. For full text extraction from {file_extension.upper()} files, the Kreuzberg library would be used.
-
-File Details:
-- Name: {filename}
-- Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-- Type: {file_extension.upper()} Document
-
-What would happen with Kreuzberg:
-- Full text extraction from all pages
-- Proper formatting preservation  
-- Table and image text recognition
-- High accuracy text recognition
-
-To see actual content extraction, try uploading a TXT, HTML, CSV, or JSON file."""
-                method = f"Mock {file_extension.upper()} processing"
-                
-            elif file_extension in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
-                # Enhanced OCR processing with ALL language support
-                try:
-                    import pytesseract
-                    from PIL import Image, ImageEnhance, ImageFilter
-                    
-                    # Get available languages
-                    try:
-                        available_langs = pytesseract.get_languages(config='')
-                        lang_string = '+'.join(available_langs) if available_langs else 'eng'
-                    except:
-                        lang_string = 'eng+ell+fra+deu+spa+ara+chi_sim+chi_tra+jpn+kor+rus+hin+tha+vie'
-                    
-                    # Open and process the image
-                    image = Image.open(filepath)
-                    
-                    # Convert to RGB if necessary
-                    if image.mode != 'RGB':
-                        image = image.convert('RGB')
-                    
-                    # Image preprocessing for better OCR
-                    gray_image = image.convert('L')
-                    enhancer = ImageEnhance.Contrast(gray_image)
-                    enhanced_image = enhancer.enhance(2.0)
-                    sharpened = enhanced_image.filter(ImageFilter.SHARPEN)
-                    
-                    # Multiple OCR configurations with all languages
-                    configs = [
-                        ('All Languages Auto', f'--oem 3 --psm 6 -l {lang_string}'),
-                        ('All Languages Block', f'--oem 3 --psm 4 -l {lang_string}'),
-                        ('English + Major', '--oem 3 --psm 6 -l eng+ell+fra+deu+spa+ara+chi_sim+rus'),
-                        ('English Focus', '--oem 3 --psm 6 -l eng'),
-                        ('Single Text Block', f'--oem 3 --psm 8 -l {lang_string}'),
-                        ('Sparse Text', f'--oem 3 --psm 11 -l {lang_string}')
-                    ]
-                    
-                    best_result = ""
-                    best_confidence = 0
-                    best_method = ""
-                    all_attempts = []
-                    detected_languages = set()
-                    
-                    for config_name, config in configs:
-                        try:
-                            # Extract text with confidence data
-                            ocr_data = pytesseract.image_to_data(
-                                sharpened, 
-                                config=config, 
-                                output_type=pytesseract.Output.DICT
-                            )
-                            
-                            # Filter and combine text with confidence > 15 (lower threshold for multilingual)
-                            text_parts = []
-                            confidences = []
-                            
-                            for i in range(len(ocr_data['text'])):
-                                conf = int(ocr_data['conf'][i])
-                                if conf > 15:
-                                    text = ocr_data['text'][i].strip()
-                                    if text and len(text) > 1:  # Ignore single characters
-                                        text_parts.append(text)
-                                        confidences.append(conf)
-                            
-                            if text_parts and confidences:
-                                current_text = ' '.join(text_parts)
-                                avg_confidence = sum(confidences) / len(confidences)
-                                
-                                # Try to detect script/language
-                                script_info = ""
-                                if any(ord(char) > 127 for char in current_text):
-                                    if any(0x0370 <= ord(char) <= 0x03FF for char in current_text):
-                                        script_info += "Greek "
-                                        detected_languages.add("Greek")
-                                    if any(0x0400 <= ord(char) <= 0x04FF for char in current_text):
-                                        script_info += "Cyrillic "
-                                        detected_languages.add("Cyrillic")
-                                    if any(0x0600 <= ord(char) <= 0x06FF for char in current_text):
-                                        script_info += "Arabic "
-                                        detected_languages.add("Arabic")
-                                    if any(0x4E00 <= ord(char) <= 0x9FFF for char in current_text):
-                                        script_info += "Chinese "
-                                        detected_languages.add("Chinese")
-                                    if any(0x3040 <= ord(char) <= 0x309F for char in current_text):
-                                        script_info += "Hiragana "
-                                        detected_languages.add("Japanese")
-                                    if any(0x30A0 <= ord(char) <= 0x30FF for char in current_text):
-                                        script_info += "Katakana "
-                                        detected_languages.add("Japanese")
-                                
-                                all_attempts.append({
-                                    'method': config_name,
-                                    'text': current_text,
-                                    'confidence': avg_confidence,
-                                    'word_count': len(text_parts),
-                                    'script': script_info.strip() or "Latin"
-                                })
-                                
-                                # Keep the best result (prioritize longer text with good confidence)
-                                quality_score = (avg_confidence * 0.7) + (len(current_text) * 0.3)
-                                best_quality = (best_confidence * 0.7) + (len(best_result) * 0.3)
-                                
-                                if quality_score > best_quality:
-                                    best_result = current_text
-                                    best_confidence = avg_confidence
-                                    best_method = config_name
-                                    
-                        except Exception as config_error:
-                            all_attempts.append({
-                                'method': config_name,
-                                'text': f"Error: {str(config_error)}",
-                                'confidence': 0,
-                                'word_count': 0,
-                                'script': "Error"
-                            })
-                    
-                    if best_result:
-                        # Format the successful result
-                        extracted_text = f"""🌍 MULTILINGUAL OCR Results for {filename}
-
-✅ TEXT EXTRACTED SUCCESSFULLY!
-
-Best Method: {best_method}
-Overall Confidence: {best_confidence:.1f}%
-Detected Scripts: {', '.join(detected_languages) if detected_languages else 'Latin/English'}
-Image Size: {image.size[0]}x{image.size[1]} pixels
-File Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-
-Available Languages: {len(available_langs) if 'available_langs' in locals() else 'Multiple'}
-
-==================== EXTRACTED TEXT ====================
-
-{best_result}
-
-=======================================================
-
-📊 All OCR Attempts (Best to Worst):
-
-"""
-                        
-                        # Sort attempts by confidence and add details
-                        sorted_attempts = sorted(all_attempts, key=lambda x: x['confidence'], reverse=True)
-                        for i, attempt in enumerate(sorted_attempts, 1):
-                            status = "🏆 BEST" if attempt['method'] == best_method else f"#{i}"
-                            extracted_text += f"""
-{status} - {attempt['method']}:
-   📊 Confidence: {attempt['confidence']:.1f}%
-   📝 Words: {attempt['word_count']}
-   🌐 Script: {attempt['script']}
-   📄 Preview: {attempt['text'][:150]}{'...' if len(attempt['text']) > 150 else ''}
-"""
-                        
-                        extracted_text += f"""
-=======================================================
-
-🔧 Technical Details:
-- OCR Engine: Tesseract with ALL language packs
-- Preprocessing: Contrast enhancement + sharpening
-- Language Detection: Automatic multi-script detection
-- Character Filtering: Confidence > 15% threshold
-- Quality Scoring: Confidence + text length optimization
-
-🌐 Supported Languages Include:
-English, Greek, Arabic, Chinese, Japanese, Korean, Russian, 
-Hindi, Thai, Vietnamese, French, German, Spanish, Italian, 
-Portuguese, Dutch, Polish, Turkish, Hebrew, and many more!
-
-💡 For best results with multilingual text:
-- Ensure high image contrast
-- Use clear, readable fonts
-- Avoid overly decorative or stylized text
-- Higher resolution helps with complex scripts"""
+            extraction, result = extract_upload(upload_source(file), filename, options, content_hash=upload_hash(file))
+        finally:
+            # Frees the buffer or deletes the spooled file
+            file.close()
+        
+        if output_format == 'csv':
+            # Return CSV format
+            return csv_response(csv_rows(result, extraction, csv_split), result['filename'])
+        else:
+            return jsonify(result)
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        return jsonify({"error": f"Processing failed: {str(e)}"}), 500
 
-                        method = f"Multilingual OCR ({len(sorted_attempts)} methods, Best: {best_method})"
-                        
+@app.route('/extract/batch', methods=['POST'])
+def extract_batch():
+    """Extract many files (or one ZIP/TAR archive) concurrently, streaming NDJSON results"""
+    files = [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+    if not files:
+        return jsonify({"error": "No files provided"}), 400
+    
+    options = request.form.to_dict()
+    try:
+        validate_options(options)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    batch_dir = tempfile.mkdtemp(prefix='batch_', dir=app.config['UPLOAD_FOLDER'])
+    items = []  # (name, filepath, filename) for every file to extract
+    rejected = []  # (name, error) for files we won't process
+    
+    try:
+        for index, file in enumerate(files):
+            filename = secure_filename(file.filename) or f"file_{index + 1}"
+            filepath = os.path.join(batch_dir, f"upload_{index:05d}_{filename}")
+            file.save(filepath)
+            
+            if is_archive(file.filename):
+                archive_dir = os.path.join(batch_dir, f"archive_{index:05d}")
+                os.makedirs(archive_dir)
+                members = expand_archive(
+                    filepath, archive_dir,
+                    max_files=app.config['BATCH_MAX_FILES'] - len(items),
+                    max_bytes=app.config['BATCH_MAX_ARCHIVE_BYTES']
+                )
+                os.remove(filepath)
+                for member_name, member_path, member_filename in members:
+                    if allowed_file(member_filename):
+                        items.append((member_name, member_path, member_filename))
                     else:
-                        # No text detected in any configuration
-                        extracted_text = f"""🌍 Multilingual OCR Processing Complete - No Clear Text Found
-
-Image Details:
-- Name: {filename}
-- Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-- Format: {file_extension.upper()}
-- Dimensions: {image.size[0]}x{image.size[1]} pixels
-- Available Languages: {len(available_langs) if 'available_langs' in locals() else 'Multiple'}
-
-OCR Attempts Made:
-"""
-                        for i, attempt in enumerate(all_attempts, 1):
-                            extracted_text += f"{i}. {attempt['method']}: {attempt['confidence']:.1f}% confidence ({attempt['script']})\n"
-                        
-                        extracted_text += f"""
-Possible reasons for poor detection:
-- Text is too small, blurry, or low contrast
-- Highly stylized or decorative fonts
-- Very complex multi-script layouts
-- Image quality insufficient for character recognition
-- Background patterns interfering with text
-
-💡 Tips for better multilingual OCR:
-- Use high-resolution, high-contrast images
-- Ensure text is clearly readable to human eye
-- Avoid backgrounds with patterns or textures
-- For best results, text should be horizontal and well-spaced"""
-                        
-                        method = "Multilingual OCR (No clear text detected)"
-                        
-                except Exception as ocr_error:
-                    extracted_text = f"""❌ Multilingual OCR Processing Error
-
-Image Details:
-- Name: {filename}
-- Size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)
-- Format: {file_extension.upper()}
-
-Error: {str(ocr_error)}
-
-This could be due to:
-- Corrupted or invalid image file
-- Unsupported image format for OCR
-- Memory limitations with large images
-- OCR engine configuration issue
-
-Please try with a different image or check the file format."""
-                    method = "Multilingual OCR Error"
-                
+                        rejected.append((member_name, "File type not supported"))
+            elif allowed_file(file.filename):
+                items.append((file.filename, filepath, filename))
             else:
-                # Try to read as text anyway
-                try:
-                    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read(1000)  # Read first 1000 chars
-                        if content.strip():
-                            extracted_text = content + "\n\n[Content truncated - showing first 1000 characters]"
-                            method = "Generic text reading"
-                        else:
-                            extracted_text = f"File type '{file_extension}' not directly supported in preview mode. With Kreuzberg, this file would be processed appropriately."
-                            method = "Unsupported format"
-                except:
-                    extracted_text = f"Cannot read '{file_extension}' file as text. With Kreuzberg, specialized handlers would process this file type."
-                    method = "Binary file detected"
-                    
+                rejected.append((file.filename, "File type not supported"))
+            
+            if len(items) > app.config['BATCH_MAX_FILES']:
+                raise ArchiveLimitError(f"Batch has more than {app.config['BATCH_MAX_FILES']} files")
+    except (ArchiveLimitError, ValueError) as e:
+        remove_dir(batch_dir)
+        return jsonify({"error": f"Batch rejected: {str(e)}"}), 400
+    except Exception as e:
+        remove_dir(batch_dir)
+        return jsonify({"error": f"Batch processing failed: {str(e)}"}), 500
+    
+    def extract_item(index, name, filepath, filename):
+        try:
+            result = extract_with_cache(filepath, filename, options)
+            return {"index": index, "name": name, "status": "success", "result": result}
         except Exception as e:
-            extracted_text = f"Error processing file: {str(e)}\n\nThis might be a binary file or corrupted document. The full Kreuzberg version would handle this more gracefully."
-            method = "Error handling"
+            return {"index": index, "name": name, "status": "error", "error": str(e)}
+        finally:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+    
+    def generate():
+        futures = []
+        succeeded = failed = 0
+        try:
+            for name, error in rejected:
+                failed += 1
+                yield json.dumps({"name": name, "status": "error", "error": error}) + "\n"
+            
+            futures = [
+                batch_executor.submit(extract_item, index, name, filepath, filename)
+                for index, (name, filepath, filename) in enumerate(items)
+            ]
+            # Emit each file as soon as it finishes, not in upload order
+            for future in as_completed(futures):
+                item = future.result()
+                if item["status"] == "success":
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield json.dumps(item) + "\n"
+            
+            yield json.dumps({
+                "summary": {"total": len(items) + len(rejected), "succeeded": succeeded, "failed": failed}
+            }) + "\n"
+        finally:
+            # Client went away or we're done: drop queued work and the batch directory
+            for future in futures:
+                future.cancel()
+            remove_dir(batch_dir)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue an extraction (same inputs as /extract) and return a job id right away"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({"error": "No file provided"}), 400
         
-        # Clean up file
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
         
-        # Calculate stats
-        word_count = len(extracted_text.split()) if extracted_text else 0
-        char_count = len(extracted_text) if extracted_text else 0
+        if not allowed_file(file.filename):
+            return jsonify({
+                "error": f"File type not supported. Allowed: {list(ALLOWED_EXTENSIONS)}"
+            }), 400
         
-        # Return response
-        result = {
-            "filename": filename,
-            "file_extension": file_extension,
-            "file_size_bytes": file_size,
-            "extraction_method": method,
-            "full_text": extracted_text,
-            "word_count": word_count,
-            "character_count": char_count,
-            "total_pages": 1,
-            "status": "success",
-            "note": "This is a test version. Full Kreuzberg processing available in production version."
-        }
+        options = request.form.to_dict()
+        try:
+            validate_options(options)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        if output_format == 'csv':
-            # Return CSV format
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(['Filename', 'Extension', 'Text', 'Word_Count', 'Char_Count', 'Method'])
-            writer.writerow([filename, file_extension, extracted_text.replace('\n', ' '), 
-                           word_count, char_count, method])
-            
-            output.seek(0)
-            return send_file(
-                io.BytesIO(output.getvalue().encode()),
-                mimetype='text/csv',
-                as_attachment=True,
-                download_name=f"{os.path.splitext(filename)[0]}_extracted.csv"
-            )
-        else:
-            return jsonify(result)
-            
+        filepath, filename = save_upload_unique(file)
+        
+        def cleanup():
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        
+        job_id = job_manager.submit(
+            extract_job, filepath, filename, options,
+            content_hash=upload_hash(file), on_done=cleanup
+        )
+        
+        return jsonify({
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/jobs/{job_id}",
+            "result_url": f"/jobs/{job_id}/result",
+            "retention_seconds": app.config['JOB_RETENTION_SECONDS']
+        }), 202
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        return jsonify({"error": f"Processing failed: {str(e)}"}), 500
+        return jsonify({"error": f"Could not create job: {str(e)}"}), 500
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status, page progress and (once finished) the result of a job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id"}), 404
+    return jsonify(job_report(job))
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """Finished job result, as JSON or CSV (?format=csv)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id"}), 404
+    if job['status'] == 'failed':
+        return jsonify({"error": f"Processing failed: {job['error']}"}), 500
+    if job['status'] != 'finished':
+        return jsonify({"status": job['status'], "progress": job['progress']}), 202
+    
+    if request.args.get('format', 'json').lower() == 'csv':
+        csv_split = request.args.get('csv_split', 'document').lower()
+        if csv_split not in CSV_SPLITS:
+            return jsonify({"error": f"csv_split must be one of {list(CSV_SPLITS)}"}), 400
+        output = job['result']
+        return csv_response(csv_rows(output['result'], output['extraction'], csv_split), output['result']['filename'])
+    return jsonify(job['result']['result'])
 
 if __name__ == '__main__':
     print("=" * 60)
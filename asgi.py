@@ -0,0 +1,438 @@
+"""ASGI entry point: uvicorn asgi:app --host 0.0.0.0 --port 8000
+
+The extraction endpoints (/extract, /extract/docx) are served natively so an
+upload waiting on OCR or parsing only holds a coroutine, not a thread: the
+work itself runs on the extractor scheduler's pools (or in Kreuzberg, for the
+formats DocumentProcessor handles) and is awaited. Every other endpoint is the
+Flask app, mounted unchanged.
+"""
+import io
+import json
+import asyncio
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+from app import (
+    app as flask_app, ALLOWED_EXTENSIONS, STREAM_HEADERS, allowed_file, build_docx_result, build_result,
+    CSV_SPLITS, cache_key_for, content_type_info, csv_download_name, csv_rows, encode_csv, encode_events, extractor_registry, extractor_scheduler,
+    iter_settled_pages, ocr_pool, part_rows, result_cache, stream_mimetype
+)
+from extractors import ExtractionContext, ExtractionResult, csv_limits, option_enabled, resolve_pdf_backend, validate_options
+from pdf_extraction import iter_pdf_pages
+from xml_extraction import iter_xml_events, parse_element_filters
+from csv_extraction import iter_csv_events
+from compression import accepted_encoding, compress, compressible
+from sniffing import sniff_source
+from uploads import HashingBuffer, spool_file, upload_hash, upload_source
+
+try:
+    from document_processor import DocumentProcessor
+    document_processor = DocumentProcessor()
+except ImportError as e:
+    print(f"DocumentProcessor unavailable ({e}), all formats use the built-in extractors")
+    document_processor = None
+
+
+def extension_of(filename):
+    return filename.rsplit('.', 1)[1].lower() if '.' in filename else 'unknown'
+
+
+def uses_kreuzberg(filename):
+    return document_processor is not None and extension_of(filename) in flask_app.config['KREUZBERG_FORMATS']
+
+
+class MultipartUpload:
+    """Streaming multipart/form-data parser that writes the file part once, as it arrives
+
+    Text fields are collected in fields. The "file" part goes into a
+    HashingBuffer when the declared request size fits UPLOAD_MEMORY_LIMIT
+    (and Kreuzberg doesn't need a path), else straight into a SpoolFile in
+    UPLOAD_SPOOL_DIR, its SHA-256 computed on the way, like SpoolingRequest
+    does for the Flask app. upload is a FileStorage over it.
+    """
+
+    def __init__(self, boundary, content_length=None):
+        self.fields = {}
+        self.upload = None
+        self._content_length = content_length
+        self._headers = {}
+        self._header_field = self._header_value = b''
+        self._field_name = None
+        self._target = None
+        self._parser = MultipartParser(boundary, {
+            'on_part_begin': self._on_part_begin,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._field_name = self._target = None
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b''
+
+    def _on_headers_finished(self):
+        _, disposition = parse_options_header(self._headers.get(b'content-disposition', b''))
+        name = disposition.get(b'name', b'').decode('utf-8', errors='replace')
+        filename = disposition.get(b'filename')
+        if filename is None:
+            self._field_name, self._target = name, io.BytesIO()
+        elif name == 'file' and self.upload is None:
+            filename = filename.decode('utf-8', errors='replace')
+            self._target = self._open_file(filename)
+            self.upload = FileStorage(self._target, filename=filename, name=name)
+        # Any other file part is read past and dropped
+
+    def _open_file(self, filename):
+        config = flask_app.config
+        if (self._content_length is not None and self._content_length <= config['UPLOAD_MEMORY_LIMIT']
+                and not uses_kreuzberg(secure_filename(filename))):
+            return HashingBuffer()
+        return spool_file(config['UPLOAD_SPOOL_DIR'], filename)
+
+    def _on_part_data(self, data, start, end):
+        if self._target is not None:
+            self._target.write(data[start:end])
+
+    def _on_part_end(self):
+        if self._field_name is not None:
+            self.fields[self._field_name] = self._target.getvalue().decode('utf-8', errors='replace')
+
+    def write(self, chunk):
+        self._parser.write(chunk)
+
+    def finalize(self):
+        self._parser.finalize()
+
+    def close(self):
+        if self.upload is not None:
+            self.upload.close()
+
+
+def open_upload(upload):
+    """(source, filename, content_hash, close) for the FileStorage read_upload returned"""
+    return upload_source(upload), secure_filename(upload.filename), upload_hash(upload), upload.close
+
+
+def kreuzberg_result(ctx, extraction):
+    """JSON result for a DocumentProcessor extraction, shaped like build_result's"""
+    text = extraction['text']
+    return {
+        "filename": ctx.filename,
+        "file_extension": ctx.file_extension,
+        "file_size_bytes": ctx.file_size,
+        "extraction_method": "Kreuzberg (DocumentProcessor)",
+        "full_text": text,
+        "word_count": len(text.split()) if text else 0,
+        "character_count": len(text),
+        "total_pages": extraction.get('page_count', 1),
+        "status": "success",
+        "content_type": content_type_info(ctx),
+        # Kreuzberg metadata may hold dates and other non-JSON values
+        "metadata": json.loads(json.dumps(extraction.get('metadata') or {}, default=str))
+    }
+
+
+async def extract_cached_async(ctx, endpoint='extract', content_hash=None, extractor=None):
+    """Async counterpart of extract_cached: (extraction, full_text, cache_hit)"""
+    cache_key = await run_in_threadpool(cache_key_for, ctx, endpoint, content_hash)
+    cached = await run_in_threadpool(result_cache.get, cache_key)
+    if cached is not None:
+        extraction = ExtractionResult.from_dict(cached)
+        return extraction, extractor_scheduler.render(extraction, ctx), True
+
+    extraction, full_text = await asyncio.wrap_future(extractor_scheduler.submit(ctx, extractor))
+    # Don't cache failed or partial results (e.g. an OCR outage), they may be transient
+    if not extraction.degraded:
+        await run_in_threadpool(result_cache.set, cache_key, extraction.as_dict())
+    return extraction, full_text, False
+
+
+async def extract_async(source, filename, options, content_hash=None):
+    """Async counterpart of extract_upload: nothing here blocks the event loop"""
+    # Building the context sniffs the first bytes of the upload
+    ctx = await run_in_threadpool(
+        ExtractionContext, source, filename, options, ocr_pool=ocr_pool, config=flask_app.config
+    )
+    # Kreuzberg reads paths; open_upload spools the formats it handles by extension
+    if (document_processor is not None and isinstance(source, str)
+            and ctx.file_format in flask_app.config['KREUZBERG_FORMATS']):
+        cache_key = await run_in_threadpool(cache_key_for, ctx, 'extract', content_hash, engine='kreuzberg')
+        extraction = await run_in_threadpool(result_cache.get, cache_key)
+        if extraction is not None:
+            result = kreuzberg_result(ctx, extraction)
+            return ExtractionResult(result['full_text'], result['extraction_method']), {**result, "cache_hit": True}
+
+        extraction = await document_processor.extract_text_with_kreuzberg(source)
+        if extraction.get('error'):
+            print(f"Kreuzberg failed on {filename}, using the built-in extractor: {extraction['error']}")
+        else:
+            result = kreuzberg_result(ctx, extraction)
+            await run_in_threadpool(result_cache.set, cache_key, {
+                "text": result['full_text'], "page_count": result['total_pages'], "metadata": result['metadata']
+            })
+            return ExtractionResult(result['full_text'], result['extraction_method']), {**result, "cache_hit": False}
+
+    extraction, full_text, cache_hit = await extract_cached_async(ctx, content_hash=content_hash)
+    return extraction, {**build_result(ctx, extraction, full_text), "cache_hit": cache_hit}
+
+
+def upload_limit(endpoint):
+    return flask_app.config['UPLOAD_LIMITS'].get(endpoint, flask_app.config['MAX_CONTENT_LENGTH'])
+
+
+async def read_upload(request, endpoint):
+    """(fields, upload) for a multipart request, or (None, error response)
+
+    The body is parsed as it streams in (off the event loop) and the file
+    part is written once, see MultipartUpload. Declared oversize bodies are
+    refused before reading, others (chunked ones included) as soon as they
+    pass the limit, with whatever was written so far removed.
+    """
+    limit = upload_limit(endpoint)
+    too_large = JSONResponse({"error": "Upload too large", "max_bytes": limit}, status_code=413)
+    declared = None
+    content_length = request.headers.get('content-length')
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            return None, JSONResponse({"error": "Invalid Content-Length header"}, status_code=400)
+        if declared > limit:
+            return None, too_large
+
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    if content_type != b'multipart/form-data' or not params.get(b'boundary'):
+        return None, JSONResponse({"error": "No file provided"}, status_code=400)
+
+    parser = MultipartUpload(params[b'boundary'], declared)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                await run_in_threadpool(parser.close)
+                return None, too_large
+            await run_in_threadpool(parser.write, chunk)
+        parser.finalize()
+    except MultipartParseError as e:
+        await run_in_threadpool(parser.close)
+        return None, JSONResponse({"error": f"Invalid multipart body: {e}"}, status_code=400)
+    except BaseException:
+        await run_in_threadpool(parser.close)
+        raise
+
+    upload = parser.upload
+    if upload is None:
+        return None, JSONResponse({"error": "No file provided"}, status_code=400)
+    if not upload.filename:
+        upload.close()
+        return None, JSONResponse({"error": "No file selected"}, status_code=400)
+    return parser.fields, upload
+
+
+def csv_streaming_response(rows, filename, cleanup=None):
+    """csv_response for Starlette: a sync iterator, so each line is written from a worker thread"""
+    return StreamingResponse(encode_csv(rows, cleanup), media_type='text/csv', headers={
+        **STREAM_HEADERS,
+        'Content-Disposition': f'attachment; filename="{csv_download_name(filename)}"'
+    })
+
+
+async def extract_document(request):
+    try:
+        options, upload = await read_upload(request, 'extract_document')
+        if options is None:
+            return upload
+
+        output_format = options.get('format', 'json').lower()
+        csv_split = options.get('csv_split', 'document').lower()
+        stream_format = options.get('stream', '').lower()
+        error = None
+        if not allowed_file(upload.filename):
+            error = f"File type not supported. Allowed: {list(ALLOWED_EXTENSIONS)}"
+        elif output_format == 'csv' and csv_split not in CSV_SPLITS:
+            error = f"csv_split must be one of {list(CSV_SPLITS)}"
+        elif stream_format and stream_format not in ('ndjson', 'sse'):
+            error = "stream must be 'ndjson' or 'sse'"
+        else:
+            try:
+                validate_options(options)
+            except ValueError as e:
+                error = str(e)
+        if error:
+            await run_in_threadpool(upload.close)
+            return JSONResponse({"error": error}, status_code=400)
+
+        source, filename, content_hash, close = open_upload(upload)
+
+        if stream_format:
+            detected = await run_in_threadpool(sniff_source, source, extension_of(filename))
+            if detected[0] == 'pdf' and not uses_kreuzberg(filename):
+                backend, _ = resolve_pdf_backend(options, flask_app.config)
+                # A sync iterator: Starlette pulls each page from a worker thread
+                events = iter_pdf_pages(source, filename, backend)
+            elif detected[0] == 'xml':
+                events = iter_xml_events(source, filename, parse_element_filters(options.get('xml_elements')))
+            elif detected[0] == 'csv':
+                max_rows, max_columns = csv_limits(options, flask_app.config, stream=True)
+                events = iter_csv_events(source, filename, max_rows, max_columns, option_enabled(options, 'csv_rows'))
+            else:
+                try:
+                    _, result = await extract_async(source, filename, options, content_hash)
+                    events = [{"event": "result", **result}]
+                finally:
+                    close()
+            return StreamingResponse(
+                encode_events(events, stream_format, close),
+                media_type=stream_mimetype(stream_format),
+                headers=STREAM_HEADERS
+            )
+
+        # CSV by page: each row goes out as soon as its page is settled
+        if output_format == 'csv' and csv_split == 'page' and not uses_kreuzberg(filename):
+            # A sync iterator: Starlette pulls each page from a worker thread
+            pages = iter_settled_pages(source, filename, options, content_hash)
+
+            def cleanup():
+                # Waits for an unfinished extraction before the upload goes
+                pages.close()
+                close()
+
+            return csv_streaming_response(part_rows(filename, pages), filename, cleanup)
+
+        try:
+            extraction, result = await extract_async(source, filename, options, content_hash)
+        finally:
+            await run_in_threadpool(close)
+
+        if output_format == 'csv':
+            return csv_streaming_response(csv_rows(result, extraction, csv_split), result['filename'])
+        return JSONResponse(result)
+
+    except Exception as e:
+        return JSONResponse({"error": f"Processing failed: {str(e)}"}, status_code=500)
+
+
+async def extract_docx_only(request):
+    """Dedicated endpoint for DOCX extraction"""
+    try:
+        fields, upload = await read_upload(request, 'extract_docx_only')
+        if fields is None:
+            return upload
+
+        file_ext = extension_of(upload.filename) if '.' in upload.filename else ''
+        if file_ext != 'docx':
+            await run_in_threadpool(upload.close)
+            return JSONResponse({
+                "error": f"This endpoint only accepts DOCX files. Received: {file_ext}",
+                "note": "Use /extract for other file types or convert DOC to DOCX"
+            }, status_code=400)
+
+        options = {'mode': 'raw'} if fields.get('mode', '').lower() == 'raw' else {}
+        source, filename, content_hash, close = open_upload(upload)
+        try:
+            # Building the context sniffs the first bytes of the upload
+            ctx = await run_in_threadpool(
+                ExtractionContext, source, filename, options, ocr_pool=ocr_pool, config=flask_app.config
+            )
+            extraction, full_text, cache_hit = await extract_cached_async(
+                ctx, 'extract/docx', content_hash, extractor_registry.get_by_name('docx_summary')
+            )
+            if 'error' in extraction.extras:
+                return JSONResponse({"error": f"DOCX processing failed: {extraction.extras['error']}"}, status_code=500)
+
+            result = build_docx_result(filename, extraction, full_text)
+            result['cache_hit'] = cache_hit
+            return JSONResponse(result)
+        finally:
+            await run_in_threadpool(close)
+
+    except Exception as e:
+        return JSONResponse({"error": f"DOCX processing failed: {str(e)}"}, status_code=500)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli for the ASGI app's own responses
+
+    Only single-message bodies are compressed (streamed responses pass
+    through untouched) and anything already encoded, like the mounted Flask
+    app's compressed responses, is left as is.
+    """
+
+    def __init__(self, app, min_size=1024):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        coding = accepted_encoding(Headers(scope=scope).get('accept-encoding')) if scope['type'] == 'http' else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if start is None or message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            start_message, start = start, None
+            headers = MutableHeaders(raw=list(start_message['headers']))
+            body = message.get('body', b'')
+            if (not message.get('more_body') and 'content-encoding' not in headers
+                    and compressible(headers.get('content-type'), len(body), self.min_size)):
+                body = await run_in_threadpool(compress, body, coding)
+                headers['content-encoding'] = coding
+                headers['content-length'] = str(len(body))
+                headers.add_vary_header('Accept-Encoding')
+                start_message = {**start_message, 'headers': headers.raw}
+                message = {**message, 'body': body}
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+@asynccontextmanager
+async def lifespan(_):
+    yield
+    ocr_pool.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route('/extract', extract_document, methods=['POST']),
+        Route('/extract/docx', extract_docx_only, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_WORKERS']))
+    ],
+    lifespan=lifespan,
+    middleware=[Middleware(CompressionMiddleware, min_size=flask_app.config['COMPRESSION_MIN_BYTES'])]
+)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tarfile
+import zipfile
+from werkzeug.utils import secure_filename
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+class ArchiveLimitError(Exception):
+    """Raised when an archive exceeds the configured member count or size"""
+
+
+def is_archive(filename):
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _copy_member(source, target_path, remaining_bytes):
+    """Copy one archive member to disk, refusing to write more than remaining_bytes"""
+    written = 0
+    with open(target_path, 'wb') as target:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            written += len(chunk)
+            if written > remaining_bytes:
+                raise ArchiveLimitError("Archive expands beyond the allowed total size")
+            target.write(chunk)
+    return written
+
+
+def expand_archive(archive_path, target_dir, max_files, max_bytes):
+    """Extract the regular files of a ZIP/TAR archive into target_dir
+
+    Member paths are never used as filesystem paths: each member is written to
+    a numbered, sanitised name so archives cannot escape target_dir or collide.
+    Returns a list of (member_name, filepath, filename) tuples.
+    """
+    items = []
+    total_bytes = 0
+
+    def add(member_name, opener):
+        nonlocal total_bytes
+        # Skip OS metadata such as __MACOSX/ resource forks and .DS_Store
+        if member_name.startswith('__MACOSX/') or os.path.basename(member_name).startswith('.'):
+            return
+        if len(items) >= max_files:
+            raise ArchiveLimitError(f"Archive has more than {max_files} files")
+        filename = secure_filename(os.path.basename(member_name)) or f"file_{len(items) + 1}"
+        filepath = os.path.join(target_dir, f"{len(items):05d}_{filename}")
+        with opener() as source:
+            total_bytes += _copy_member(source, filepath, max_bytes - total_bytes)
+        items.append((member_name, filepath, filename))
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                add(info.filename, lambda info=info: archive.open(info))
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                add(member.name, lambda member=member: archive.extractfile(member))
+    else:
+        raise ValueError("Not a ZIP or TAR archive")
+
+    return items
+
+
+def remove_dir(path):
+    shutil.rmtree(path, ignore_errors=True)
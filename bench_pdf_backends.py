@@ -0,0 +1,137 @@
+"""Compare the PDF text backends on a corpus of PDFs
+
+Usage: python bench_pdf_backends.py <pdf or directory> [...] [--backends pypdf2,pdfium,pdfminer]
+                                    [--reference pypdf2] [--repeat 1]
+
+For every backend this reports throughput (pages/s, MB/s) and output quality:
+characters and words extracted, the share of pages that would be sent to OCR
+(empty or garbage text layer) and word-level agreement with the reference
+backend.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+from pdf_backends import PDF_BACKENDS, get_pdf_backend
+from pdf_extraction import page_needs_ocr
+
+
+def find_pdfs(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith('.pdf'):
+                        yield os.path.join(root, name)
+        elif path.lower().endswith('.pdf'):
+            yield path
+
+
+def extract_all(backend, filepath):
+    with backend.open(filepath) as pdf_document:
+        return list(pdf_document.iter_page_texts())
+
+
+def word_agreement(texts, reference_texts):
+    """Multiset F1 of the words of two extractions (1.0 = same words)"""
+    words = Counter(' '.join(texts).split())
+    reference = Counter(' '.join(reference_texts).split())
+    if not words and not reference:
+        return 1.0
+    overlap = sum((words & reference).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(words.values())
+    recall = overlap / sum(reference.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text backends")
+    parser.add_argument('paths', nargs='+', help="PDF files or directories of PDFs")
+    parser.add_argument('--backends', default=','.join(PDF_BACKENDS))
+    parser.add_argument('--reference', default='pypdf2', help="Backend used as the quality reference")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per file (best is kept)")
+    args = parser.parse_args()
+
+    pdfs = list(find_pdfs(args.paths))
+    if not pdfs:
+        print("No PDF files found")
+        return 1
+
+    backends = {}
+    for name in args.backends.split(','):
+        try:
+            backends[name] = get_pdf_backend(name)
+        except (ImportError, ValueError) as e:
+            print(f"Skipping backend {name}: {e}")
+
+    reference_backend = backends.get(args.reference)
+    if reference_backend is None:
+        print(f"Reference backend {args.reference} is not available, agreement is not reported")
+
+    total_bytes = sum(os.path.getsize(path) for path in pdfs)
+    print(f"Corpus: {len(pdfs)} PDFs, {total_bytes / 1024 / 1024:.1f} MB")
+
+    reference_outputs = {}
+    if reference_backend is not None:
+        for path in pdfs:
+            try:
+                reference_outputs[path] = extract_all(reference_backend, path)
+            except Exception:
+                reference_outputs[path] = None
+
+    rows = []
+    for name, backend in backends.items():
+        seconds = 0.0
+        pages = chars = words = ocr_pages = failures = 0
+        agreements = []
+
+        for path in pdfs:
+            best = None
+            texts = None
+            try:
+                for _ in range(max(1, args.repeat)):
+                    start = time.perf_counter()
+                    texts = extract_all(backend, path)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+            except Exception as e:
+                failures += 1
+                print(f"  {name} failed on {path}: {e}")
+                continue
+
+            seconds += best
+            pages += len(texts)
+            chars += sum(len(text) for text in texts)
+            words += sum(len(text.split()) for text in texts)
+            ocr_pages += sum(1 for text in texts if page_needs_ocr(text))
+            if reference_outputs.get(path) is not None:
+                agreements.append(word_agreement(texts, reference_outputs[path]))
+
+        rows.append({
+            "backend": name,
+            "seconds": seconds,
+            "pages_per_s": pages / seconds if seconds else 0.0,
+            "mb_per_s": total_bytes / 1024 / 1024 / seconds if seconds else 0.0,
+            "chars": chars,
+            "words": words,
+            "ocr_share": ocr_pages / pages if pages else 0.0,
+            "agreement": sum(agreements) / len(agreements) if agreements else None,
+            "failures": failures
+        })
+
+    print()
+    print(f"{'backend':<10} {'seconds':>9} {'pages/s':>9} {'MB/s':>7} {'chars':>11} {'words':>10} "
+          f"{'needs OCR':>9} {'agreement':>9} {'failed':>6}")
+    for row in sorted(rows, key=lambda r: r["seconds"]):
+        agreement = f"{row['agreement']:.3f}" if row['agreement'] is not None else '-'
+        print(f"{row['backend']:<10} {row['seconds']:>9.2f} {row['pages_per_s']:>9.1f} {row['mb_per_s']:>7.2f} "
+              f"{row['chars']:>11,} {row['words']:>10,} {row['ocr_share']:>9.1%} {agreement:>9} {row['failures']:>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
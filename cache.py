@@ -0,0 +1,134 @@
+import io
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from uploads import open_source
+
+
+def file_sha256(source, chunk_size=1024 * 1024):
+    """SHA-256 of a file path or in-memory buffer, read in chunks"""
+    digest = hashlib.sha256()
+    if isinstance(source, io.BytesIO):
+        digest.update(source.getbuffer())
+        return digest.hexdigest()
+    with open_source(source) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Content-addressed cache of extraction results
+
+    Results are stored as JSON under a key derived from the SHA-256 of the
+    uploaded bytes plus the extraction parameters. The in-process tier is an
+    LRU bounded by the total size of the stored JSON; the optional Redis tier
+    is shared between processes and expires entries after ttl seconds.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024, redis_url=None, ttl=86400, prefix='extract:'):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prefix = prefix
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._redis = None
+        self.stats_counters = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "redis_errors": 0
+        }
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=2)
+                self._redis.ping()
+                print(f"Extraction cache using Redis at {redis_url}")
+            except Exception as e:
+                print(f"Redis cache tier disabled: {e}")
+                self._redis = None
+
+    @staticmethod
+    def make_key(content_hash, params):
+        """Combine the content hash with the parameters that affect the output"""
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{params_json}".encode()).hexdigest()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def _store_memory(self, key, payload):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = payload
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.stats_counters["evictions"] += 1
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.stats_counters["memory_hits"] += 1
+
+        if payload is None and self._redis is not None:
+            try:
+                payload = self._redis.get(self.prefix + key)
+            except Exception as e:
+                print(f"Redis cache read failed: {e}")
+                self._count("redis_errors")
+                payload = None
+            if payload is not None:
+                self._count("redis_hits")
+                self._store_memory(key, payload)
+
+        if payload is None:
+            self._count("misses")
+            return None
+        return json.loads(payload)
+
+    def set(self, key, result):
+        """Store a JSON serialisable result under key in every tier"""
+        payload = json.dumps(result).encode('utf-8')
+        self._store_memory(key, payload)
+        self._count("stores")
+
+        if self._redis is not None:
+            try:
+                self._redis.set(self.prefix + key, payload, ex=self.ttl or None)
+            except Exception as e:
+                print(f"Redis cache write failed: {e}")
+                self._count("redis_errors")
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.stats_counters)
+            entries = len(self._entries)
+            size = self._size
+        hits = counters["memory_hits"] + counters["redis_hits"]
+        lookups = hits + counters["misses"]
+        counters.update({
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": entries,
+            "memory_bytes": size,
+            "memory_max_bytes": self.max_bytes,
+            "redis_enabled": self._redis is not None
+        })
+        return counters
@@ -0,0 +1,48 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+    print("brotli is not installed, responses are only compressed with gzip")
+
+# Fast settings: responses are compressed once per request, not archived
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Text bodies worth compressing; streams are left alone so events aren't held back
+COMPRESSIBLE_TYPES = ('application/json', 'text/plain', 'text/csv', 'text/html')
+
+
+def accepted_encoding(accept_encoding):
+    """'br', 'gzip' or None: the available coding the Accept-Encoding header ranks highest
+
+    Codings the client rates q=0 are refused; on equal q brotli wins.
+    """
+    ranks = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding.strip():
+            ranks[coding.strip().lower()] = quality
+
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best = max(available, key=lambda coding: ranks.get(coding, ranks.get('*', 0.0)))
+    return best if ranks.get(best, ranks.get('*', 0.0)) > 0 else None
+
+
+def compressible(content_type, size, min_size):
+    return size >= min_size and (content_type or '').split(';')[0].strip() in COMPRESSIBLE_TYPES
+
+
+def compress(body, coding):
+    if coding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
@@ -0,0 +1,185 @@
+import io
+import csv
+import codecs
+import time
+
+from spreadsheets import MAX_COLUMNS
+from uploads import open_source, source_size
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None
+    print("charset_normalizer is not installed, non-UTF-8 CSV files are read as cp1252")
+
+# Bytes from the start of the file used to guess the encoding and dialect
+SNIFF_BYTES = 64 * 1024
+SNIFF_DELIMITERS = ',;\t|'
+
+# Rows per "rows" event when streaming
+STREAM_BATCH_ROWS = 1000
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+DELIMITER_NAMES = {',': 'comma', ';': 'semicolon', '\t': 'tab', '|': 'pipe'}
+
+
+def detect_encoding(sample):
+    """Encoding of a byte sample: BOM, then UTF-8, then charset_normalizer's best guess"""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    if from_bytes is not None:
+        match = from_bytes(sample).best()
+        if match is not None:
+            return match.encoding
+    return 'cp1252'
+
+
+def detect_dialect(text):
+    """(csv dialect, has header row) guessed from the start of a CSV; excel when unsure"""
+    # Only whole lines, so the sniffer doesn't see a cut-off row
+    end = text.rfind('\n')
+    sample = text[:end + 1] if end > 0 else text
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(sample, delimiters=SNIFF_DELIMITERS)
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        has_header = sniffer.has_header(sample)
+    except csv.Error:
+        has_header = False
+    return dialect, has_header
+
+
+class CsvTable:
+    """Rows of a CSV, read lazily from a binary stream within row and column limits
+
+    The encoding and dialect are sniffed from the first SNIFF_BYTES when the
+    table is created. Iterating yields rows as lists of cell texts (blank
+    lines skipped) and stops at max_rows; rows wider than max_columns are cut.
+    Only the row being read is in memory, and csv's field size limit bounds
+    that even for a quote that is never closed. After iterating, rows,
+    columns and truncated describe what was read.
+    """
+
+    def __init__(self, f, max_rows=None, max_columns=MAX_COLUMNS):
+        self.f = f
+        self.max_rows = max_rows
+        self.max_columns = max_columns
+        sample = f.read(SNIFF_BYTES)
+        f.seek(0)
+        self.encoding = detect_encoding(sample)
+        self.dialect, self.has_header = detect_dialect(sample.decode(self.encoding, errors='ignore'))
+        self.rows = 0
+        self.columns = 0
+        self.truncated = False
+
+    @property
+    def info(self):
+        return {
+            "encoding": self.encoding,
+            "delimiter": DELIMITER_NAMES.get(self.dialect.delimiter, self.dialect.delimiter),
+            "quotechar": self.dialect.quotechar,
+            "has_header": self.has_header
+        }
+
+    def stats(self):
+        return {
+            **self.info,
+            "rows": self.rows,
+            "columns": self.columns,
+            "truncated": self.truncated,
+            "max_rows": self.max_rows,
+            "max_columns": self.max_columns
+        }
+
+    def __iter__(self):
+        text = io.TextIOWrapper(self.f, encoding=self.encoding, errors='replace', newline='')
+        try:
+            for row in csv.reader(text, self.dialect):
+                if not any(row):
+                    continue
+                if self.max_rows is not None and self.rows >= self.max_rows:
+                    self.truncated = True
+                    return
+                if len(row) > self.max_columns:
+                    row = row[:self.max_columns]
+                    self.truncated = True
+                self.rows += 1
+                self.columns = max(self.columns, len(row))
+                yield row
+        finally:
+            # Leave the underlying file (or in-memory buffer) to its owner
+            text.detach()
+
+
+def row_text(row):
+    return ' | '.join(row)
+
+
+def _rows_event(number, first_row, rows, structured):
+    event = {"event": "rows", "batch": number, "first_row": first_row, "row_count": len(rows)}
+    if structured:
+        event["rows"] = rows
+    else:
+        event["text"] = '\n'.join(row_text(row) for row in rows)
+    return event
+
+
+def iter_csv_events(source, filename, max_rows=None, max_columns=MAX_COLUMNS, structured=False):
+    """Yield CSV extraction events as the file is read
+
+    Like iter_pdf_pages: one "start" with the sniffed encoding and dialect,
+    then "rows" events of STREAM_BATCH_ROWS rows each (as text lines, or as
+    lists of cells when structured), then "end" (or "error"). Nothing is
+    kept once sent, so memory stays flat however large the file is.
+    """
+    start = time.perf_counter()
+
+    try:
+        with open_source(source) as f:
+            table = CsvTable(f, max_rows, max_columns)
+            yield {
+                "event": "start",
+                "filename": filename,
+                "file_size_bytes": source_size(source),
+                **table.info
+            }
+
+            batches = 0
+            batch = []
+            first_row = 1
+            for row in table:
+                batch.append(row)
+                if len(batch) >= STREAM_BATCH_ROWS:
+                    batches += 1
+                    yield _rows_event(batches, first_row, batch, structured)
+                    first_row += len(batch)
+                    batch = []
+            if batch:
+                batches += 1
+                yield _rows_event(batches, first_row, batch, structured)
+
+        yield {
+            "event": "end",
+            "filename": filename,
+            "batches": batches,
+            **table.stats(),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+
+    except Exception as e:
+        yield {"event": "error", "filename": filename, "error": f"CSV processing failed: {str(e)}"}
+
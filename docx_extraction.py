@@ -0,0 +1,228 @@
+import zipfile
+from xml.etree import ElementTree
+
+from ooxml import R_NS, main_part, part_relationships
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+BODY = f'{{{W_NS}}}body'
+HEADER = f'{{{W_NS}}}hdr'
+FOOTER = f'{{{W_NS}}}ftr'
+P = f'{{{W_NS}}}p'
+R = f'{{{W_NS}}}r'
+HYPERLINK = f'{{{W_NS}}}hyperlink'
+TBL = f'{{{W_NS}}}tbl'
+TR = f'{{{W_NS}}}tr'
+TC = f'{{{W_NS}}}tc'
+SECT_PR = f'{{{W_NS}}}sectPr'
+VAL = f'{{{W_NS}}}val'
+TYPE = f'{{{W_NS}}}type'
+
+# Text equivalents of run content, as python-docx reads them
+RUN_TEXT = {
+    f'{{{W_NS}}}tab': '\t',
+    f'{{{W_NS}}}ptab': '\t',
+    f'{{{W_NS}}}cr': '\n',
+    f'{{{W_NS}}}noBreakHyphen': '-',
+}
+
+
+def _run_text(run):
+    parts = []
+    for child in run:
+        if child.tag == f'{{{W_NS}}}t':
+            parts.append(child.text or '')
+        elif child.tag == f'{{{W_NS}}}br':
+            # Page and column breaks have no text
+            if child.get(TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            parts.append(RUN_TEXT.get(child.tag, ''))
+    return ''.join(parts)
+
+
+def paragraph_text(paragraph):
+    """Text of the runs and hyperlinks directly in a w:p"""
+    parts = []
+    for child in paragraph:
+        if child.tag == R:
+            parts.append(_run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(_run_text(run) for run in child if run.tag == R)
+    return ''.join(parts)
+
+
+def _row_cells(row, cells_above):
+    """Cell texts of a w:tr, one per grid column a cell spans, and {grid offset: text}
+
+    Vertically merged continuation cells repeat the text of the cell they
+    continue, found at the same grid offset in the row above.
+    """
+    texts = []
+    by_offset = {}
+    offset = 0
+    properties = row.find(f'{{{W_NS}}}trPr')
+    if properties is not None:
+        grid_before = properties.find(f'{{{W_NS}}}gridBefore')
+        if grid_before is not None:
+            offset = int(grid_before.get(VAL, 0))
+
+    for cell in row:
+        if cell.tag != TC:
+            continue
+        span = 1
+        continued = False
+        properties = cell.find(f'{{{W_NS}}}tcPr')
+        if properties is not None:
+            grid_span = properties.find(f'{{{W_NS}}}gridSpan')
+            if grid_span is not None:
+                span = int(grid_span.get(VAL, 1))
+            v_merge = properties.find(f'{{{W_NS}}}vMerge')
+            continued = v_merge is not None and v_merge.get(VAL, 'continue') == 'continue'
+
+        if continued:
+            text = cells_above.get(offset, '')
+        else:
+            text = '\n'.join(paragraph_text(p) for p in cell if p.tag == P)
+        by_offset[offset] = text
+        texts.extend([text] * span)
+        offset += span
+    return texts, by_offset
+
+
+def _section_references(sect_pr):
+    """(default header relationship id, default footer relationship id) of a w:sectPr"""
+    references = []
+    for tag in ('headerReference', 'footerReference'):
+        rel_id = None
+        for reference in sect_pr.findall(f'{{{W_NS}}}{tag}'):
+            if reference.get(TYPE) == 'default':
+                rel_id = reference.get(f'{{{R_NS}}}id')
+        references.append(rel_id)
+    return tuple(references)
+
+
+def iter_blocks(stream):
+    """Yield the top-level blocks of a WordprocessingML part as they are parsed
+
+    ("p", text) for each paragraph, ("tbl", rows of cell texts) for each table
+    and ("sectPr", (header id, footer id)) for each section break, in document
+    order. Only direct children of w:body (or w:hdr/w:ftr) count, like
+    python-docx's paragraphs and tables. Each block is dropped from the tree
+    once parsed and table rows as they end, so memory holds one row at a time.
+    """
+    containers = (BODY, HEADER, FOOTER)
+    parents = []
+    rows = None
+    cells_above = {}
+
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            if element.tag == TBL and parents[-2].tag in containers:
+                rows = []
+                cells_above = {}
+            continue
+
+        parents.pop()
+        parent = parents[-1] if parents else None
+        if parent is None:
+            continue
+
+        if element.tag == TR and rows is not None and parent.tag == TBL and parents[-2].tag in containers:
+            cells, cells_above = _row_cells(element, cells_above)
+            rows.append(cells)
+            parent.remove(element)
+        elif parent.tag in containers:
+            if element.tag == P:
+                yield "p", paragraph_text(element)
+                sect_pr = element.find(f'{{{W_NS}}}pPr/{{{W_NS}}}sectPr')
+                if sect_pr is not None:
+                    yield "sectPr", _section_references(sect_pr)
+            elif element.tag == TBL:
+                yield "tbl", rows
+                rows = None
+            elif element.tag == SECT_PR:
+                yield "sectPr", _section_references(element)
+            parent.remove(element)
+
+
+def _part_paragraphs(archive, part):
+    with archive.open(part) as stream:
+        return [text for kind, text in iter_blocks(stream) if kind == "p"]
+
+
+def read_docx_stream(f):
+    """Paragraphs, tables, headers/footers and section count of a DOCX
+
+    document.xml is read with iterparse; header and footer parts are read
+    once each, however many sections use them. Sections without their own
+    default header or footer inherit the previous section's, as in Word.
+    """
+    with zipfile.ZipFile(f) as archive:
+        document = main_part(archive, 'word/document.xml')
+        relationships = part_relationships(archive, document)
+
+        paragraphs = []
+        tables = []
+        sections = []
+        with archive.open(document) as stream:
+            for kind, block in iter_blocks(stream):
+                if kind == "p":
+                    paragraphs.append(block)
+                elif kind == "tbl":
+                    tables.append(block)
+                else:
+                    sections.append(block)
+
+        headers_footers = []
+        parts = {}
+        inherited = [None, None]
+        for references in sections:
+            for index, (rel_id, label) in enumerate(zip(references, ('HEADER', 'FOOTER'))):
+                if rel_id is not None and rel_id in relationships:
+                    inherited[index] = relationships[rel_id][1]
+                part = inherited[index]
+                if part is None or part not in archive.NameToInfo:
+                    continue
+                if part not in parts:
+                    parts[part] = _part_paragraphs(archive, part)
+                headers_footers.extend(f"[{label}] {text.strip()}" for text in parts[part] if text.strip())
+
+    return {
+        "paragraphs": paragraphs,
+        "tables": tables,
+        "headers_footers": headers_footers,
+        "sections": len(sections),
+        "parser": "DOCX streaming XML"
+    }
+
+
+def read_docx_python_docx(f):
+    """read_docx_stream's output built through python-docx's object model"""
+    from docx import Document
+
+    doc = Document(f)
+    headers_footers = []
+    for section in doc.sections:
+        for label, part in (('HEADER', section.header), ('FOOTER', section.footer)):
+            if part:
+                headers_footers.extend(f"[{label}] {p.text.strip()}" for p in part.paragraphs if p.text.strip())
+
+    return {
+        "paragraphs": [para.text for para in doc.paragraphs],
+        "tables": [[[cell.text for cell in row.cells] for row in table.rows] for table in doc.tables],
+        "headers_footers": headers_footers,
+        "sections": len(doc.sections),
+        "parser": "python-docx"
+    }
+
+
+def read_docx(f):
+    """read_docx_stream, falling back to python-docx for documents it can't read"""
+    try:
+        return read_docx_stream(f)
+    except Exception as e:
+        print(f"Streaming DOCX parse failed, falling back to python-docx: {e}")
+    f.seek(0)
+    return read_docx_python_docx(f)
@@ -0,0 +1,1483 @@
+import io
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from ocr import run_ocr_passes, detect_languages, parse_languages
+from pdf_extraction import ocr_pdf_pages, page_needs_ocr
+from pdf_backends import DEFAULT_PDF_BACKEND, get_pdf_backend, pdf_backend_class
+from uploads import open_source, source_size
+from sniffing import ALIASES, sniff_source
+from spreadsheets import MAX_COLUMNS, iter_ods_sheets, iter_xlsx_sheets, read_sheets
+from slides import read_odp, read_pptx, slide_images
+from docx_extraction import read_docx
+from html_extraction import html_to_text
+from xml_extraction import iter_xml_text, parse_element_filters
+from csv_extraction import CsvTable, row_text
+from json_extraction import iter_json_strings, json_parser_name
+from rtf_extraction import iter_rtf_text
+
+# Cost classes: light formats are plain parsing, heavy ones render pages or run OCR
+LIGHT = 'light'
+HEAVY = 'heavy'
+
+
+class ExtractionContext:
+    """Everything an extractor needs to know about one upload
+
+    source is a file path or, for uploads kept in memory, a binary buffer.
+    file_format is what the content turned out to be (the extension is
+    only a hint); extractors are picked by it. raw (mode=raw) asks for the
+    extracted text without the rendered banner. Extractors of paged formats
+    call on_page(number, text, method) as each page is settled, in any order.
+    """
+
+    def __init__(self, source, filename, options=None, progress=None, ocr_pool=None, config=None, on_page=None):
+        self.source = source
+        self.filename = filename
+        self.options = options or {}
+        self.progress = progress or (lambda done, total: None)
+        self.on_page = on_page or (lambda number, text, method: None)
+        self.ocr_pool = ocr_pool
+        self.config = config or {}
+        self.file_size = source_size(source)
+        self.file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'unknown'
+        self.file_format, self.mime_type, self.detected_by = sniff_source(source, self.file_extension)
+        self.extension_matches = self.file_format == ALIASES.get(self.file_extension, self.file_extension)
+        self.raw = self.options.get('mode', '').lower() == 'raw'
+
+    def open(self):
+        """Binary file object for the upload"""
+        return open_source(self.source)
+
+    @contextmanager
+    def open_text(self):
+        """The upload as UTF-8 text, undecodable bytes dropped"""
+        with self.open() as f:
+            text = io.TextIOWrapper(f, encoding='utf-8', errors='ignore')
+            try:
+                yield text
+            finally:
+                # Leave the underlying file (or in-memory buffer) to open_source
+                text.detach()
+
+    @property
+    def size_label(self):
+        return f"{self.file_size:,} bytes ({self.file_size/1024/1024:.2f} MB)"
+
+
+class ExtractionResult:
+    """Uniform extractor output
+
+    content is the extracted text without any decoration, method describes how
+    it was obtained and details holds structured fields that are merged into
+    the JSON response. extras carries data only needed to render the banner.
+    degraded says why a result is incomplete (OCR that failed or was not
+    available, a failed extraction); such results are never cached. pages,
+    for paged formats, holds (number, method, start, end) per page, where
+    content[start:end] is the page's text.
+    """
+
+    def __init__(self, content="", method="", details=None, extras=None, degraded=None, pages=None):
+        self.content = content
+        self.method = method
+        self.details = details or {}
+        self.extras = extras or {}
+        self.degraded = degraded
+        self.pages = pages
+
+    def page_texts(self):
+        """(page number, text, method) per page; content that isn't paged is page 1"""
+        if self.pages is None:
+            yield 1, self.content.strip(), self.method
+            return
+        for number, method, start, end in self.pages:
+            yield number, self.content[start:end].strip(), method
+
+    def as_dict(self):
+        """JSON form of the result, for the extraction cache"""
+        return {
+            "content": self.content,
+            "method": self.method,
+            "details": self.details,
+            "extras": self.extras,
+            "degraded": self.degraded,
+            "pages": self.pages
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['content'], data['method'], data['details'], data['extras'], data['degraded'], data['pages'])
+
+
+class Extractor:
+    """Base class for per-format extractors
+
+    Subclasses declare the extensions they handle, the modules they import
+    (so they can be preloaded and checked), their cost class, and implement
+    extract(). render() turns a result into the decorated full_text and
+    render_error() describes a failure.
+    """
+
+    name = 'base'
+    extensions = ()
+    requires = ()
+    cost = LIGHT
+    error_method = "Error handling"
+
+    @classmethod
+    def missing_dependencies(cls):
+        """Import every required module; return the ones that are not installed"""
+        missing = []
+        for module in cls.requires:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                missing.append(module)
+        return missing
+
+    def extract(self, ctx):
+        raise NotImplementedError
+
+    def render(self, result, ctx):
+        return result.content
+
+    def render_error(self, error, ctx):
+        return f"Error processing file: {str(error)}\n\nThis might be a binary file or corrupted document. The full Kreuzberg version would handle this more gracefully."
+
+
+class ExtractorRegistry:
+    """Maps file extensions (and names) to extractor classes"""
+
+    def __init__(self):
+        self._by_extension = {}
+        self._by_name = {}
+        self.fallback = None
+
+    def register(self, cls):
+        """Class decorator adding an extractor to the registry"""
+        self._by_name[cls.name] = cls
+        for extension in cls.extensions:
+            self._by_extension[extension] = cls
+        return cls
+
+    def register_fallback(self, cls):
+        """Class decorator for the extractor used when no extension matches"""
+        self.register(cls)
+        self.fallback = cls
+        return cls
+
+    def get(self, extension):
+        return self._by_extension.get(extension, self.fallback)()
+
+    def get_by_name(self, name):
+        return self._by_name[name]()
+
+    def preload(self):
+        """Import every extractor's dependencies up front; return {name: missing modules}"""
+        return {name: cls.missing_dependencies() for name, cls in self._by_name.items()}
+
+    def describe(self):
+        return [
+            {
+                "name": cls.name,
+                "extensions": list(cls.extensions),
+                "cost": cls.cost,
+                "requires": list(cls.requires)
+            }
+            for cls in self._by_name.values()
+        ]
+
+
+registry = ExtractorRegistry()
+
+
+class ExtractorScheduler:
+    """Runs extractors on separate worker pools per cost class and times them
+
+    Light formats can't queue behind OCR work, and the heavy pool bounds how
+    many OCR/rendering extractions run at once.
+    """
+
+    def __init__(self, registry, light_workers=4, heavy_workers=2):
+        self.registry = registry
+        self._pools = {
+            LIGHT: ThreadPoolExecutor(max_workers=light_workers, thread_name_prefix='extract-light'),
+            HEAVY: ThreadPoolExecutor(max_workers=heavy_workers, thread_name_prefix='extract-heavy')
+        }
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def _record(self, extractor, seconds, failed):
+        with self._lock:
+            timing = self._timings.setdefault(extractor.name, {
+                "cost": extractor.cost, "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0
+            })
+            timing["calls"] += 1
+            timing["errors"] += int(failed)
+            timing["total_ms"] += seconds * 1000
+            timing["max_ms"] = max(timing["max_ms"], seconds * 1000)
+
+    def _execute(self, extractor, ctx):
+        start = time.perf_counter()
+        try:
+            result = extractor.extract(ctx)
+            full_text = self._render(extractor, result, ctx)
+            failed = False
+        except Exception as e:
+            result = ExtractionResult(method=extractor.error_method, extras={'error': str(e)}, degraded=str(e))
+            full_text = "" if ctx.raw else extractor.render_error(e, ctx)
+            failed = True
+        elapsed = time.perf_counter() - start
+        self._record(extractor, elapsed, failed)
+        result.details['extractor'] = {
+            "name": extractor.name,
+            "cost": extractor.cost,
+            "elapsed_ms": round(elapsed * 1000, 1)
+        }
+        return result, full_text
+
+    @staticmethod
+    def _render(extractor, result, ctx):
+        return result.content if ctx.raw else extractor.render(result, ctx)
+
+    def render(self, result, ctx):
+        """full_text for a result extracted earlier (e.g. from the cache), for this request's ctx"""
+        return self._render(self.registry.get_by_name(result.details['extractor']['name']), result, ctx)
+
+    def submit(self, ctx, extractor=None):
+        """Queue ctx's file on the pool for its cost class; the future resolves to (result, full_text)"""
+        extractor = extractor or self.registry.get(ctx.file_format)
+        return self._pools[extractor.cost].submit(self._execute, extractor, ctx)
+
+    def run(self, ctx, extractor=None):
+        return self.submit(ctx, extractor).result()
+
+    def timings(self):
+        with self._lock:
+            timings = {name: dict(timing) for name, timing in self._timings.items()}
+        for timing in timings.values():
+            timing["avg_ms"] = round(timing["total_ms"] / timing["calls"], 1) if timing["calls"] else 0.0
+            timing["total_ms"] = round(timing["total_ms"], 1)
+            timing["max_ms"] = round(timing["max_ms"], 1)
+        return timings
+
+
+def read_text_file(ctx):
+    with ctx.open_text() as f:
+        return f.read()
+
+
+@registry.register
+class TextExtractor(Extractor):
+    name = 'text'
+    extensions = ('txt',)
+
+    def extract(self, ctx):
+        return ExtractionResult(read_text_file(ctx), "Direct text reading")
+
+
+@registry.register
+class MarkdownExtractor(Extractor):
+    name = 'markdown'
+    extensions = ('md', 'markdown')
+
+    def extract(self, ctx):
+        return ExtractionResult(read_text_file(ctx), "Markdown text reading")
+
+
+@registry.register
+class HtmlExtractor(Extractor):
+    name = 'html'
+    extensions = ('html', 'htm')
+
+    def extract(self, ctx):
+        # Single pass over the file in chunks: no full copy, no regex backtracking
+        with ctx.open() as f:
+            extracted_text = html_to_text(f)
+        return ExtractionResult(extracted_text, "HTML text extraction")
+
+
+def csv_limits(options, config, stream=False):
+    """(max_rows, max_columns) for a CSV request: max_rows/max_columns options within the caps
+
+    JSON responses default to CSV_MAX_ROWS and are capped at CSV_ROW_LIMIT.
+    Streamed rows are never held together, so they are only limited on request.
+    """
+    default_rows = None if stream else config['CSV_MAX_ROWS']
+    try:
+        max_rows = int(options['max_rows']) if options.get('max_rows') else default_rows
+    except ValueError:
+        max_rows = default_rows
+    if max_rows is not None:
+        max_rows = max(1, max_rows if stream else min(max_rows, config['CSV_ROW_LIMIT']))
+
+    try:
+        max_columns = int(options.get('max_columns') or MAX_COLUMNS)
+    except ValueError:
+        max_columns = MAX_COLUMNS
+    return max_rows, max(1, min(max_columns, MAX_COLUMNS))
+
+
+@registry.register
+class CsvExtractor(Extractor):
+    name = 'csv'
+    extensions = ('csv',)
+
+    def extract(self, ctx):
+        # Encoding and dialect sniffed from a sample, then one row at a time; csv_rows=1 adds the cells
+        max_rows, max_columns = csv_limits(ctx.options, ctx.config)
+        structured = option_enabled(ctx.options, 'csv_rows')
+        lines = []
+        rows = []
+        with ctx.open() as f:
+            table = CsvTable(f, max_rows, max_columns)
+            for row in table:
+                lines.append(row_text(row))
+                if structured:
+                    rows.append(row)
+        if table.truncated:
+            lines.append(f"[... truncated after {table.rows} rows, at most {max_columns} columns per row]")
+
+        details = {"csv_stats": table.stats()}
+        if structured:
+            details["rows"] = rows
+        method = f"CSV streaming parse ({table.info['delimiter']}-delimited, {table.encoding})"
+        return ExtractionResult('\n'.join(lines), method, details)
+
+
+def json_max_chars(options, config):
+    """Output size cutoff for a JSON request: max_chars option, else JSON_MAX_CHARS, within JSON_CHAR_LIMIT"""
+    try:
+        max_chars = int(options.get('max_chars') or config['JSON_MAX_CHARS'])
+    except ValueError:
+        max_chars = config['JSON_MAX_CHARS']
+    return max(1, min(max_chars, config['JSON_CHAR_LIMIT']))
+
+
+@registry.register
+class JsonExtractor(Extractor):
+    name = 'json'
+    extensions = ('json',)
+
+    def extract(self, ctx):
+        # String values only, read token by token; json_paths=1 prefixes each with its JSONPath
+        max_chars = json_max_chars(ctx.options, ctx.config)
+        with_paths = option_enabled(ctx.options, 'json_paths')
+        lines = []
+        chars = 0
+        truncated = False
+        try:
+            with ctx.open() as f:
+                for path, value in iter_json_strings(f, with_paths):
+                    line = f"{path}: {value}" if with_paths else value
+                    if chars + len(line) > max_chars:
+                        truncated = True
+                        break
+                    lines.append(line)
+                    chars += len(line) + 1
+        except ValueError:
+            # If parsing fails, just return raw content (up to the cutoff)
+            with ctx.open_text() as f:
+                raw = f.read(max_chars + 1)
+            return ExtractionResult(raw[:max_chars], "JSON text extraction (invalid JSON, raw text)", {
+                "json_stats": {"strings": 0, "truncated": len(raw) > max_chars, "max_chars": max_chars}
+            })
+
+        details = {"json_stats": {"strings": len(lines), "truncated": truncated, "max_chars": max_chars}}
+        if truncated:
+            lines.append(f"[... truncated after {len(lines)} strings, {max_chars:,} characters]")
+        return ExtractionResult('\n'.join(lines), f"JSON string values ({json_parser_name()})", details)
+
+
+@registry.register
+class RtfExtractor(Extractor):
+    name = 'rtf'
+    extensions = ('rtf',)
+
+    def extract(self, ctx):
+        # Single tokenizer pass; font tables, metadata and embedded images are skipped, not stripped
+        with ctx.open() as f:
+            extracted_text = ''.join(iter_rtf_text(f)).strip()
+        return ExtractionResult(extracted_text, "RTF text extraction")
+
+
+@registry.register
+class XmlExtractor(Extractor):
+    name = 'xml'
+    extensions = ('xml',)
+
+    def extract(self, ctx):
+        # iterparse, dropping elements as it goes; xml_elements keeps only matching elements' text
+        filters = parse_element_filters(ctx.options.get('xml_elements'))
+        with ctx.open() as f:
+            lines = list(iter_xml_text(f, filters))
+        details = {
+            "xml_stats": {
+                "lines": len(lines),
+                "xml_elements": [expression for expression, _, _ in filters]
+            }
+        }
+        method = "XML streaming parse" + (" (element filters)" if filters else "")
+        return ExtractionResult('\n'.join(lines), method, details)
+
+
+# Options that change what an extractor produces; the others (format,
+# csv_split, stream, mode) only change how the result is sent
+EXTRACTION_OPTIONS = (
+    'languages', 'pdf_backend', 'ocr_max_pages', 'ocr_dpi', 'ocr_images', 'xml_elements',
+    'json_paths', 'max_chars', 'csv_rows', 'max_rows', 'max_columns', 'max_cells'
+)
+
+
+def extraction_options(options):
+    """The options that change an extraction, e.g. for cache keys"""
+    return {key: options[key] for key in EXTRACTION_OPTIONS if key in options}
+
+
+def validate_options(options):
+    """Raise ValueError for an option value no extractor can work with
+
+    Routes check this before any work is queued, so a bad value is a 400 on
+    every path instead of a failed extraction on some of them.
+    """
+    if options.get('pdf_backend'):
+        pdf_backend_class(options['pdf_backend'])
+    parse_element_filters(options.get('xml_elements'))
+
+
+def resolve_pdf_backend(options, config):
+    """PDF text backend for a request: pdf_backend option, else PDF_BACKEND config
+
+    Falls back to PyPDF2 (with a note) when the chosen backend's library is
+    not installed; unknown names raise ValueError.
+    """
+    name = options.get('pdf_backend') or config.get('PDF_BACKEND', DEFAULT_PDF_BACKEND)
+    try:
+        return get_pdf_backend(name), None
+    except ImportError as e:
+        return get_pdf_backend(DEFAULT_PDF_BACKEND), f"PDF backend '{name}' is not installed ({e}), used PyPDF2"
+
+
+def pdf_ocr_settings(options, config):
+    """(page budget, DPI) for PDF OCR: config defaults, optionally overridden per request"""
+    try:
+        max_pages = int(options.get('ocr_max_pages') or config['PDF_OCR_MAX_PAGES'])
+    except ValueError:
+        max_pages = config['PDF_OCR_MAX_PAGES']
+    try:
+        dpi = int(options.get('ocr_dpi') or config['PDF_OCR_DPI'])
+    except ValueError:
+        dpi = config['PDF_OCR_DPI']
+
+    max_pages = max(1, min(max_pages, config['PDF_OCR_PAGE_LIMIT']))
+    dpi = max(72, min(dpi, 600))
+    return max_pages, dpi
+
+
+@registry.register
+class PdfExtractor(Extractor):
+    """Hybrid PDF extraction: text layer where it exists, OCR for the other pages"""
+
+    name = 'pdf'
+    extensions = ('pdf',)
+    requires = ('PyPDF2', 'pdf2image', 'pytesseract')
+    cost = HEAVY
+    error_method = "PDF Error"
+
+    def extract(self, ctx):
+        details = {}
+        backend, backend_note = resolve_pdf_backend(ctx.options, ctx.config)
+        details['pdf_backend'] = backend.name
+        if backend_note:
+            details['pdf_backend_note'] = backend_note
+
+        max_pages, dpi = pdf_ocr_settings(ctx.options, ctx.config)
+        with backend.open(ctx.source) as pdf_document:
+            num_pages = pdf_document.page_count
+
+            # Extract the text layer and note pages that need OCR
+            page_texts = {}
+            needs_ocr = []
+            for page_num, page_text in enumerate(pdf_document.iter_page_texts()):
+                if page_needs_ocr(page_text):
+                    needs_ocr.append(page_num + 1)
+                else:
+                    page_texts[page_num + 1] = page_text
+                    ctx.on_page(page_num + 1, page_text.strip(), 'text_layer')
+                # A page is done once read, unless it still waits for OCR within the budget
+                ctx.progress(len(page_texts) + max(0, len(needs_ocr) - max_pages), num_pages)
+
+        # OCR only the pages without a usable text layer, in parallel
+        ocr_page_numbers = needs_ocr[:max_pages]
+        ocr_texts, ocr_errors = {}, {}
+        ocr_unavailable = None
+        if ocr_page_numbers:
+            settled = num_pages - len(ocr_page_numbers)
+            try:
+                ocr_texts, ocr_errors = ocr_pdf_pages(
+                    ctx.ocr_pool, ctx.source, ocr_page_numbers, dpi=dpi,
+                    progress=lambda done, total: ctx.progress(settled + done, num_pages)
+                )
+            except Exception as ocr_error:
+                ocr_unavailable = str(ocr_error)
+        ctx.progress(num_pages, num_pages)
+
+        # Assemble pages in order and record how each one was handled
+        all_text = []
+        page_report = []
+        pages = []
+        offset = 0  # Where the next page's text starts in the joined content
+        for page_number in range(1, num_pages + 1):
+            if page_number in page_texts:
+                marker, page_text = f"--- Page {page_number} ---\n", page_texts[page_number]
+                page = {'page': page_number, 'method': 'text_layer'}
+            elif ocr_texts.get(page_number, '').strip():
+                marker, page_text = f"--- Page {page_number} (OCR) ---\n", ocr_texts[page_number]
+                page = {'page': page_number, 'method': 'ocr'}
+            else:
+                marker, page_text = None, ""
+                if page_number in ocr_errors or (ocr_unavailable and page_number in ocr_page_numbers):
+                    page = {
+                        'page': page_number,
+                        'method': 'ocr_failed',
+                        'error': ocr_errors.get(page_number, ocr_unavailable)
+                    }
+                elif page_number in ocr_page_numbers:
+                    page = {'page': page_number, 'method': 'ocr_no_text'}
+                else:
+                    page = {'page': page_number, 'method': 'skipped_ocr_budget'}
+            page_report.append(page)
+
+            start = offset
+            if marker is not None:
+                all_text.append(marker + page_text)
+                start = offset + len(marker)
+                offset = start + len(page_text) + 1
+            pages.append((page_number, page['method'], start, start + len(page_text)))
+            if page['method'] != 'text_layer':
+                ctx.on_page(page_number, page_text.strip(), page['method'])
+
+        text_pages = len(page_texts)
+        ocr_pages = sum(1 for page in page_report if page['method'] == 'ocr')
+        failed_pages = sum(1 for page in page_report if page['method'] == 'ocr_failed')
+        degraded = None
+        if ocr_unavailable:
+            degraded = f"OCR unavailable: {ocr_unavailable}"
+        elif failed_pages:
+            degraded = f"OCR failed on {failed_pages} page(s)"
+        details['pages'] = page_report
+        details['total_pages'] = num_pages
+        if ocr_page_numbers:
+            details['ocr'] = {
+                'pages_needing_ocr': len(needs_ocr),
+                'pages_budget': max_pages,
+                'dpi': dpi,
+                'pages_processed': len(ocr_page_numbers)
+            }
+
+        if all_text:
+            if ocr_pages and text_pages:
+                method = f"PDF Hybrid Extraction ({text_pages} text layer, {ocr_pages} OCR pages)"
+            elif ocr_pages:
+                method = f"PDF OCR Extraction ({ocr_pages} pages)"
+            else:
+                method = f"PDF Text Extraction ({num_pages} pages)"
+        elif ocr_unavailable:
+            method = "PDF Processing (Limited)"
+        else:
+            method = "PDF Processing (No text found)"
+
+        return ExtractionResult(chr(10).join(all_text), method, details, degraded=degraded, pages=pages, extras={
+            'backend_label': backend.label,
+            'num_pages': num_pages,
+            'text_pages': text_pages,
+            'ocr_pages': ocr_pages,
+            'skipped_pages': len(needs_ocr) - len(ocr_page_numbers),
+            'max_pages': max_pages,
+            'ocr_unavailable': ocr_unavailable
+        })
+
+    def render(self, result, ctx):
+        extras = result.extras
+        num_pages = extras['num_pages']
+
+        if result.content:
+            if extras['ocr_pages'] and extras['text_pages']:
+                method_line = "Text layer + OCR for pages without text"
+            elif extras['ocr_pages']:
+                method_line = "PDF to Image + OCR (No direct text found)"
+            else:
+                method_line = "Direct PDF text extraction"
+
+            skipped_note = ""
+            if extras['skipped_pages']:
+                skipped_note = f"\n{extras['skipped_pages']} page(s) without text were skipped (OCR budget: {extras['max_pages']} pages)."
+
+            return f"""📄 PDF Text Extraction Results
+
+✅ TEXT EXTRACTED SUCCESSFULLY!
+
+Document: {ctx.filename}
+Pages: {num_pages} (text layer: {extras['text_pages']}, OCR: {extras['ocr_pages']})
+Method: {method_line}
+File Size: {ctx.size_label}
+
+==================== EXTRACTED TEXT ====================
+
+{result.content}
+
+=======================================================
+
+Extraction completed using {extras['backend_label']}{' and Tesseract OCR' if extras['ocr_pages'] else ''}.{skipped_note}"""
+
+        if extras['ocr_unavailable']:
+            return f"""📄 PDF Text Extraction Attempted
+
+Document: {ctx.filename}
+Pages: {num_pages}
+File Size: {ctx.size_label}
+
+Direct text extraction found no readable text.
+OCR processing is not available in this configuration.
+
+The PDF may contain:
+- Image-based content requiring OCR
+- Protected or encrypted text
+- Non-standard text encoding"""
+
+        return f"""📄 PDF Processing Complete - No Text Found
+
+Document: {ctx.filename}
+Pages: {num_pages}
+File Size: {ctx.size_label}
+
+This PDF appears to contain no extractable text. This could be because:
+- The PDF contains only images
+- The PDF is password protected
+- The PDF is corrupted
+- Text is embedded as non-extractable content"""
+
+    def render_error(self, error, ctx):
+        return f"""❌ PDF Processing Error
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+
+Error: {str(error)}
+
+This could be due to:
+- Corrupted PDF file
+- Password-protected PDF
+- Unsupported PDF format
+- Processing configuration issue"""
+
+
+@registry.register
+class DocxExtractor(Extractor):
+    """DOCX paragraphs, tables, headers and footers, streamed from the document XML"""
+
+    name = 'docx'
+    extensions = ('docx',)
+    error_method = "python-docx error"
+
+    def extract(self, ctx):
+        with ctx.open() as f:
+            doc = read_docx(f)
+
+        paragraphs = [text.strip() for text in doc['paragraphs'] if text.strip()]
+
+        # One line per table row, empty cells left out
+        table_data = []
+        for table in doc['tables']:
+            for row in table:
+                row_data = [text.strip() for text in row if text.strip()]
+                if row_data:
+                    table_data.append(" | ".join(row_data))
+
+        headers_footers = doc['headers_footers']
+
+        # Combine all extracted content
+        all_content = []
+
+        if headers_footers:
+            all_content.append("=== HEADERS & FOOTERS ===")
+            all_content.extend(headers_footers)
+            all_content.append("")
+
+        if paragraphs:
+            all_content.append("=== DOCUMENT CONTENT ===")
+            all_content.extend(paragraphs)
+            all_content.append("")
+
+        if table_data:
+            all_content.append("=== TABLES ===")
+            all_content.extend(table_data)
+            all_content.append("")
+
+        document_stats = {
+            "total_paragraphs": len(paragraphs),
+            "total_tables": len(doc['tables']),
+            "total_sections": doc['sections'],
+            "headers_footers": len(headers_footers)
+        }
+
+        if all_content:
+            method = f"{doc['parser']} extraction ({len(paragraphs)} paragraphs, {len(doc['tables'])} tables)"
+        else:
+            method = f"{doc['parser']} extraction (No text content)"
+
+        return ExtractionResult("\n".join(all_content), method, extras={
+            'document_stats': document_stats,
+            'all_paragraphs': len(doc['paragraphs']),
+            'parser': doc['parser']
+        })
+
+    def render(self, result, ctx):
+        stats = result.extras['document_stats']
+
+        if not result.content:
+            return f"""📄 DOCX Document Processed - No Text Content Found
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Document Structure: {result.extras['all_paragraphs']} paragraphs, {stats['total_tables']} tables
+
+This DOCX document appears to contain:
+- Empty paragraphs or only formatting
+- Images without text content
+- Complex embedded objects
+- Non-text elements only
+
+The document was successfully opened but no readable text was found."""
+
+        return f"""📄 DOCX Document Extraction Results
+
+✅ TEXT EXTRACTED SUCCESSFULLY!
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Extraction Method: {result.extras['parser']}
+
+📊 Document Structure:
+- Paragraphs: {stats['total_paragraphs']}
+- Tables: {stats['total_tables']}
+- Sections: {stats['total_sections']}
+- Headers/Footers: {stats['headers_footers']}
+
+==================== EXTRACTED CONTENT ====================
+
+{result.content}
+
+=======================================================
+
+🔧 Technical Details:
+- Library: {result.extras['parser']} (specialized DOCX parser)
+- Content Types: Paragraphs, Tables, Headers, Footers
+- Formatting: Preserved structure with section markers
+- Text Processing: Cleaned whitespace and empty elements
+
+💡 DOCX Extraction Features:
+✅ Full paragraph text extraction
+✅ Table content with cell separation
+✅ Headers and footers from all sections
+✅ Maintains document structure
+✅ Handles complex DOCX formatting
+✅ Preserves text content accurately"""
+
+    def render_error(self, error, ctx):
+        return f"""❌ DOCX Processing Error
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+
+Error: {str(error)}
+
+This could be due to:
+- Corrupted DOCX file
+- Password-protected document
+- Unsupported DOCX format/version
+- Document contains complex elements not supported
+- File is not a valid DOCX format
+
+Please ensure the file is a valid, unprotected DOCX document."""
+
+
+@registry.register
+class DocxSummaryExtractor(Extractor):
+    """Layout used by the dedicated /extract/docx endpoint"""
+
+    name = 'docx_summary'
+    error_method = "python-docx error"
+
+    def extract(self, ctx):
+        with ctx.open() as f:
+            doc = read_docx(f)
+
+        # Extract all content
+        all_text_parts = []
+
+        # Paragraphs
+        paragraph_texts = [text.strip() for text in doc['paragraphs'] if text.strip()]
+
+        if paragraph_texts:
+            all_text_parts.append("=== PARAGRAPHS ===")
+            all_text_parts.extend(paragraph_texts)
+
+        # Tables
+        if doc['tables']:
+            all_text_parts.append("\n=== TABLES ===")
+            for i, table in enumerate(doc['tables'], 1):
+                all_text_parts.append(f"\n--- Table {i} ---")
+                for row in table:
+                    row_data = [text.strip() for text in row if text.strip()]
+                    if row_data:
+                        all_text_parts.append(" | ".join(row_data))
+
+        return ExtractionResult("\n".join(all_text_parts), f"{doc['parser']} (dedicated DOCX processor)", {
+            "document_stats": {
+                "total_paragraphs": len(doc['paragraphs']),
+                "total_tables": len(doc['tables']),
+                "total_sections": doc['sections']
+            }
+        })
+
+
+@registry.register
+class LegacyDocExtractor(Extractor):
+    name = 'doc'
+    extensions = ('doc',)
+
+    def extract(self, ctx):
+        return ExtractionResult("", "Legacy DOC format (limited support)")
+
+    def render(self, result, ctx):
+        return f"""📄 Legacy DOC Format Detected
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Format: Microsoft Word DOC (legacy format)
+
+⚠️ LIMITED SUPPORT FOR .DOC FILES
+
+The .DOC format is a legacy binary format that requires specialized libraries.
+This system is optimized for modern .DOCX files using python-docx.
+
+Recommendations:
+1. Convert .DOC to .DOCX using Microsoft Word or LibreOffice
+2. Use "Save As" → "Word Document (.docx)" 
+3. Re-upload the .DOCX version for full text extraction
+
+For .DOCX files, you'll get:
+✅ Complete text extraction
+✅ Table content parsing  
+✅ Headers and footers
+✅ Document structure preservation
+
+Alternative: If this is actually a .DOCX file with wrong extension, try renaming it to .docx"""
+
+
+def spreadsheet_limits(options, config):
+    """(rows per sheet, cells per workbook): config defaults, optionally overridden per request"""
+    try:
+        max_rows = int(options.get('max_rows') or config['SPREADSHEET_MAX_ROWS'])
+    except ValueError:
+        max_rows = config['SPREADSHEET_MAX_ROWS']
+    try:
+        max_cells = int(options.get('max_cells') or config['SPREADSHEET_MAX_CELLS'])
+    except ValueError:
+        max_cells = config['SPREADSHEET_MAX_CELLS']
+
+    max_rows = max(1, min(max_rows, config['SPREADSHEET_ROW_LIMIT']))
+    max_cells = max(1, min(max_cells, config['SPREADSHEET_CELL_LIMIT']))
+    return max_rows, max_cells
+
+
+class SpreadsheetExtractor(Extractor):
+    """Rows of every sheet, read as a stream and cut off at the row and cell limits
+
+    Subclasses provide iter_sheets(f), yielding (sheet name, lazy rows).
+    """
+
+    library = ''
+    error_method = "Spreadsheet error"
+
+    def iter_sheets(self, f):
+        raise NotImplementedError
+
+    def extract(self, ctx):
+        max_rows, max_cells = spreadsheet_limits(ctx.options, ctx.config)
+        with ctx.open() as f:
+            sheets = read_sheets(self.iter_sheets(f), max_rows, max_cells)
+
+        content = []
+        for sheet in sheets:
+            content.append(f"=== SHEET: {sheet['name']} ===")
+            content.extend(" | ".join(cell for cell in row if cell) for row in sheet['rows'])
+            if sheet['truncated']:
+                content.append(f"[... truncated after {len(sheet['rows'])} rows]")
+            content.append("")
+
+        total_rows = sum(len(sheet['rows']) for sheet in sheets)
+        total_cells = sum(len(row) for sheet in sheets for row in sheet['rows'])
+        return ExtractionResult("\n".join(content).strip(), f"{self.library} ({len(sheets)} sheets, {total_rows} rows)", {
+            "sheets": sheets,
+            "spreadsheet_stats": {
+                "sheets_read": len(sheets),
+                "rows": total_rows,
+                "cells": total_cells,
+                "truncated": any(sheet['truncated'] for sheet in sheets) or total_cells >= max_cells,
+                "max_rows": max_rows,
+                "max_cells": max_cells
+            }
+        })
+
+    def render(self, result, ctx):
+        stats = result.details['spreadsheet_stats']
+        file_type = ctx.file_format.upper()
+
+        if not result.content:
+            return f"""📊 {file_type} Spreadsheet Processed - No Cell Content Found
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Sheets: {stats['sheets_read']}
+
+The spreadsheet was successfully opened but every sheet is empty."""
+
+        limits_note = ""
+        if stats['truncated']:
+            limits_note = f"""
+⚠️ Output truncated at the limits ({stats['max_rows']:,} rows per sheet, {stats['max_cells']:,} cells).
+Pass max_rows / max_cells to read more.
+"""
+
+        return f"""📊 {file_type} Spreadsheet Extraction Results
+
+✅ CELLS EXTRACTED SUCCESSFULLY!
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Extraction Method: {self.library} (streaming, read-only)
+
+📊 Workbook Structure:
+- Sheets: {stats['sheets_read']}
+- Rows: {stats['rows']:,}
+- Cells: {stats['cells']:,}
+{limits_note}
+==================== EXTRACTED CONTENT ====================
+
+{result.content}
+
+======================================================="""
+
+    def render_error(self, error, ctx):
+        file_type = ctx.file_format.upper()
+        return f"""❌ {file_type} Processing Error
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+
+Error: {str(error)}
+
+This could be due to:
+- Corrupted spreadsheet
+- Password-protected workbook
+- File is not a valid {file_type} spreadsheet"""
+
+
+@registry.register
+class XlsxExtractor(SpreadsheetExtractor):
+    name = 'xlsx'
+    extensions = ('xlsx',)
+    requires = ('openpyxl',)
+    library = 'openpyxl'
+    error_method = "openpyxl error"
+
+    def iter_sheets(self, f):
+        return iter_xlsx_sheets(f)
+
+
+@registry.register
+class OdsExtractor(SpreadsheetExtractor):
+    name = 'ods'
+    extensions = ('ods',)
+    library = 'ODF content.xml iterparse'
+    error_method = "ODS error"
+
+    def iter_sheets(self, f):
+        return iter_ods_sheets(f)
+
+
+def option_enabled(options, name, default=False):
+    value = options.get(name)
+    if not value:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def ocr_slide_images(ctx, images):
+    """([(slide index, OCR text)], failed count) for (slide index, image) pairs, all queued on the OCR pool at once"""
+    languages = parse_languages(ctx.options.get('languages'))
+    config = f"--oem 3 --psm 3 -l {'+'.join(languages)}" if languages else '--oem 3 --psm 3'
+    futures = [(index, image, ctx.ocr_pool.submit_image_to_string(image, config)) for index, image in images]
+
+    results = []
+    failed = 0
+    for done, (index, image, future) in enumerate(futures, 1):
+        try:
+            text = future.result()[0]
+        except Exception:
+            # Pool worker failure: one more try, through pytesseract if need be
+            try:
+                text = ctx.ocr_pool.image_to_string(image, config)
+            except Exception as e:
+                print(f"Slide image OCR failed: {e}")
+                text = ""
+                failed += 1
+        results.append((index, text.strip()))
+        ctx.progress(done, len(futures))
+    return results, failed
+
+
+class PresentationExtractor(Extractor):
+    """Titles, body text, tables and speaker notes per slide, optionally OCR of slide images
+
+    Subclasses provide read_slides(archive, ctx). With ocr_images set (or
+    SLIDE_OCR_IMAGES), embedded pictures are sent to the OCR pool concurrently.
+    """
+
+    library = ''
+    cost = HEAVY
+    error_method = "Presentation error"
+
+    def read_slides(self, archive, ctx):
+        raise NotImplementedError
+
+    def extract(self, ctx):
+        import zipfile
+
+        ocr_images = option_enabled(ctx.options, 'ocr_images', ctx.config['SLIDE_OCR_IMAGES'])
+        images_ocrd = 0
+        ocr_failed = 0
+        with ctx.open() as f, zipfile.ZipFile(f) as archive:
+            slides = self.read_slides(archive, ctx)
+            if ocr_images and ctx.ocr_pool is not None:
+                images = slide_images(archive, slides, ctx.config['SLIDE_OCR_MAX_IMAGES'])
+                image_texts, ocr_failed = ocr_slide_images(ctx, images)
+                for index, text in image_texts:
+                    images_ocrd += 1
+                    if text:
+                        slides[index].setdefault("image_text", []).append(text)
+
+        content = []
+        for slide in slides:
+            heading = f"=== SLIDE {slide['slide']}: {slide['title']} ===" if slide['title'] else f"=== SLIDE {slide['slide']} ==="
+            content.append(heading)
+            content.extend(slide['text'])
+            for table in slide['tables']:
+                content.extend(" | ".join(cell for cell in row if cell) for row in table)
+            for text in slide.get('image_text', []):
+                content.append(f"[IMAGE TEXT] {text}")
+            if slide['notes']:
+                content.append(f"[NOTES] {slide['notes']}")
+            content.append("")
+
+        stats = {
+            "total_slides": len(slides),
+            "slides_with_text": sum(1 for slide in slides if slide['title'] or slide['text'] or slide['tables']),
+            "tables": sum(len(slide['tables']) for slide in slides),
+            "slides_with_notes": sum(1 for slide in slides if slide['notes']),
+            "images": sum(len(slide['images']) for slide in slides),
+            "images_ocr": images_ocrd
+        }
+        for slide in slides:
+            # Archive member names only mattered for OCR
+            slide['images'] = len(slide['images'])
+        return ExtractionResult("\n".join(content).strip(), f"{self.library} ({len(slides)} slides)", {
+            "slides": slides,
+            "total_pages": len(slides),
+            "presentation_stats": stats
+        }, degraded=f"OCR failed on {ocr_failed} slide image(s)" if ocr_failed else None)
+
+    def render(self, result, ctx):
+        stats = result.details['presentation_stats']
+        file_type = ctx.file_format.upper()
+
+        slides = result.details['slides']
+        if not any(slide['title'] or slide['text'] or slide['tables'] or slide['notes'] or slide.get('image_text')
+                   for slide in slides):
+            return f"""📽️ {file_type} Presentation Processed - No Text Content Found
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Slides: {stats['total_slides']}
+
+The slides appear to hold only images or shapes without text.
+Set ocr_images=1 to read text from the slide images."""
+
+        return f"""📽️ {file_type} Presentation Extraction Results
+
+✅ TEXT EXTRACTED SUCCESSFULLY!
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+Extraction Method: {self.library}
+
+📊 Presentation Structure:
+- Slides: {stats['total_slides']}
+- Slides with text: {stats['slides_with_text']}
+- Tables: {stats['tables']}
+- Slides with speaker notes: {stats['slides_with_notes']}
+- Images: {stats['images']} ({stats['images_ocr']} sent to OCR)
+
+==================== EXTRACTED CONTENT ====================
+
+{result.content}
+
+======================================================="""
+
+    def render_error(self, error, ctx):
+        file_type = ctx.file_format.upper()
+        return f"""❌ {file_type} Processing Error
+
+Document: {ctx.filename}
+File Size: {ctx.size_label}
+
+Error: {str(error)}
+
+This could be due to:
+- Corrupted presentation
+- Password-protected file
+- File is not a valid {file_type} presentation"""
+
+
+@registry.register
+class PptxExtractor(PresentationExtractor):
+    name = 'pptx'
+    extensions = ('pptx',)
+    library = 'PresentationML parser'
+    error_method = "PPTX error"
+
+    def read_slides(self, archive, ctx):
+        return read_pptx(archive, ctx.config['SLIDE_WORKERS'])
+
+
+@registry.register
+class OdpExtractor(PresentationExtractor):
+    name = 'odp'
+    extensions = ('odp',)
+    library = 'ODF content.xml iterparse'
+    error_method = "ODP error"
+
+    def read_slides(self, archive, ctx):
+        return read_odp(archive)
+
+
+@registry.register
+class ImageOCRExtractor(Extractor):
+    """Multilingual OCR with several Tesseract configurations run in parallel"""
+
+    name = 'image_ocr'
+    extensions = ('jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif')
+    requires = ('pytesseract', 'PIL')
+    cost = HEAVY
+    error_method = "Multilingual OCR Error"
+
+    def extract(self, ctx):
+        import pytesseract
+        from PIL import Image, ImageEnhance, ImageFilter
+
+        # Get available languages
+        try:
+            available_langs = pytesseract.get_languages(config='')
+        except Exception:
+            available_langs = []
+
+        # Open and process the image
+        with ctx.open() as f:
+            image = Image.open(f)
+            image.load()
+
+        # Convert to RGB if necessary
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Image preprocessing for better OCR
+        gray_image = image.convert('L')
+        enhancer = ImageEnhance.Contrast(gray_image)
+        enhanced_image = enhancer.enhance(2.0)
+        sharpened = enhanced_image.filter(ImageFilter.SHARPEN)
+
+        # Narrow the language set: caller override first, else a cheap detection pre-pass
+        requested_langs = parse_languages(ctx.options.get('languages'))
+        ocr_langs = [l for l in requested_langs if not available_langs or l in available_langs]
+        lang_source = "request" if ocr_langs else None
+        if not ocr_langs:
+            ocr_langs, lang_source = detect_languages(ctx.ocr_pool, sharpened, available_langs)
+
+        if ocr_langs:
+            lang_string = '+'.join(ocr_langs)
+        elif available_langs:
+            # osd holds the script detection model, not a language to recognize
+            lang_string = '+'.join(lang for lang in available_langs if lang != 'osd')
+            lang_source = "all installed languages"
+        else:
+            lang_string = 'eng+ell+fra+deu+spa+ara+chi_sim+chi_tra+jpn+kor+rus+hin+tha+vie'
+            lang_source = "default language set"
+
+        # Multiple OCR configurations, all with the resolved languages
+        configs = [
+            ('All Languages Auto', f'--oem 3 --psm 6 -l {lang_string}'),
+            ('All Languages Block', f'--oem 3 --psm 4 -l {lang_string}'),
+            ('Single Text Block', f'--oem 3 --psm 8 -l {lang_string}'),
+            ('Sparse Text', f'--oem 3 --psm 11 -l {lang_string}')
+        ]
+        if len(ocr_langs) > 1:
+            # The first (most likely) language alone: fewer models, less confusion between scripts
+            configs.insert(2, ('Primary Language', f'--oem 3 --psm 6 -l {ocr_langs[0]}'))
+        elif not ocr_langs and (not available_langs or 'eng' in available_langs):
+            # Nothing requested or detected: the fallback set is alphabetical, so English gets its own pass
+            configs.insert(2, ('English Focus', '--oem 3 --psm 6 -l eng'))
+
+        best_result = ""
+        best_confidence = 0
+        best_method = ""
+        all_attempts = []
+        detected_languages = set()
+
+        # Run all passes concurrently; stop once one is confident enough
+        attempts = run_ocr_passes(
+            ctx.ocr_pool, sharpened, configs,
+            early_exit_confidence=ctx.config['OCR_EARLY_EXIT_CONFIDENCE'],
+            progress=ctx.progress
+        )
+
+        for attempt in attempts:
+            current_text = attempt['text']
+
+            if attempt['status'] != 'ok' or not current_text:
+                attempt['script'] = "Error" if attempt['status'] == 'error' else "-"
+                all_attempts.append(attempt)
+                continue
+
+            avg_confidence = attempt['confidence']
+
+            # Try to detect script/language
+            script_info = ""
+            if any(ord(char) > 127 for char in current_text):
+                if any(0x0370 <= ord(char) <= 0x03FF for char in current_text):
+                    script_info += "Greek "
+                    detected_languages.add("Greek")
+                if any(0x0400 <= ord(char) <= 0x04FF for char in current_text):
+                    script_info += "Cyrillic "
+                    detected_languages.add("Cyrillic")
+                if any(0x0600 <= ord(char) <= 0x06FF for char in current_text):
+                    script_info += "Arabic "
+                    detected_languages.add("Arabic")
+                if any(0x4E00 <= ord(char) <= 0x9FFF for char in current_text):
+                    script_info += "Chinese "
+                    detected_languages.add("Chinese")
+                if any(0x3040 <= ord(char) <= 0x309F for char in current_text):
+                    script_info += "Hiragana "
+                    detected_languages.add("Japanese")
+                if any(0x30A0 <= ord(char) <= 0x30FF for char in current_text):
+                    script_info += "Katakana "
+                    detected_languages.add("Japanese")
+
+            attempt['script'] = script_info.strip() or "Latin"
+            all_attempts.append(attempt)
+
+            # Keep the best result (prioritize longer text with good confidence)
+            quality_score = (avg_confidence * 0.7) + (len(current_text) * 0.3)
+            best_quality = (best_confidence * 0.7) + (len(best_result) * 0.3)
+
+            if quality_score > best_quality:
+                best_result = current_text
+                best_confidence = avg_confidence
+                best_method = attempt['method']
+
+        details = {
+            'ocr_languages': {
+                'languages': lang_string.split('+'),
+                'source': lang_source
+            },
+            # Per-pass timings so slow configurations can be spotted
+            'ocr_passes': [
+                {
+                    'method': attempt['method'],
+                    'status': attempt['status'],
+                    'confidence': round(attempt['confidence'], 1),
+                    'word_count': attempt['word_count'],
+                    'elapsed_ms': attempt['elapsed_ms']
+                }
+                for attempt in all_attempts
+            ]
+        }
+
+        if best_result:
+            method = f"Multilingual OCR ({len(all_attempts)} methods, Best: {best_method})"
+        else:
+            method = "Multilingual OCR (No clear text detected)"
+
+        failed_passes = sum(1 for attempt in all_attempts if attempt['status'] == 'error')
+        degraded = f"{failed_passes} of {len(all_attempts)} OCR passes failed" if failed_passes else None
+
+        return ExtractionResult(best_result, method, details, degraded=degraded, extras={
+            'image_size': image.size,
+            'best_method': best_method,
+            'best_confidence': best_confidence,
+            'detected_languages': detected_languages,
+            'all_attempts': all_attempts,
+            'available_langs': available_langs,
+            'lang_string': lang_string,
+            'lang_source': lang_source
+        })
+
+    def render(self, result, ctx):
+        extras = result.extras
+        width, height = extras['image_size']
+        available_langs = extras['available_langs']
+        all_attempts = extras['all_attempts']
+
+        if result.content:
+            best_method = extras['best_method']
+            detected_languages = extras['detected_languages']
+
+            # Format the successful result
+            extracted_text = f"""🌍 MULTILINGUAL OCR Results for {ctx.filename}
+
+✅ TEXT EXTRACTED SUCCESSFULLY!
+
+Best Method: {best_method}
+Overall Confidence: {extras['best_confidence']:.1f}%
+Detected Scripts: {', '.join(detected_languages) if detected_languages else 'Latin/English'}
+Image Size: {width}x{height} pixels
+File Size: {ctx.size_label}
+
+Available Languages: {len(available_langs) if available_langs else 'Multiple'}
+OCR Languages: {extras['lang_string']} (from {extras['lang_source']})
+
+==================== EXTRACTED TEXT ====================
+
+{result.content}
+
+=======================================================
+
+📊 All OCR Attempts (Best to Worst):
+
+"""
+
+            # Sort attempts by confidence and add details
+            sorted_attempts = sorted(all_attempts, key=lambda x: x['confidence'], reverse=True)
+            for i, attempt in enumerate(sorted_attempts, 1):
+                status = "🏆 BEST" if attempt['method'] == best_method else f"#{i}"
+                timing = f"{attempt['elapsed_ms']:.0f} ms" if attempt['elapsed_ms'] is not None else "cancelled"
+                extracted_text += f"""
+{status} - {attempt['method']}:
+   📊 Confidence: {attempt['confidence']:.1f}%
+   📝 Words: {attempt['word_count']}
+   🌐 Script: {attempt['script']}
+   ⏱️ Time: {timing}
+   📄 Preview: {attempt['text'][:150]}{'...' if len(attempt['text']) > 150 else ''}
+"""
+
+            extracted_text += f"""
+=======================================================
+
+🔧 Technical Details:
+- OCR Engine: Tesseract with ALL language packs
+- Preprocessing: Contrast enhancement + sharpening
+- Language Detection: OSD script pre-pass narrows the -l language set
+- Character Filtering: Confidence > 15% threshold
+- Quality Scoring: Confidence + text length optimization
+- Parallel Passes: Stops early once a pass reaches {ctx.config['OCR_EARLY_EXIT_CONFIDENCE']}% confidence
+
+🌐 Supported Languages Include:
+English, Greek, Arabic, Chinese, Japanese, Korean, Russian, 
+Hindi, Thai, Vietnamese, French, German, Spanish, Italian, 
+Portuguese, Dutch, Polish, Turkish, Hebrew, and many more!
+
+💡 For best results with multilingual text:
+- Ensure high image contrast
+- Use clear, readable fonts
+- Avoid overly decorative or stylized text
+- Higher resolution helps with complex scripts"""
+            return extracted_text
+
+        # No text detected in any configuration
+        extracted_text = f"""🌍 Multilingual OCR Processing Complete - No Clear Text Found
+
+Image Details:
+- Name: {ctx.filename}
+- Size: {ctx.size_label}
+- Format: {ctx.file_extension.upper()}
+- Dimensions: {width}x{height} pixels
+- Available Languages: {len(available_langs) if available_langs else 'Multiple'}
+- OCR Languages: {extras['lang_string']} (from {extras['lang_source']})
+
+OCR Attempts Made:
+"""
+        for i, attempt in enumerate(all_attempts, 1):
+            timing = f"{attempt['elapsed_ms']:.0f} ms" if attempt['elapsed_ms'] is not None else "cancelled"
+            extracted_text += f"{i}. {attempt['method']}: {attempt['confidence']:.1f}% confidence ({attempt['script']}, {timing})\n"
+
+        extracted_text += """
+Possible reasons for poor detection:
+- Text is too small, blurry, or low contrast
+- Highly stylized or decorative fonts
+- Very complex multi-script layouts
+- Image quality insufficient for character recognition
+- Background patterns interfering with text
+
+💡 Tips for better multilingual OCR:
+- Use high-resolution, high-contrast images
+- Ensure text is clearly readable to human eye
+- Avoid backgrounds with patterns or textures
+- For best results, text should be horizontal and well-spaced"""
+        return extracted_text
+
+    def render_error(self, error, ctx):
+        return f"""❌ Multilingual OCR Processing Error
+
+Image Details:
+- Name: {ctx.filename}
+- Size: {ctx.size_label}
+- Format: {ctx.file_extension.upper()}
+
+Error: {str(error)}
+
+This could be due to:
+- Corrupted or invalid image file
+- Unsupported image format for OCR
+- Memory limitations with large images
+- OCR engine configuration issue
+
+Please try with a different image or check the file format."""
+
+
+@registry.register_fallback
+class GenericTextExtractor(Extractor):
+    """Anything without a dedicated extractor: try to read it as text"""
+
+    name = 'generic'
+
+    def extract(self, ctx):
+        try:
+            with ctx.open_text() as f:
+                content = f.read(1000)  # Read first 1000 chars
+        except Exception:
+            return ExtractionResult("", "Binary file detected", extras={'readable': False})
+
+        if content.strip():
+            return ExtractionResult(content, "Generic text reading")
+        return ExtractionResult("", "Unsupported format")
+
+    def render(self, result, ctx):
+        if result.content:
+            return result.content + "\n\n[Content truncated - showing first 1000 characters]"
+        if result.extras.get('readable') is False:
+            return f"Cannot read '{ctx.file_extension}' file as text. With Kreuzberg, specialized handlers would process this file type."
+        return f"File type '{ctx.file_extension}' not directly supported in preview mode. With Kreuzberg, this file would be processed appropriately."
@@ -0,0 +1,132 @@
+import codecs
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+    print("lxml is not installed, HTML is tokenized with the slower html.parser")
+
+# Elements whose content is never text
+SKIPPED_TAGS = {'script', 'style'}
+
+# Elements that start a new line of output
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'details', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'title', 'tr', 'ul',
+}
+CELL_TAGS = {'td', 'th'}
+
+# Markup html.parser is still waiting to see the end of (an unclosed <script>,
+# comment or tag) is dropped past this size instead of being buffered and rescanned
+MAX_PENDING_CHARS = 1024 * 1024
+# Kept when dropping script/style content, so a closing tag split across chunks is still found
+CDATA_TAIL_CHARS = 64
+
+
+class HTMLTextBuilder:
+    """Turns tokenizer events into text: one line per block element, script and style skipped
+
+    Implements the lxml parser target interface (start, end, data, close);
+    the html.parser fallback forwards its callbacks here too.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self._line = []
+        self._skip_depth = 0
+        self._pre_depth = 0
+
+    def _end_line(self):
+        text = ''.join(self._line)
+        text = text.rstrip() if self._pre_depth else ' '.join(text.split())
+        if text.strip():
+            self.lines.append(text)
+        self._line = []
+
+    def start(self, tag, attrib=None):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+            if tag == 'pre':
+                self._pre_depth += 1
+        elif tag in CELL_TAGS and ''.join(self._line).strip():
+            self._line.append(' | ')
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+            if tag == 'pre':
+                self._pre_depth = max(0, self._pre_depth - 1)
+
+    def data(self, data):
+        if self._skip_depth:
+            return
+        if not self._pre_depth:
+            self._line.append(data)
+            return
+        # Preformatted text keeps its own line breaks
+        first, *rest = data.split('\n')
+        self._line.append(first)
+        for line in rest:
+            self._end_line()
+            self._line.append(line)
+
+    def close(self):
+        self._end_line()
+        return '\n'.join(self.lines)
+
+
+class _StdlibTokenizer(HTMLParser):
+    """html.parser feeding an HTMLTextBuilder, with its pending buffer kept bounded"""
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def feed(self, data):
+        super().feed(data)
+        if len(self.rawdata) > MAX_PENDING_CHARS:
+            # Inside script/style the content is skipped anyway; otherwise this is
+            # markup that never closes, which a browser would swallow too
+            self.rawdata = self.rawdata[-CDATA_TAIL_CHARS:] if self.cdata_elem else ''
+
+    def close(self):
+        super().close()
+        return self.target.close()
+
+
+def html_to_text(f, chunk_size=64 * 1024):
+    """Text of an HTML document read from a binary stream in chunks, in one pass
+
+    libxml2 (through lxml) tokenizes when available, html.parser otherwise.
+    Both recover from malformed markup in linear time and build no tree, so
+    memory is the extracted text plus one chunk. Input is decoded as UTF-8.
+    """
+    builder = HTMLTextBuilder()
+    if etree is not None:
+        parser = etree.HTMLParser(target=builder, encoding='utf-8', recover=True, no_network=True, huge_tree=True)
+        decode = None
+    else:
+        parser = _StdlibTokenizer(builder)
+        decode = codecs.getincrementaldecoder('utf-8')(errors='ignore').decode
+
+    empty = True
+    for chunk in iter(lambda: f.read(chunk_size), b''):
+        parser.feed(decode(chunk) if decode else chunk)
+        empty = False
+    # libxml2 refuses to close a document it was never fed
+    return parser.close() if not empty else ''
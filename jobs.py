@@ -0,0 +1,101 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobManager:
+    """Runs extractions in a background worker pool and tracks their progress
+
+    Each job records its status (queued, running, finished, failed), page
+    progress and final result. Finished and failed jobs are dropped once they
+    are older than the retention period.
+    """
+
+    def __init__(self, workers=2, retention_seconds=3600):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, on_done=None, **kwargs):
+        """Queue fn(*args, progress=callback, **kwargs) and return the new job id
+
+        on_done, if given, runs after the job finishes or fails (e.g. to remove
+        the uploaded file).
+        """
+        self.purge_expired()
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "progress": {"done": 0, "total": None},
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None
+            }
+
+        def progress(done, total):
+            self._update(job_id, progress={"done": done, "total": total})
+
+        def run():
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                result = fn(*args, progress=progress, **kwargs)
+                with self._lock:
+                    job = self._jobs[job_id]
+                    total = job["progress"]["total"] or 1
+                    job.update({
+                        "status": "finished",
+                        "progress": {"done": total, "total": total},
+                        "result": result,
+                        "finished_at": time.time()
+                    })
+            except Exception as e:
+                self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        self._executor.submit(run)
+        return job_id
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if unknown or expired"""
+        self.purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot["progress"] = dict(job["progress"])
+
+        if snapshot["finished_at"] is not None:
+            snapshot["expires_at"] = snapshot["finished_at"] + self.retention_seconds
+        return snapshot
+
+    def purge_expired(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["finished_at"] is not None and job["finished_at"] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
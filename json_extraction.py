@@ -0,0 +1,79 @@
+import json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+    print("ijson is not installed, JSON files are parsed whole with the json module")
+
+BUFFER_SIZE = 64 * 1024
+
+
+def json_path(steps):
+    """JSONPath of a value from its keys and array indexes, e.g. $.items[2].name"""
+    parts = ['$']
+    for step in steps:
+        if isinstance(step, int):
+            parts.append(f'[{step}]')
+        elif step.isidentifier():
+            parts.append(f'.{step}')
+        else:
+            parts.append(f'[{json.dumps(step, ensure_ascii=False)}]')
+    return ''.join(parts)
+
+
+def _ijson_strings(f):
+    # One entry per open container: the current key of an object, the index in an array
+    steps = []
+    try:
+        for event, value in ijson.basic_parse(f, buf_size=BUFFER_SIZE, multiple_values=True, use_float=True):
+            if event == 'map_key':
+                steps[-1] = value
+                continue
+            if event in ('end_map', 'end_array'):
+                steps.pop()
+                continue
+            if steps and isinstance(steps[-1], int):
+                steps[-1] += 1
+            if event == 'start_map':
+                steps.append(None)
+            elif event == 'start_array':
+                steps.append(-1)
+            elif event == 'string':
+                yield steps, value
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+
+
+def _walk(value, steps):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            steps.append(key)
+            yield from _walk(item, steps)
+            steps.pop()
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            steps.append(index)
+            yield from _walk(item, steps)
+            steps.pop()
+    elif isinstance(value, str):
+        yield steps, value
+
+
+def iter_json_strings(f, with_paths=False):
+    """Yield (JSONPath or None, string value) for every non-blank string in a JSON stream
+
+    Object keys, numbers, booleans and nulls are structure, not text, and are
+    skipped. With ijson the file is tokenized as it is read, so memory holds
+    one buffer and the current path whatever the file's size; several
+    top-level values (JSON Lines) are read one after another. Without ijson
+    the file is parsed whole. Invalid JSON raises ValueError.
+    """
+    strings = _ijson_strings(f) if ijson is not None else _walk(json.load(f), [])
+    for steps, value in strings:
+        if value.strip():
+            yield (json_path(steps) if with_paths else None), value
+
+
+def json_parser_name():
+    return f"ijson ({ijson.backend})" if ijson is not None else "json (whole file)"
@@ -0,0 +1,497 @@
+import os
+import time
+import importlib.util
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+# Engines kept alive per worker process, keyed by (lang, oem)
+MAX_ENGINES_PER_WORKER = int(os.environ.get('OCR_MAX_ENGINES_PER_WORKER', 4))
+
+_engines = OrderedDict()
+
+
+class OCRWorkerError(Exception):
+    """Raised inside a pool worker when its Tesseract engine cannot serve a call"""
+
+
+class OCRFailedError(Exception):
+    """Raised when every OCR pass on an image failed, as opposed to finding no text"""
+
+
+def parse_config(config):
+    """Split a pytesseract style config string into (oem, psm, lang)"""
+    oem, psm, lang = 3, 3, 'eng'
+    parts = (config or '').split()
+    for i, part in enumerate(parts[:-1]):
+        if part == '--oem':
+            oem = int(parts[i + 1])
+        elif part == '--psm':
+            psm = int(parts[i + 1])
+        elif part == '-l':
+            lang = parts[i + 1]
+    return oem, psm, lang
+
+
+def _get_engine(lang, oem):
+    """Return a loaded tesserocr engine for this worker, loading it on first use"""
+    import tesserocr
+
+    key = (lang, oem)
+    api = _engines.get(key)
+    if api is not None:
+        _engines.move_to_end(key)
+        return api
+
+    try:
+        api = tesserocr.PyTessBaseAPI(
+            path=os.environ.get('TESSDATA_PREFIX', tesserocr.get_languages()[0]),
+            lang=lang,
+            oem=oem
+        )
+    except RuntimeError as e:
+        raise OCRWorkerError(str(e))
+    _engines[key] = api
+
+    # Drop the least recently used engine so a worker never holds too many models
+    while len(_engines) > MAX_ENGINES_PER_WORKER:
+        _, old_api = _engines.popitem(last=False)
+        old_api.End()
+
+    return api
+
+
+def _init_worker():
+    """Fail fast in the worker if the tesserocr binding cannot be loaded"""
+    import tesserocr  # noqa: F401
+
+
+def _worker_image_to_data(image, config):
+    """Word level OCR inside a pool worker, shaped like pytesseract's Output.DICT"""
+    import tesserocr
+
+    oem, psm, lang = parse_config(config)
+    api = _get_engine(lang, oem)
+    api.SetPageSegMode(psm)
+    api.SetImage(image)
+    try:
+        api.Recognize()
+        data = {'text': [], 'conf': []}
+        level = tesserocr.RIL.WORD
+        iterator = api.GetIterator()
+        if iterator is not None:
+            for word in tesserocr.iterate_level(iterator, level):
+                data['text'].append(word.GetUTF8Text(level) or '')
+                data['conf'].append(word.Confidence(level))
+        return data
+    finally:
+        api.Clear()
+
+
+def _worker_image_to_string(image, config):
+    """Plain text OCR inside a pool worker"""
+    oem, psm, lang = parse_config(config)
+    api = _get_engine(lang, oem)
+    api.SetPageSegMode(psm)
+    api.SetImage(image)
+    try:
+        return api.GetUTF8Text()
+    finally:
+        api.Clear()
+
+
+def _worker_image_to_osd(image, config):
+    """Orientation and script detection (--psm 0) inside a pool worker"""
+    import tesserocr
+
+    api = _get_engine('osd', 3)
+    api.SetPageSegMode(tesserocr.PSM.OSD_ONLY)
+    api.SetImage(image)
+    try:
+        osd = api.DetectOrientationScript()
+        if not osd:
+            raise OCRWorkerError("OSD could not determine the script")
+        return {'script': osd['script_name'], 'script_conf': osd['script_conf']}
+    finally:
+        api.Clear()
+
+
+def _timed_call(fn, image, config):
+    """Run an OCR call and return (result, seconds spent in the call)"""
+    start = time.perf_counter()
+    result = fn(image, config)
+    return result, time.perf_counter() - start
+
+
+def _pytesseract_image_to_data(image, config):
+    import pytesseract
+    return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+
+def _pytesseract_image_to_string(image, config):
+    import pytesseract
+    return pytesseract.image_to_string(image, config=config)
+
+
+def _pytesseract_image_to_osd(image, config):
+    import pytesseract
+    osd = pytesseract.image_to_osd(image, config=config, output_type=pytesseract.Output.DICT)
+    return {'script': osd['script'], 'script_conf': float(osd['script_conf'])}
+
+
+class OCRPool:
+    """Pool of long-lived Tesseract workers that keep their language models loaded
+
+    Requests are queued to the workers through a process pool. When tesserocr
+    is not installed or the pool breaks, calls fall back to pytesseract, which
+    starts a fresh tesseract process per call.
+    """
+
+    def __init__(self, size=None):
+        self.size = size if size is not None else (os.cpu_count() or 2)
+        self._executor = None
+        self._fallback_executor = None
+        self._available = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._available is not None:
+            return self._available
+
+        with self._lock:
+            if self._available is not None:
+                return self._available
+
+            if self.size <= 0:
+                self._available = False
+                return False
+
+            # Only look the module up: importing tesserocr installs signal handlers,
+            # which fails when the pool is first used from a worker thread
+            if importlib.util.find_spec('tesserocr') is None:
+                print("OCR pool disabled: tesserocr is not installed, using pytesseract")
+                self._available = False
+                return False
+
+            # spawn keeps the workers independent of the Flask threads that start them
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+            self._available = True
+            print(f"OCR pool started with {self.size} workers")
+            return True
+
+    @property
+    def available(self):
+        return self._ensure_started()
+
+    @property
+    def parallelism(self):
+        """How many OCR calls can usefully run at once"""
+        if self._ensure_started():
+            return self.size
+        return max(self.size, os.cpu_count() or 2)
+
+    @property
+    def pooled(self):
+        """True while calls are sent to the worker processes rather than pytesseract"""
+        return self._ensure_started() and self._executor is not None
+
+    def _mark_broken(self, error):
+        print(f"OCR pool unavailable, falling back to pytesseract: {error}")
+        with self._lock:
+            self._available = False
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_fallback_executor(self):
+        # pytesseract runs tesseract as a subprocess, so threads are enough for parallelism
+        with self._lock:
+            if self._fallback_executor is None:
+                self._fallback_executor = ThreadPoolExecutor(
+                    max_workers=max(self.size, os.cpu_count() or 2),
+                    thread_name_prefix='ocr-fallback'
+                )
+            return self._fallback_executor
+
+    def _submit(self, worker_fn, fallback_fn, image, config, use_pool=True):
+        executor = self._executor if use_pool and self._ensure_started() else None
+        if executor is not None:
+            try:
+                return executor.submit(_timed_call, worker_fn, image, config)
+            except (BrokenProcessPool, RuntimeError) as e:
+                self._mark_broken(e)
+        return self._get_fallback_executor().submit(_timed_call, fallback_fn, image, config)
+
+    def worker_failed(self, error, what='call'):
+        """Note a failed pool call before it is retried through pytesseract
+
+        A broken pool is shut down so later calls skip it; any other worker
+        error (an engine that cannot load a language, a binding error) only
+        affects the call that raised it.
+        """
+        if isinstance(error, BrokenProcessPool):
+            self._mark_broken(error)
+        else:
+            print(f"OCR pool {what} failed, retrying with pytesseract: {error!r}")
+
+    def _run(self, worker_fn, fallback_fn, image, config):
+        if self.pooled:
+            try:
+                return self._submit(worker_fn, fallback_fn, image, config).result()[0]
+            except Exception as e:
+                self.worker_failed(e)
+        return fallback_fn(image, config)
+
+    def submit_image_to_data(self, image, config='', use_pool=True):
+        """Queue a word level OCR call; the future resolves to (data, seconds)"""
+        return self._submit(_worker_image_to_data, _pytesseract_image_to_data, image, config, use_pool)
+
+    def submit_image_to_string(self, image, config='', use_pool=True):
+        """Queue a plain text OCR call; the future resolves to (text, seconds)"""
+        return self._submit(_worker_image_to_string, _pytesseract_image_to_string, image, config, use_pool)
+
+    def image_to_data(self, image, config=''):
+        """OCR an image and return word texts and confidences"""
+        return self._run(_worker_image_to_data, _pytesseract_image_to_data, image, config)
+
+    def image_to_string(self, image, config=''):
+        """OCR an image and return its plain text"""
+        return self._run(_worker_image_to_string, _pytesseract_image_to_string, image, config)
+
+    def image_to_osd(self, image):
+        """Detect the dominant script of an image with Tesseract OSD"""
+        return self._run(_worker_image_to_osd, _pytesseract_image_to_osd, image, '--psm 0')
+
+    def status(self):
+        return {
+            "enabled": bool(self._available),
+            "workers": self.size if self._available else 0,
+            "backend": "tesserocr pool" if self._available else "pytesseract subprocess"
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._fallback_executor is not None:
+                self._fallback_executor.shutdown(wait=False, cancel_futures=True)
+                self._fallback_executor = None
+            self._available = None
+
+
+# Tesseract languages to try for each script (OSD script names)
+LATIN_LANGUAGES = os.environ.get('OCR_LATIN_LANGUAGES', 'eng+fra+deu+spa+ita+por').split('+')
+
+SCRIPT_LANGUAGES = {
+    'Latin': LATIN_LANGUAGES,
+    'Fraktur': ['frk', 'deu'],
+    'Greek': ['ell', 'eng'],
+    'Cyrillic': ['rus', 'ukr', 'bul', 'srp', 'eng'],
+    'Arabic': ['ara', 'fas', 'urd', 'eng'],
+    'Hebrew': ['heb', 'eng'],
+    'Han': ['chi_sim', 'chi_tra', 'eng'],
+    'Japanese': ['jpn', 'eng'],
+    'Katakana': ['jpn', 'eng'],
+    'Hiragana': ['jpn', 'eng'],
+    'Hangul': ['kor', 'eng'],
+    'Devanagari': ['hin', 'mar', 'nep', 'eng'],
+    'Bengali': ['ben', 'eng'],
+    'Tamil': ['tam', 'eng'],
+    'Telugu': ['tel', 'eng'],
+    'Kannada': ['kan', 'eng'],
+    'Malayalam': ['mal', 'eng'],
+    'Gujarati': ['guj', 'eng'],
+    'Gurmukhi': ['pan', 'eng'],
+    'Thai': ['tha', 'eng'],
+    'Armenian': ['hye', 'eng'],
+    'Georgian': ['kat', 'eng'],
+    'Ethiopic': ['amh', 'eng'],
+}
+
+# Unicode blocks used for the script histogram of a quick OCR pass
+SCRIPT_RANGES = [
+    ('Latin', 0x0041, 0x024F),
+    ('Greek', 0x0370, 0x03FF),
+    ('Cyrillic', 0x0400, 0x04FF),
+    ('Armenian', 0x0530, 0x058F),
+    ('Hebrew', 0x0590, 0x05FF),
+    ('Arabic', 0x0600, 0x06FF),
+    ('Devanagari', 0x0900, 0x097F),
+    ('Bengali', 0x0980, 0x09FF),
+    ('Gurmukhi', 0x0A00, 0x0A7F),
+    ('Gujarati', 0x0A80, 0x0AFF),
+    ('Tamil', 0x0B80, 0x0BFF),
+    ('Telugu', 0x0C00, 0x0C7F),
+    ('Kannada', 0x0C80, 0x0CFF),
+    ('Malayalam', 0x0D00, 0x0D7F),
+    ('Thai', 0x0E00, 0x0E7F),
+    ('Georgian', 0x10A0, 0x10FF),
+    ('Hangul', 0x1100, 0x11FF),
+    ('Ethiopic', 0x1200, 0x137F),
+    ('Japanese', 0x3040, 0x30FF),
+    ('Han', 0x4E00, 0x9FFF),
+    ('Hangul', 0xAC00, 0xD7AF),
+]
+
+# Languages for the quick pass when OSD is unavailable: one per common script
+QUICK_PASS_LANGUAGES = 'eng+ell+rus+ara+heb+hin+chi_sim+jpn+kor+tha'
+
+
+def parse_languages(value):
+    """Split a language parameter like 'eng+deu' or 'eng, deu' into a list"""
+    if not value:
+        return []
+    return [lang for lang in value.replace(',', '+').replace(' ', '+').split('+') if lang]
+
+
+def script_histogram(text):
+    """Count letters per script in a piece of text"""
+    counts = {}
+    for char in text:
+        if not char.isalpha():
+            continue
+        code = ord(char)
+        for script, low, high in SCRIPT_RANGES:
+            if low <= code <= high:
+                counts[script] = counts.get(script, 0) + 1
+                break
+    return counts
+
+
+def detect_languages(pool, image, available_langs, min_share=0.1):
+    """Pick the few Tesseract languages likely to appear in an image
+
+    Tries Tesseract OSD first; if that fails, runs one quick pass with a single
+    language per common script and keeps the scripts that make up at least
+    min_share of the recognised letters. Returns (languages, source).
+    """
+    available = set(available_langs)
+    scripts = []
+    source = None
+
+    try:
+        osd = pool.image_to_osd(image)
+        scripts = [osd['script']]
+        source = f"osd ({osd['script']}, {osd['script_conf']:.1f})"
+    except Exception as e:
+        print(f"OSD script detection failed, using a quick OCR pass: {e}")
+
+    if not scripts:
+        try:
+            quick_langs = '+'.join(l for l in QUICK_PASS_LANGUAGES.split('+') if l in available) or 'eng'
+            text, _, _ = summarize_ocr_data(pool.image_to_data(image, f'--oem 3 --psm 6 -l {quick_langs}'))
+            counts = script_histogram(text)
+            total = sum(counts.values())
+            scripts = [script for script, count in sorted(counts.items(), key=lambda x: -x[1])
+                       if total and count / total >= min_share]
+            if scripts:
+                source = f"script histogram ({', '.join(scripts)})"
+        except Exception as e:
+            print(f"Quick OCR pass for script detection failed: {e}")
+
+    languages = []
+    for script in scripts:
+        for lang in SCRIPT_LANGUAGES.get(script, ['eng']):
+            if lang in available and lang not in languages:
+                languages.append(lang)
+
+    if not languages:
+        return [], None
+    return languages, source
+
+
+def summarize_ocr_data(ocr_data, min_confidence=15):
+    """Keep words above the confidence threshold and return (text, avg_confidence, word_count)"""
+    text_parts = []
+    confidences = []
+
+    for i in range(len(ocr_data['text'])):
+        conf = int(float(ocr_data['conf'][i]))
+        if conf > min_confidence:
+            text = ocr_data['text'][i].strip()
+            if text and len(text) > 1:  # Ignore single characters
+                text_parts.append(text)
+                confidences.append(conf)
+
+    if not text_parts:
+        return "", 0, 0
+    return ' '.join(text_parts), sum(confidences) / len(confidences), len(text_parts)
+
+
+def run_ocr_passes(pool, image, configs, early_exit_confidence=None, progress=None):
+    """Run every (name, config) OCR pass concurrently and collect the attempts
+
+    As soon as one pass reaches early_exit_confidence the remaining passes are
+    cancelled. Passes already running inside a worker cannot be interrupted, so
+    they finish in the background and their results are discarded. Attempts are
+    returned in completion order, each with its own timing. progress, if given,
+    is called as progress(done, total) after each pass. If every pass fails,
+    OCRFailedError is raised instead, so a broken OCR setup doesn't pass for
+    an image without text.
+    """
+    start = time.perf_counter()
+    pooled = pool.pooled
+    futures = {pool.submit_image_to_data(image, config): (name, config, pooled) for name, config in configs}
+    pending = set(futures)
+    attempts = []
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        stop = False
+
+        for future in done:
+            name, config, from_pool = futures[future]
+            attempt = {'method': name, 'status': 'ok'}
+            try:
+                ocr_data, seconds = future.result()
+                text, confidence, word_count = summarize_ocr_data(ocr_data)
+                attempt.update({
+                    'text': text,
+                    'confidence': confidence,
+                    'word_count': word_count,
+                    'elapsed_ms': round(seconds * 1000, 1)
+                })
+                if early_exit_confidence is not None and word_count and confidence >= early_exit_confidence:
+                    stop = True
+            except Exception as e:
+                if from_pool:
+                    # The worker could not serve this pass; rerun it through pytesseract
+                    pool.worker_failed(e, f"pass '{name}'")
+                    retry = pool.submit_image_to_data(image, config, use_pool=False)
+                    futures[retry] = (name, config, False)
+                    pending.add(retry)
+                    continue
+                attempt.update({
+                    'status': 'error',
+                    'text': f"Error: {str(e)}",
+                    'confidence': 0,
+                    'word_count': 0,
+                    'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)
+                })
+            attempts.append(attempt)
+            if progress is not None:
+                progress(len(attempts), len(configs))
+
+        if stop:
+            for future in pending:
+                future.cancel()
+                attempts.append({
+                    'method': futures[future][0],
+                    'status': 'cancelled',
+                    'text': "Cancelled (early exit)",
+                    'confidence': 0,
+                    'word_count': 0,
+                    'elapsed_ms': None
+                })
+            break
+
+    if attempts and all(attempt['status'] == 'error' for attempt in attempts):
+        raise OCRFailedError(f"All {len(attempts)} OCR passes failed, first error: {attempts[0]['text']}")
+    return attempts
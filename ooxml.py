@@ -0,0 +1,29 @@
+"""Helpers shared by the OOXML (DOCX, PPTX) readers"""
+import posixpath
+from xml.etree import ElementTree
+
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+
+def part_relationships(archive, part):
+    """{relationship id: (type, archive member)} for a part of an OOXML package"""
+    directory, name = posixpath.split(part)
+    rels_name = posixpath.join(directory, '_rels', f'{name}.rels')
+    if rels_name not in archive.NameToInfo:
+        return {}
+    relationships = {}
+    for rel in ElementTree.fromstring(archive.read(rels_name)).iter(f'{{{REL_NS}}}Relationship'):
+        target = rel.get('Target', '')
+        if rel.get('TargetMode') != 'External':
+            target = posixpath.normpath(posixpath.join(directory, target)).lstrip('/')
+        relationships[rel.get('Id')] = (rel.get('Type', '').rsplit('/', 1)[-1], target)
+    return relationships
+
+
+def main_part(archive, default):
+    """Archive member of the package's main document, from _rels/.rels"""
+    for kind, target in part_relationships(archive, '').values():
+        if kind == 'officeDocument':
+            return target
+    return default
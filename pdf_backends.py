@@ -0,0 +1,140 @@
+import io
+from contextlib import contextmanager
+
+from uploads import open_source
+
+DEFAULT_PDF_BACKEND = 'pypdf2'
+
+
+class PyPDF2Backend:
+    """Pure-Python text extraction with PyPDF2 (the default)"""
+
+    name = 'pypdf2'
+    label = 'PyPDF2'
+
+    def __init__(self):
+        import PyPDF2
+        self._PyPDF2 = PyPDF2
+
+    @contextmanager
+    def open(self, source):
+        with open_source(source) as pdf_file:
+            yield PyPDF2Document(self._PyPDF2.PdfReader(pdf_file))
+
+
+class PyPDF2Document:
+    def __init__(self, reader):
+        self._reader = reader
+        self.page_count = len(reader.pages)
+
+    def iter_page_texts(self):
+        for page_num in range(self.page_count):
+            yield self._reader.pages[page_num].extract_text() or ""
+
+
+class PdfiumBackend:
+    """PDFium (pypdfium2): native text extraction, usually the fastest"""
+
+    name = 'pdfium'
+    label = 'pypdfium2'
+
+    def __init__(self):
+        import pypdfium2
+        self._pdfium = pypdfium2
+
+    @contextmanager
+    def open(self, source):
+        if not isinstance(source, str):
+            source.seek(0)
+        pdf = self._pdfium.PdfDocument(source)
+        try:
+            yield PdfiumDocument(pdf)
+        finally:
+            pdf.close()
+
+
+class PdfiumDocument:
+    def __init__(self, pdf):
+        self._pdf = pdf
+        self.page_count = len(pdf)
+
+    def iter_page_texts(self):
+        for page_num in range(self.page_count):
+            page = self._pdf[page_num]
+            textpage = page.get_textpage()
+            try:
+                # PDFium ends lines with \r\n
+                yield textpage.get_text_range().replace('\r\n', '\n')
+            finally:
+                textpage.close()
+                page.close()
+
+
+class PdfMinerBackend:
+    """pdfminer.six with layout analysis tuned for plain text throughput"""
+
+    name = 'pdfminer'
+    label = 'pdfminer.six'
+
+    def __init__(self):
+        from pdfminer.layout import LAParams
+        # boxes_flow=None skips the expensive reading-order analysis of text boxes
+        self.laparams = LAParams(line_margin=0.5, char_margin=2.0, word_margin=0.1,
+                                 boxes_flow=None, detect_vertical=False, all_texts=False)
+
+    @contextmanager
+    def open(self, source):
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+
+        with open_source(source) as pdf_file:
+            document = PDFDocument(PDFParser(pdf_file))
+            yield PdfMinerDocument(document, self.laparams)
+
+
+class PdfMinerDocument:
+    def __init__(self, document, laparams):
+        from pdfminer.pdftypes import resolve1
+
+        self._document = document
+        self._laparams = laparams
+        self.page_count = resolve1(document.catalog['Pages'])['Count']
+
+    def iter_page_texts(self):
+        from pdfminer.converter import TextConverter
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        resources = PDFResourceManager(caching=True)
+        for page in PDFPage.create_pages(self._document):
+            output = io.StringIO()
+            device = TextConverter(resources, output, laparams=self._laparams)
+            try:
+                PDFPageInterpreter(resources, device).process_page(page)
+                yield output.getvalue().rstrip()
+            finally:
+                device.close()
+
+
+PDF_BACKENDS = {
+    PyPDF2Backend.name: PyPDF2Backend,
+    PdfiumBackend.name: PdfiumBackend,
+    PdfMinerBackend.name: PdfMinerBackend,
+}
+
+
+def pdf_backend_class(name=None):
+    """The PDF text backend class registered under name; raises ValueError for unknown names"""
+    name = (name or DEFAULT_PDF_BACKEND).lower()
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Available: {sorted(PDF_BACKENDS)}")
+    return PDF_BACKENDS[name]
+
+
+def get_pdf_backend(name=None):
+    """Instantiate a PDF text backend by name
+
+    Raises ValueError for unknown names and ImportError when the backend's
+    library is not installed.
+    """
+    return pdf_backend_class(name)()
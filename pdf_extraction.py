@@ -0,0 +1,151 @@
+import time
+from collections import deque
+
+from pdf_backends import get_pdf_backend
+from uploads import source_path, source_size
+
+
+def page_needs_ocr(text, min_chars=3, min_readable_ratio=0.5):
+    """True when a page's text layer is empty or looks like garbage
+
+    Garbage means unmapped glyphs such as "(cid:12)" or U+FFFD, or mostly
+    characters that are neither letters, digits nor common punctuation.
+    """
+    stripped = ''.join(text.split())
+    if len(stripped) < min_chars:
+        return True
+    unmapped = text.count('(cid:') * len('(cid:00)') + stripped.count('\ufffd')
+    if unmapped > len(stripped) * 0.1:
+        return True
+    readable = sum(1 for char in stripped if char.isalnum() or char in '.,;:!?\'"()-%$€£&/')
+    return readable / len(stripped) < min_readable_ratio
+
+
+def iter_pdf_pages(source, filename, backend=None):
+    """Yield PDF extraction events one page at a time
+
+    Events are dicts with an "event" key: one "start", one "page" per page as
+    soon as its text is extracted, then "end" (or "error"). Page text is not
+    kept after it is yielded, so memory stays flat however long the document is.
+    """
+    start = time.perf_counter()
+    file_size = source_size(source)
+
+    try:
+        backend = backend or get_pdf_backend()
+        with backend.open(source) as pdf_document:
+            num_pages = pdf_document.page_count
+
+            yield {
+                "event": "start",
+                "filename": filename,
+                "file_size_bytes": file_size,
+                "total_pages": num_pages,
+                "pdf_backend": backend.name
+            }
+
+            pages_with_text = 0
+            total_words = 0
+            total_chars = 0
+
+            for page_num, page_text in enumerate(pdf_document.iter_page_texts()):
+                word_count = len(page_text.split())
+                if page_text.strip():
+                    pages_with_text += 1
+                total_words += word_count
+                total_chars += len(page_text)
+
+                yield {
+                    "event": "page",
+                    "page": page_num + 1,
+                    "total_pages": num_pages,
+                    "method": f"{backend.label} text layer",
+                    "text": page_text,
+                    "word_count": word_count,
+                    "character_count": len(page_text),
+                    "needs_ocr": page_needs_ocr(page_text)
+                }
+
+            yield {
+                "event": "end",
+                "filename": filename,
+                "total_pages": num_pages,
+                "pages_with_text": pages_with_text,
+                "word_count": total_words,
+                "character_count": total_chars,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+            }
+
+    except Exception as e:
+        yield {"event": "error", "filename": filename, "error": f"PDF processing failed: {str(e)}"}
+
+
+def render_pdf_page(filepath, page_number, dpi=200):
+    """Rasterize a single PDF page (1-based) to a PIL image"""
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(filepath, dpi=dpi, first_page=page_number, last_page=page_number)
+    return images[0] if images else None
+
+
+def ocr_pdf_pages(pool, source, page_numbers, dpi=200, config='', progress=None):
+    """Render the given pages one at a time and OCR them in parallel on the pool
+
+    Only the requested pages are rendered, and at most a couple of rendered
+    pages per OCR worker are held in memory at once. source is a path or an
+    in-memory PDF (written out once, pdftoppm only reads files). Returns
+    ({page_number: text}, {page_number: error}).
+    """
+    import pdf2image  # noqa: F401  Fail early when rasterization is unavailable
+
+    with source_path(source) as filepath:
+        return _ocr_pdf_file(pool, filepath, page_numbers, dpi, config, progress)
+
+
+def _ocr_pdf_file(pool, filepath, page_numbers, dpi, config, progress):
+    texts = {}
+    errors = {}
+    in_flight = deque()
+    max_in_flight = max(1, pool.parallelism) * 2
+    total = len(page_numbers)
+    blank = 0  # pages pdftoppm rendered to nothing
+
+    def report():
+        if progress is not None:
+            progress(len(texts) + len(errors) + blank, total)
+
+    def collect():
+        page_number, image, future, from_pool = in_flight.popleft()
+        try:
+            try:
+                texts[page_number] = future.result()[0]
+            except Exception as e:
+                if not from_pool:
+                    raise
+                pool.worker_failed(e, f"call on page {page_number}")
+                texts[page_number] = pool.submit_image_to_string(image, config, use_pool=False).result()[0]
+        except Exception as e:
+            errors[page_number] = str(e)
+        report()
+
+    for page_number in page_numbers:
+        try:
+            image = render_pdf_page(filepath, page_number, dpi)
+        except Exception as e:
+            errors[page_number] = f"Rendering failed: {str(e)}"
+            report()
+            continue
+        if image is None:
+            blank += 1
+            report()
+            continue
+
+        from_pool = pool.pooled
+        in_flight.append((page_number, image, pool.submit_image_to_string(image, config), from_pool))
+        while len(in_flight) > max_in_flight:
+            collect()
+
+    while in_flight:
+        collect()
+
+    return texts, errors
@@ -0,0 +1,165 @@
+import re
+import codecs
+
+# Groups that hold no document text (tables, metadata, binary data) when they start with these
+DESTINATIONS = {
+    b'fonttbl', b'colortbl', b'stylesheet', b'info', b'pict', b'object', b'objdata', b'themedata',
+    b'colorschememapping', b'datastore', b'latentstyles', b'listtable', b'listoverridetable',
+    b'rsidtbl', b'generator', b'xmlnsdecl', b'fldinst', b'filetbl', b'revtbl', b'pgdsctbl',
+    b'nonshppict', b'sn', b'sv', b'template', b'private', b'do',
+}
+
+# Control words that stand for text
+WORD_TEXT = {
+    b'par': '\n', b'line': '\n', b'sect': '\n', b'page': '\n', b'row': '\n', b'tab': '\t', b'cell': ' | ',
+    b'emdash': '\u2014', b'endash': '\u2013', b'bullet': '\u2022', b'emspace': ' ', b'enspace': ' ',
+    b'lquote': '\u2018', b'rquote': '\u2019', b'ldblquote': '\u201c', b'rdblquote': '\u201d',
+}
+
+# Control symbols (backslash + one non-letter) that stand for text
+SYMBOL_TEXT = {
+    b'\\': '\\', b'{': '{', b'}': '}', b'~': ' ', b'_': '-', b'-': '', b'\n': '\n', b'\r': '\n', b'\t': '\t',
+}
+
+# One token: control word (with parameter and delimiting space), hex escape,
+# control symbol, group brace, or a run of text (raw line breaks included)
+TOKEN = re.compile(rb"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-fA-F]{2})|\\([^a-zA-Z])|([{}])|([^\\{}]+)")
+
+# A control word plus its parameter is never longer than this, so a chunk is only
+# tokenized up to its last backslash within this many bytes of the end
+MAX_CONTROL_BYTES = 48
+
+
+def _decoder(codepage):
+    try:
+        return codecs.getincrementaldecoder(codepage)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('cp1252')(errors='replace')
+
+
+def iter_rtf_text(f, chunk_size=64 * 1024):
+    """Yield the text of an RTF document read from a binary stream, chunk by chunk
+
+    One regex-driven pass over the bytes with a group stack: destination
+    groups (font and color tables, stylesheets, \\info, \\pict image data,
+    \\* extensions and the like) are skipped whole, \\binN data is jumped over,
+    \\uN is decoded (dropping its \\ucN fallback characters) and \\'hh and raw
+    8-bit text are decoded with the document's \\ansicpg codepage. Memory is
+    one chunk plus the group depth, however large the embedded images are.
+    """
+    decoder = _decoder('cp1252')
+    skip = False          # inside a destination group
+    uc = 1                # fallback characters that follow each \uN
+    stack = []
+    group_start = False   # the next token is the first in its group
+    fallback = 0          # fallback characters still to drop
+    high_surrogate = None
+    bin_left = 0
+    buffer = b''
+
+    while True:
+        chunk = f.read(chunk_size)
+        final = not chunk
+        buffer += chunk
+        if bin_left:
+            skipped = min(bin_left, len(buffer))
+            buffer = buffer[skipped:]
+            bin_left -= skipped
+
+        end = len(buffer)
+        if not final:
+            cut = buffer.rfind(b'\\', max(0, end - MAX_CONTROL_BYTES))
+            if cut != -1:
+                # From the start of a run, so an escaped backslash isn't split
+                while cut > 0 and buffer[cut - 1] == ord('\\'):
+                    cut -= 1
+                end = cut
+
+        out = []
+        pos = 0
+        while pos < end:
+            match = TOKEN.match(buffer, pos, end)
+            if match is None:
+                # A lone backslash at the very end
+                pos += 1
+                continue
+            pos = match.end()
+            word, param, hex_byte, symbol, brace, text = match.groups()
+
+            if brace is not None:
+                if brace == b'{':
+                    stack.append((skip, uc))
+                    group_start = True
+                elif stack:
+                    skip, uc = stack.pop()
+                    group_start = False
+                fallback = 0
+                continue
+
+            first = group_start
+            group_start = False
+
+            if word is not None:
+                if word == b'bin':
+                    # Raw binary data, not tokens
+                    pos += int(param or 0)
+                    if pos > end:
+                        bin_left = max(0, pos - len(buffer))
+                        break
+                    continue
+                if first and word in DESTINATIONS:
+                    skip = True
+                if skip:
+                    continue
+                if word == b'u' and param:
+                    code = int(param)
+                    if code < 0:
+                        code += 65536
+                    fallback = uc
+                    if 0xD800 <= code < 0xDC00:
+                        high_surrogate = code
+                        continue
+                    if 0xDC00 <= code < 0xE000 and high_surrogate is not None:
+                        code = 0x10000 + ((high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+                    high_surrogate = None
+                    out.append(chr(code) if not 0xD800 <= code < 0xE000 else '\ufffd')
+                    continue
+                fallback = 0
+                if word == b'uc':
+                    uc = int(param or 1)
+                elif word == b'ansicpg' and param:
+                    decoder = _decoder(f'cp{param.decode()}')
+                elif word in WORD_TEXT:
+                    out.append(WORD_TEXT[word])
+
+            elif hex_byte is not None:
+                if skip:
+                    continue
+                if fallback:
+                    fallback -= 1
+                    continue
+                out.append(decoder.decode(bytes((int(hex_byte, 16),))))
+
+            elif symbol is not None:
+                if symbol == b'*' and first:
+                    skip = True
+                if skip:
+                    continue
+                fallback = 0
+                out.append(SYMBOL_TEXT.get(symbol, ''))
+
+            elif not skip:
+                # Line breaks in the source are not text
+                text = text.replace(b'\r', b'').replace(b'\n', b'')
+                if fallback:
+                    dropped = min(fallback, len(text))
+                    text = text[dropped:]
+                    fallback -= dropped
+                if text:
+                    out.append(decoder.decode(text))
+
+        buffer = buffer[pos:] if pos < len(buffer) else b''
+        if out:
+            yield ''.join(out)
+        if final:
+            return
@@ -0,0 +1,254 @@
+import io
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
+
+from ooxml import R_NS, part_relationships
+
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+P_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+
+DRAW_NS = 'urn:oasis:names:tc:opendocument:xmlns:drawing:1.0'
+PRESENTATION_NS = 'urn:oasis:names:tc:opendocument:xmlns:presentation:1.0'
+TEXT_NS = 'urn:oasis:names:tc:opendocument:xmlns:text:1.0'
+TABLE_NS = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+
+# Placeholders that repeat on every slide and carry no content
+SKIPPED_PLACEHOLDERS = {'sldNum', 'dt', 'ftr', 'hdr', 'sldImg'}
+TITLE_PLACEHOLDERS = {'title', 'ctrTitle'}
+
+# Decks smaller than this are parsed in the request thread: starting the work costs more than it saves
+PARALLEL_MIN_SLIDES = 8
+
+
+def _pptx_paragraphs(element):
+    """Non-empty paragraph texts under a DrawingML text body"""
+    paragraphs = []
+    for paragraph in element.iter(f'{{{A_NS}}}p'):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f'{{{A_NS}}}t' and node.text:
+                parts.append(node.text)
+            elif node.tag == f'{{{A_NS}}}br':
+                parts.append('\n')
+        text = ''.join(parts).strip()
+        if text:
+            paragraphs.append(text)
+    return paragraphs
+
+
+def _pptx_table(table):
+    rows = []
+    for row in table.iter(f'{{{A_NS}}}tr'):
+        cells = [' '.join(_pptx_paragraphs(cell)) for cell in row.iter(f'{{{A_NS}}}tc')]
+        if any(cells):
+            rows.append(cells)
+    return rows
+
+
+def _placeholder_type(shape):
+    placeholder = shape.find(f'.//{{{P_NS}}}nvPr/{{{P_NS}}}ph')
+    if placeholder is None:
+        return None
+    return placeholder.get('type', 'body')
+
+
+def parse_pptx_slide(number, slide_xml, notes_xml=None):
+    """Title, body text, tables, notes and image relationship ids of one PPTX slide
+
+    Runs in the slide worker processes, so it only takes and returns plain data.
+    """
+    root = ElementTree.fromstring(slide_xml)
+    slide = {"slide": number, "title": "", "text": [], "tables": [], "notes": "", "images": []}
+
+    for shape in root.iter(f'{{{P_NS}}}sp'):
+        placeholder = _placeholder_type(shape)
+        if placeholder in SKIPPED_PLACEHOLDERS:
+            continue
+        paragraphs = _pptx_paragraphs(shape)
+        if placeholder in TITLE_PLACEHOLDERS and not slide["title"]:
+            slide["title"] = ' '.join(paragraphs)
+        else:
+            slide["text"].extend(paragraphs)
+
+    for table in root.iter(f'{{{A_NS}}}tbl'):
+        rows = _pptx_table(table)
+        if rows:
+            slide["tables"].append(rows)
+
+    for blip in root.iter(f'{{{A_NS}}}blip'):
+        rel_id = blip.get(f'{{{R_NS}}}embed')
+        if rel_id:
+            slide["images"].append(rel_id)
+
+    if notes_xml:
+        notes = ElementTree.fromstring(notes_xml)
+        paragraphs = []
+        for shape in notes.iter(f'{{{P_NS}}}sp'):
+            if _placeholder_type(shape) == 'body':
+                paragraphs.extend(_pptx_paragraphs(shape))
+        slide["notes"] = '\n'.join(paragraphs)
+
+    return slide
+
+
+def _parse_pptx_slide_args(args):
+    return parse_pptx_slide(*args)
+
+
+def read_pptx(archive, workers=1):
+    """Slides of a PPTX in presentation order, parsed in parallel when there are enough
+
+    Each slide's images are archive members, ready for slide_images().
+    """
+    presentation = 'ppt/presentation.xml'
+    presentation_rels = part_relationships(archive, presentation)
+    slide_ids = ElementTree.fromstring(archive.read(presentation)).iter(f'{{{P_NS}}}sldId')
+
+    jobs = []
+    media = []
+    for number, slide_id in enumerate(slide_ids, 1):
+        _, part = presentation_rels[slide_id.get(f'{{{R_NS}}}id')]
+        rels = part_relationships(archive, part)
+        notes = next((target for kind, target in rels.values() if kind == 'notesSlide'), None)
+        jobs.append((number, archive.read(part), archive.read(notes) if notes in archive.NameToInfo else None))
+        media.append({rel_id: target for rel_id, (kind, target) in rels.items() if kind == 'image'})
+
+    slides = slide_map(_parse_pptx_slide_args, jobs, workers)
+    for slide, images in zip(slides, media):
+        slide["images"] = [images[rel_id] for rel_id in dict.fromkeys(slide["images"]) if rel_id in images]
+    return slides
+
+
+def _odp_text(element):
+    """Non-empty paragraph texts under an ODF element, in document order"""
+    paragraphs = []
+    for node in element.iter():
+        if node.tag in (f'{{{TEXT_NS}}}p', f'{{{TEXT_NS}}}h'):
+            text = ''.join(node.itertext()).strip()
+            if text:
+                paragraphs.append(text)
+    return paragraphs
+
+
+def parse_odp_page(number, page):
+    """Same fields as parse_pptx_slide for one draw:page element"""
+    slide = {"slide": number, "title": "", "text": [], "tables": [], "notes": "", "images": []}
+
+    notes = page.find(f'{{{PRESENTATION_NS}}}notes')
+    if notes is not None:
+        page.remove(notes)
+        slide["notes"] = '\n'.join(_odp_text(notes))
+
+    for frame in page.iter(f'{{{DRAW_NS}}}frame'):
+        kind = frame.get(f'{{{PRESENTATION_NS}}}class')
+        for image in frame.iter(f'{{{DRAW_NS}}}image'):
+            href = image.get(f'{{{XLINK_NS}}}href')
+            if href and not href.startswith(('http:', 'https:')):
+                slide["images"].append(href.lstrip('./'))
+        table = frame.find(f'.//{{{TABLE_NS}}}table')
+        if table is not None:
+            rows = []
+            for row in table.iter(f'{{{TABLE_NS}}}table-row'):
+                cells = [' '.join(_odp_text(cell)) for cell in row.iter(f'{{{TABLE_NS}}}table-cell')]
+                if any(cells):
+                    rows.append(cells)
+            if rows:
+                slide["tables"].append(rows)
+            continue
+        paragraphs = _odp_text(frame)
+        if kind == 'title' and not slide["title"]:
+            slide["title"] = ' '.join(paragraphs)
+        elif kind not in ('page-number', 'date-time', 'footer', 'header'):
+            slide["text"].extend(paragraphs)
+
+    # Shapes outside frames (custom shapes, text drawn directly on the page)
+    for shape in page:
+        if shape.tag != f'{{{DRAW_NS}}}frame' and shape.find(f'.//{{{DRAW_NS}}}frame') is None:
+            slide["text"].extend(_odp_text(shape))
+    return slide
+
+
+def read_odp(archive):
+    """Slides of an ODP in order
+
+    Every page lives in the one content.xml, so pages are read in a single
+    iterparse pass (each dropped once parsed) rather than fanned out.
+    """
+    slides = []
+    with archive.open('content.xml') as content:
+        parents = []
+        for event, element in ElementTree.iterparse(content, events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag == f'{{{DRAW_NS}}}page':
+                slides.append(parse_odp_page(len(slides) + 1, element))
+                parents[-1].remove(element)
+    return slides
+
+
+def slide_images(archive, slides, max_images, min_size=32):
+    """[(slide index, PIL image)] for the embedded images worth sending to OCR
+
+    Images are taken in slide order up to max_images; icons, formats Pillow
+    can't open (EMF/WMF) and the same picture reused on several slides are skipped.
+    """
+    from PIL import Image
+
+    images = []
+    seen = set()
+    for index, slide in enumerate(slides):
+        for member in slide["images"]:
+            if len(images) >= max_images:
+                return images
+            if member in seen or member not in archive.NameToInfo:
+                continue
+            seen.add(member)
+            try:
+                image = Image.open(io.BytesIO(archive.read(member)))
+                image.load()
+            except Exception:
+                continue
+            if min(image.size) >= min_size:
+                images.append((index, image))
+    return images
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _slide_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, like the OCR pool: workers don't inherit the server's threads
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            print(f"Slide worker pool started with {workers} workers")
+        return _executor
+
+
+def slide_map(function, jobs, workers):
+    """[function(job) for job in jobs], spread over the slide worker processes
+
+    The pool is started on first use and shared by every request. Small
+    decks, workers <= 1 and a broken pool all parse in the calling thread.
+    """
+    global _executor
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_SLIDES:
+        executor = _slide_executor(workers)
+        try:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            return list(executor.map(function, jobs, chunksize=chunksize))
+        except BrokenProcessPool as e:
+            print(f"Slide worker pool unavailable, parsing in the request thread: {e}")
+            with _executor_lock:
+                if _executor is executor:
+                    _executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+    return [function(job) for job in jobs]
@@ -0,0 +1,167 @@
+"""Detect a file's format from its first bytes, using the extension only as a hint"""
+from uploads import open_source
+
+# How much of the upload is read for detection
+SNIFF_BYTES = 8192
+
+MIME_FORMATS = {
+    'application/pdf': 'pdf',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/bmp': 'bmp',
+    'image/x-ms-bmp': 'bmp',
+    'image/tiff': 'tiff',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'pptx',
+    'application/vnd.oasis.opendocument.text': 'odt',
+    'application/vnd.oasis.opendocument.spreadsheet': 'ods',
+    'application/vnd.oasis.opendocument.presentation': 'odp',
+    'application/epub+zip': 'epub',
+    'application/msword': 'doc',
+    'application/vnd.ms-excel': 'xls',
+    'application/vnd.ms-powerpoint': 'ppt',
+    'text/rtf': 'rtf',
+    'application/rtf': 'rtf',
+    'text/html': 'html',
+    'text/xml': 'xml',
+    'application/xml': 'xml',
+    'application/json': 'json',
+    'text/csv': 'csv',
+    'text/markdown': 'md',
+    'text/plain': 'txt',
+}
+
+# Formats that are plain text underneath: the extension says more than the bytes
+TEXT_FORMATS = {'txt', 'md', 'markdown', 'csv', 'json', 'html', 'htm', 'xml', 'rtf'}
+
+# ZIP and OLE2 containers that libmagic (or our signatures) can't always tell apart
+ZIP_FORMATS = {'docx', 'xlsx', 'pptx', 'odt', 'ods', 'odp', 'epub'}
+OLE_FORMATS = {'doc', 'xls', 'ppt'}
+
+# Formats that are the same thing under another name
+ALIASES = {'jpeg': 'jpg', 'tif': 'tiff', 'htm': 'html', 'markdown': 'md'}
+
+SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'{\\rtf', 'rtf'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'ole'),
+    (b'PK\x03\x04', 'zip'),
+]
+
+ODF_MIMETYPES = {
+    b'application/vnd.oasis.opendocument.text': 'odt',
+    b'application/vnd.oasis.opendocument.spreadsheet': 'ods',
+    b'application/vnd.oasis.opendocument.presentation': 'odp',
+    b'application/epub+zip': 'epub',
+}
+
+OOXML_PARTS = [(b'word/', 'docx'), (b'xl/', 'xlsx'), (b'ppt/', 'pptx')]
+
+try:
+    import magic
+except ImportError:
+    magic = None
+    print("python-magic is not installed, detecting formats from built-in signatures")
+
+
+def _magic_mime(head):
+    try:
+        return magic.from_buffer(head, mime=True)
+    except Exception as e:
+        print(f"libmagic detection failed: {e}")
+        return None
+
+
+def _signature_format(head):
+    """Best-effort format from well-known magic numbers when libmagic is unavailable"""
+    if b'%PDF-' in head[:1024]:
+        return 'pdf'
+    # BMP: "BM" then a DIB header whose size is one of the known values
+    if head[:2] == b'BM' and len(head) >= 18 and int.from_bytes(head[14:18], 'little') in (12, 40, 52, 56, 64, 108, 124):
+        return 'bmp'
+    for signature, file_format in SIGNATURES:
+        if head.startswith(signature):
+            break
+    else:
+        return _text_format(head)
+
+    if file_format == 'zip':
+        # ODF/EPUB store an uncompressed "mimetype" member first
+        if head[30:38] == b'mimetype':
+            for mimetype, odf_format in ODF_MIMETYPES.items():
+                if head[38:38 + len(mimetype)] == mimetype:
+                    return odf_format
+        for part, ooxml_format in OOXML_PARTS:
+            if part in head:
+                return ooxml_format
+    return file_format
+
+
+def _text_format(head):
+    """'txt' (or a more specific text format) for bytes that decode as text, else None"""
+    if b'\x00' in head:
+        return None
+    try:
+        text = head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is fine
+        if e.start < len(head) - 3:
+            return None
+        text = head[:e.start].decode('utf-8')
+    stripped = text.lstrip().lower()
+    if stripped.startswith('<?xml'):
+        return 'xml'
+    if stripped.startswith(('<!doctype html', '<html')):
+        return 'html'
+    if stripped[:1] in ('{', '['):
+        return 'json'
+    return 'txt'
+
+
+def detect_format(head, extension):
+    """(format, mime, detected_by) for the first bytes of a file and its extension
+
+    detected_by is "magic" (libmagic), "signature" (built-in magic numbers)
+    or "extension" when the bytes were not conclusive. The extension wins
+    for text formats (CSV looks like plain text) and to pick between
+    formats sharing a container (ZIP, OLE2).
+    """
+    hint = ALIASES.get(extension, extension)
+    mime = None
+    if magic is not None:
+        mime = _magic_mime(head)
+        detected = MIME_FORMATS.get(mime)
+        if detected is None and mime and mime.startswith('text/'):
+            detected = 'txt'
+        elif mime in ('application/zip', 'application/x-zip-compressed'):
+            detected = 'zip'
+        elif mime in ('application/x-ole-storage', 'application/CDFV2'):
+            detected = 'ole'
+        detected_by = 'magic'
+    else:
+        detected = _signature_format(head)
+        detected_by = 'signature'
+
+    if detected is None:
+        return hint, mime, 'extension'
+    if detected in TEXT_FORMATS and hint in TEXT_FORMATS:
+        return hint, mime, detected_by
+    if detected == 'zip':
+        return (hint if hint in ZIP_FORMATS else 'zip'), mime, detected_by
+    if detected == 'ole':
+        return (hint if hint in OLE_FORMATS else 'ole'), mime, detected_by
+    return detected, mime, detected_by
+
+
+def sniff_source(source, extension):
+    """detect_format for a path or in-memory buffer"""
+    with open_source(source) as f:
+        head = f.read(SNIFF_BYTES)
+    return detect_format(head, extension)
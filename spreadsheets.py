@@ -0,0 +1,169 @@
+import zipfile
+import datetime
+from xml.etree import ElementTree
+
+TABLE_NS = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+OFFICE_NS = 'urn:oasis:names:tc:opendocument:xmlns:office:1.0'
+
+TABLE = f'{{{TABLE_NS}}}table'
+TABLE_NAME = f'{{{TABLE_NS}}}name'
+TABLE_ROW = f'{{{TABLE_NS}}}table-row'
+ROWS_REPEATED = f'{{{TABLE_NS}}}number-rows-repeated'
+CELLS = (f'{{{TABLE_NS}}}table-cell', f'{{{TABLE_NS}}}covered-table-cell')
+COLUMNS_REPEATED = f'{{{TABLE_NS}}}number-columns-repeated'
+ANNOTATION = f'{{{OFFICE_NS}}}annotation'
+OFFICE_VALUES = (f'{{{OFFICE_NS}}}value', f'{{{OFFICE_NS}}}date-value',
+                 f'{{{OFFICE_NS}}}time-value', f'{{{OFFICE_NS}}}boolean-value')
+
+# Widest sheet Excel or LibreOffice can hold; repeated empty columns are never expanded past it
+MAX_COLUMNS = 16384
+
+
+def cell_text(value):
+    """A cell value as text: whole floats without ".0", dates in ISO format"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def trim_row(values):
+    """Drop trailing empty cells"""
+    end = len(values)
+    while end and not values[end - 1]:
+        end -= 1
+    return values[:end]
+
+
+def iter_xlsx_sheets(f):
+    """Yield (sheet name, rows) for an XLSX file; rows lazily yields lists of cell texts
+
+    openpyxl's read-only mode parses each worksheet's XML as it is iterated,
+    so a sheet's rows are never all in memory at once.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(f, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            yield sheet.title, (trim_row([cell_text(value) for value in row])
+                                for row in sheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def _ods_cell_text(cell):
+    paragraphs = []
+    for child in cell:
+        if child.tag != ANNOTATION:
+            paragraphs.append(''.join(child.itertext()).strip())
+    text = '\n'.join(p for p in paragraphs if p)
+    if not text:
+        for attribute in OFFICE_VALUES:
+            if cell.get(attribute):
+                return cell.get(attribute)
+    return text
+
+
+def _ods_cells(row):
+    cells = []
+    pending_empty = 0
+    for cell in row:
+        if cell.tag not in CELLS:
+            continue
+        repeat = int(cell.get(COLUMNS_REPEATED, 1))
+        text = _ods_cell_text(cell)
+        if not text:
+            # Only kept if a non-empty cell follows
+            pending_empty += repeat
+            continue
+        room = MAX_COLUMNS - len(cells)
+        cells.extend([''] * min(pending_empty, room))
+        pending_empty = 0
+        cells.extend([text] * min(repeat, MAX_COLUMNS - len(cells)))
+    return cells
+
+
+def _ods_rows(events, parents, table):
+    for event, element in events:
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element is table:
+            return
+        if element.tag == TABLE_ROW:
+            cells = _ods_cells(element)
+            repeat = int(element.get(ROWS_REPEATED, 1))
+            # Detach the parsed row so the tree doesn't grow with the sheet
+            parents[-1].remove(element)
+            if cells:
+                for _ in range(repeat):
+                    yield cells
+
+
+def _skip_table(events, parents, table):
+    """Parse past the rest of a table the caller stopped reading, keeping no rows"""
+    while any(parent is table for parent in parents):
+        event, element = next(events)
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == TABLE_ROW:
+            parents[-1].remove(element)
+
+
+def iter_ods_sheets(f):
+    """Yield (sheet name, rows) for an ODS file; rows lazily yields lists of cell texts
+
+    content.xml is read with iterparse and every row is dropped from the
+    tree once parsed, so memory stays flat however long the sheet is.
+    """
+    with zipfile.ZipFile(f) as archive, archive.open('content.xml') as content:
+        events = iter(ElementTree.iterparse(content, events=('start', 'end')))
+        parents = []
+        for event, element in events:
+            if event == 'end':
+                parents.pop()
+                continue
+            parents.append(element)
+            if element.tag == TABLE:
+                rows = _ods_rows(events, parents, element)
+                yield element.get(TABLE_NAME), rows
+                rows.close()
+                _skip_table(events, parents, element)
+
+
+def read_sheets(sheets, max_rows, max_cells):
+    """Structured sheets from iter_xlsx_sheets/iter_ods_sheets, within the limits
+
+    max_rows applies to each sheet, max_cells to the whole workbook. Empty
+    rows are skipped. A sheet stops being read as soon as a limit is hit and
+    is marked truncated; once the cell limit is hit no further sheets are read.
+    """
+    result = []
+    cells_left = max_cells
+    try:
+        for name, rows in sheets:
+            if cells_left <= 0:
+                break
+            sheet = {"name": name, "rows": [], "truncated": False}
+            result.append(sheet)
+            for row in rows:
+                if not row:
+                    continue
+                if len(sheet["rows"]) >= max_rows or cells_left <= 0:
+                    sheet["truncated"] = True
+                    break
+                if len(row) > cells_left:
+                    row = row[:cells_left]
+                    sheet["truncated"] = True
+                cells_left -= len(row)
+                sheet["rows"].append(row)
+    finally:
+        sheets.close()
+    return result
@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ocr import OCRPool
+
+
+@pytest.fixture
+def thread_pool():
+    """An OCRPool whose "workers" are threads, so pool calls run the module's worker functions in-process"""
+    pool = OCRPool(size=2)
+    pool._available = True
+    pool._executor = ThreadPoolExecutor(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def no_pool():
+    """An OCRPool with the worker processes disabled: every call goes through pytesseract"""
+    pool = OCRPool(size=0)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def config():
+    """The app's configuration, as extractors see it"""
+    from app import app
+    return dict(app.config)
+
+
+@pytest.fixture
+def png_bytes():
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 32), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def build_pdf(pages):
+    """A minimal PDF with one page per string; an empty string makes a page without a text layer"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = b''.join(
+            b"BT /F1 12 Tf 72 %d Td (%s) Tj ET\n" % (720 - 16 * i, line.encode('latin-1'))
+            for i, line in enumerate(text.split('\n')) if line
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(lines), lines))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % (len(objects)))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b' '.join(kids), len(kids))
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+@pytest.fixture
+def make_pdf():
+    return build_pdf
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    """A fresh, empty extraction cache in place of the app's"""
+    import app as app_module
+    from cache import ExtractionCache
+
+    cache = ExtractionCache()
+    monkeypatch.setattr(app_module, 'result_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def client(result_cache):
+    from app import app
+    return app.test_client()
+
+
+def upload(data, filename, **form):
+    """Multipart form data for a test client request"""
+    import io
+    return {'file': (io.BytesIO(data), filename), **form}
+
+
+@pytest.fixture
+def asgi_client(result_cache, monkeypatch):
+    """Starlette test client for asgi.py, sharing the fresh extraction cache"""
+    from starlette.testclient import TestClient
+    import asgi
+
+    monkeypatch.setattr(asgi, 'result_cache', result_cache)
+    return TestClient(asgi.app)
+
+
+@pytest.fixture
+def docx_bytes():
+    import io
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph("First paragraph")
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "left"
+    table.rows[0].cells[1].text = "right"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
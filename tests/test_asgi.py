@@ -0,0 +1,183 @@
+import asyncio
+import json
+
+import pytest
+from starlette.requests import Request
+
+import asgi
+import uploads
+
+
+def files(data, filename):
+    return {'file': (filename, data)}
+
+
+def test_extract_json(asgi_client):
+    first = asgi_client.post('/extract', files=files(b'async words', 'notes.txt'), data={'mode': 'raw'}).json()
+    second = asgi_client.post('/extract', files=files(b'async words', 'notes.txt'), data={'mode': 'raw'}).json()
+    assert first['full_text'] == "async words" and first['cache_hit'] is False
+    assert second['cache_hit'] is True
+
+
+def test_extract_stream(asgi_client, make_pdf):
+    response = asgi_client.post('/extract', files=files(make_pdf(["One", "Two"]), 'doc.pdf'), data={'stream': 'ndjson'})
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event['text'] for event in events if event['event'] == 'page'] == ["One", "Two"]
+
+
+def test_extract_errors(asgi_client):
+    assert asgi_client.post('/extract', data={'format': 'json'}).status_code == 400
+    assert asgi_client.post('/extract', files=files(b'x', 'tool.exe')).status_code == 400
+    assert asgi_client.post('/extract', files=files(b'x', 'a.txt'), data={'stream': 'xml'}).status_code == 400
+
+
+def test_docx_endpoint_builds_the_context_off_the_event_loop(asgi_client, docx_bytes, monkeypatch):
+    loops = []
+
+    class RecordingContext(asgi.ExtractionContext):
+        def __init__(self, *args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(asgi, 'ExtractionContext', RecordingContext)
+    result = asgi_client.post('/extract/docx', files=files(docx_bytes, 'report.docx')).json()
+    assert "First paragraph" in result['full_text'] and "left | right" in result['full_text']
+    assert loops == [None]
+
+
+def test_docx_endpoint_rejects_other_files(asgi_client):
+    assert asgi_client.post('/extract/docx', files=files(b'x', 'notes.txt')).status_code == 400
+
+
+def receive_nothing():
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    return receive
+
+
+@pytest.mark.parametrize('content_length, status', [(b'12abc', 400), (b'99999999999999', 413)])
+def test_declared_content_length(content_length, status):
+    request = Request({
+        'type': 'http', 'method': 'POST', 'path': '/extract', 'query_string': b'',
+        'headers': [(b'content-length', content_length), (b'content-type', b'multipart/form-data; boundary=x')]
+    }, receive_nothing())
+    form, response = asyncio.run(asgi.read_upload(request, 'extract_document'))
+    assert form is None and response.status_code == status
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(asgi.flask_app.config, 'UPLOAD_SPOOL_DIR', str(tmp_path))
+    monkeypatch.setitem(asgi.flask_app.config, 'UPLOAD_MEMORY_LIMIT', 64)
+    return tmp_path
+
+
+def test_large_uploads_are_written_to_disk_once(asgi_client, spool_dir, monkeypatch):
+    written = []
+    write = uploads.SpoolFile.write
+    monkeypatch.setattr(uploads.SpoolFile, 'write', lambda self, data: written.append(len(data)) or write(self, data))
+
+    async def no_form(self, *args, **kwargs):
+        raise AssertionError("Starlette's form parser spools uploads itself")
+
+    monkeypatch.setattr(Request, 'form', no_form)
+    data = b'word ' * 1000
+    result = asgi_client.post('/extract', files=files(data, 'big.txt'), data={'mode': 'raw'}).json()
+
+    assert result['word_count'] == 1000
+    assert sum(written) == len(data)
+    assert list(spool_dir.iterdir()) == []
+
+
+def multipart_chunks(data, filename, boundary=b'x-boundary', chunk_size=100):
+    body = (b'--' + boundary + b'\r\nContent-Disposition: form-data; name="file"; filename="' + filename.encode()
+            + b'"\r\n\r\n' + data + b'\r\n--' + boundary + b'--\r\n')
+    return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+def test_chunked_upload_over_the_limit(asgi_client, spool_dir, monkeypatch):
+    monkeypatch.setitem(asgi.flask_app.config['UPLOAD_LIMITS'], 'extract_document', 500)
+    headers = {'content-type': 'multipart/form-data; boundary=x-boundary'}
+
+    response = asgi_client.post('/extract', content=iter(multipart_chunks(b'x' * 2000, 'big.txt')), headers=headers)
+    assert 'content-length' not in response.request.headers
+    assert response.status_code == 413
+    assert response.json() == {"error": "Upload too large", "max_bytes": 500}
+    assert list(spool_dir.iterdir()) == []
+
+    small = asgi_client.post('/extract', content=iter(multipart_chunks(b'small words', 'a.txt')), headers=headers)
+    assert small.status_code == 200 and "small words" in small.json()['full_text']
+
+
+def test_chunked_body_is_not_read_past_the_limit(monkeypatch):
+    chunks = multipart_chunks(b'x' * 2000, 'big.txt')
+    received = []
+
+    async def receive():
+        received.append(chunks[len(received)])
+        return {'type': 'http.request', 'body': received[-1], 'more_body': len(received) < len(chunks)}
+
+    request = Request({
+        'type': 'http', 'method': 'POST', 'path': '/extract', 'query_string': b'',
+        'headers': [(b'content-type', b'multipart/form-data; boundary=x-boundary')]
+    }, receive)
+    monkeypatch.setitem(asgi.flask_app.config['UPLOAD_LIMITS'], 'extract_document', 250)
+    fields, response = asyncio.run(asgi.read_upload(request, 'extract_document'))
+    assert fields is None and response.status_code == 413
+    assert len(received) == 3
+
+
+def test_flask_routes_are_mounted(asgi_client):
+    assert asgi_client.get('/health').json()['status'] == 'healthy'
+
+
+class FakeProcessor:
+    """Stands in for DocumentProcessor: an awaitable extraction that records what it was given"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def extract_text_with_kreuzberg(self, file_path):
+        await asyncio.sleep(0)
+        with open(file_path, 'rb') as f:
+            self.calls.append(f.read())
+        if self.error:
+            return {'text': '', 'method': 'Kreuzberg', 'error': self.error}
+        return {'text': "kreuzberg words", 'page_count': 3, 'metadata': {'created': asgi.json}}
+
+
+OLE_DOC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 600
+
+
+def test_kreuzberg_formats_are_awaited(asgi_client, monkeypatch):
+    processor = FakeProcessor()
+    monkeypatch.setattr(asgi, 'document_processor', processor)
+    first = asgi_client.post('/extract', files=files(OLE_DOC, 'letter.doc')).json()
+    second = asgi_client.post('/extract', files=files(OLE_DOC, 'letter.doc')).json()
+
+    assert processor.calls == [OLE_DOC]
+    assert first['extraction_method'] == "Kreuzberg (DocumentProcessor)"
+    assert first['full_text'] == "kreuzberg words" and first['total_pages'] == 3
+    # Non-JSON metadata is stringified
+    assert isinstance(first['metadata']['created'], str)
+    assert first['cache_hit'] is False and second['cache_hit'] is True
+
+
+def test_kreuzberg_failure_falls_back_to_the_built_in_extractors(asgi_client, monkeypatch):
+    processor = FakeProcessor(error="unsupported file")
+    monkeypatch.setattr(asgi, 'document_processor', processor)
+    result = asgi_client.post('/extract', files=files(OLE_DOC, 'letter.doc')).json()
+    assert processor.calls == [OLE_DOC]
+    assert result['extraction_method'] != "Kreuzberg (DocumentProcessor)"
+
+
+def test_other_formats_skip_kreuzberg(asgi_client, monkeypatch):
+    processor = FakeProcessor()
+    monkeypatch.setattr(asgi, 'document_processor', processor)
+    result = asgi_client.post('/extract', files=files(b'plain words', 'notes.txt'), data={'mode': 'raw'}).json()
+    assert result['full_text'] == "plain words" and processor.calls == []
@@ -0,0 +1,71 @@
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from batch import ArchiveLimitError, expand_archive, is_archive
+from conftest import upload
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_is_archive():
+    assert is_archive('docs.ZIP') and is_archive('docs.tar.gz') and not is_archive('docs.pdf')
+
+
+def test_members_get_numbered_sanitised_paths(tmp_path):
+    archive = tmp_path / 'upload.zip'
+    archive.write_bytes(zip_bytes({'../../etc/evil.txt': b'x', 'dir/a.txt': b'a', '__MACOSX/._a.txt': b'', 'dir/.DS_Store': b''}))
+    target = tmp_path / 'out'
+    target.mkdir()
+
+    items = expand_archive(str(archive), str(target), max_files=10, max_bytes=1000)
+    assert [(name, filename) for name, _, filename in items] == [('../../etc/evil.txt', 'evil.txt'), ('dir/a.txt', 'a.txt')]
+    assert all(path.startswith(str(target)) for _, path, _ in items)
+
+
+def test_tar_archives(tmp_path):
+    archive = tmp_path / 'upload.tar.gz'
+    with tarfile.open(archive, 'w:gz') as tar:
+        info = tarfile.TarInfo('notes.txt')
+        info.size = 5
+        tar.addfile(info, io.BytesIO(b'hello'))
+    items = expand_archive(str(archive), str(tmp_path), max_files=10, max_bytes=1000)
+    assert open(items[0][1], 'rb').read() == b'hello'
+
+
+@pytest.mark.parametrize('max_files, max_bytes', [(1, 1000), (10, 3)])
+def test_archive_limits(tmp_path, max_files, max_bytes):
+    archive = tmp_path / 'upload.zip'
+    archive.write_bytes(zip_bytes({'a.txt': b'aa', 'b.txt': b'bb'}))
+    with pytest.raises(ArchiveLimitError):
+        expand_archive(str(archive), str(tmp_path), max_files=max_files, max_bytes=max_bytes)
+
+
+def test_batch_streams_one_line_per_file(client):
+    archive = zip_bytes({'inner/one.txt': b'first file', 'two.md': b'second file', 'tool.exe': b'MZ'})
+    response = client.post('/extract/batch', data={
+        'files': [(io.BytesIO(archive), 'bundle.zip'), (io.BytesIO(b'third file'), 'three.txt')]
+    })
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1] == {"summary": {"total": 4, "succeeded": 3, "failed": 1}}
+    assert {"name": "tool.exe", "status": "error", "error": "File type not supported"} in lines
+    texts = {line['name']: line['result']['full_text'] for line in lines if line.get('status') == 'success'}
+    assert texts == {'inner/one.txt': "first file", 'two.md': "second file", 'three.txt': "third file"}
+
+
+def test_batch_errors(client):
+    assert client.post('/extract/batch', data={}).status_code == 400
+    response = client.post('/extract/batch', data=upload(b'not an archive', 'bundle.zip'))
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith("Batch rejected")
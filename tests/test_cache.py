@@ -0,0 +1,100 @@
+import io
+
+import pytest
+
+import extractors
+from cache import ExtractionCache, file_sha256
+from conftest import upload
+
+
+def test_key_depends_on_content_and_parameters():
+    key = ExtractionCache.make_key('abc', {'endpoint': 'extract', 'format': 'json'})
+    assert key == ExtractionCache.make_key('abc', {'format': 'json', 'endpoint': 'extract'})
+    assert key != ExtractionCache.make_key('abd', {'endpoint': 'extract', 'format': 'json'})
+    assert key != ExtractionCache.make_key('abc', {'endpoint': 'extract', 'format': 'csv'})
+
+
+def test_file_sha256_of_paths_and_buffers(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'hello')
+    assert file_sha256(str(path)) == file_sha256(io.BytesIO(b'hello'))
+
+
+def test_memory_tier_is_an_lru_bounded_by_size():
+    cache = ExtractionCache(max_bytes=70)
+    cache.set('a', {'text': 'x' * 20})
+    cache.set('b', {'text': 'y' * 20})
+    assert cache.get('a') == {'text': 'x' * 20}
+    cache.set('c', {'text': 'z' * 20})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['memory_entries'] == 2
+    assert stats['memory_hits'] == 3 and stats['misses'] == 1
+
+
+def test_second_request_is_served_from_cache(client):
+    first = client.post('/extract', data=upload(b'cached words', 'notes.txt')).get_json()
+    second = client.post('/extract', data=upload(b'cached words', 'notes.txt')).get_json()
+    assert first['cache_hit'] is False and second['cache_hit'] is True
+    assert second['full_text'] == first['full_text']
+
+    other_params = client.post('/extract', data=upload(b'cached words', 'notes.txt', max_chars='6')).get_json()
+    assert other_params['cache_hit'] is False
+
+
+def test_renamed_resubmission_is_a_hit_with_its_own_name(client, make_pdf):
+    pdf = make_pdf(["Quarterly figures"])
+    first = client.post('/extract', data=upload(pdf, 'a.pdf')).get_json()
+    second = client.post('/extract', data=upload(pdf, 'b.pdf')).get_json()
+    assert first['cache_hit'] is False and second['cache_hit'] is True
+    assert second['filename'] == 'b.pdf'
+    assert "Document: b.pdf" in second['full_text'] and "a.pdf" not in second['full_text']
+
+
+def test_output_options_share_one_entry(client, make_pdf):
+    pdf = make_pdf(["First page", "Second page"])
+    assert client.post('/extract', data=upload(pdf, 'report.pdf')).get_json()['cache_hit'] is False
+    raw = client.post('/extract', data=upload(pdf, 'report.pdf', mode='raw')).get_json()
+    assert raw['cache_hit'] is True and raw['full_text'].startswith("--- Page 1 ---")
+
+    misses = result_cache_misses(client)
+    response = client.post('/extract', data=upload(pdf, 'report.pdf', format='csv', csv_split='page'))
+    assert b"Second page" in response.data
+    assert result_cache_misses(client) == misses
+
+
+def result_cache_misses(client):
+    return client.get('/cache/stats').get_json()['misses']
+
+
+@pytest.fixture
+def ocr_outage(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("pdftoppm not found")
+
+    monkeypatch.setattr(extractors, 'ocr_pdf_pages', unavailable)
+
+
+def test_results_with_failed_ocr_are_not_cached(client, make_pdf, ocr_outage):
+    pdf = make_pdf(["A page with a text layer", ""])
+    for _ in range(2):
+        result = client.post('/extract', data=upload(pdf, 'scan.pdf')).get_json()
+        assert result['cache_hit'] is False
+        assert result['degraded'] == "OCR unavailable: pdftoppm not found"
+        assert result['pages'][1]['method'] == 'ocr_failed'
+
+
+def test_failed_pages_mark_the_result_degraded(client, make_pdf, monkeypatch):
+    monkeypatch.setattr(extractors, 'ocr_pdf_pages', lambda *args, **kwargs: ({}, {2: "tesseract crashed"}))
+    result = client.post('/extract', data=upload(make_pdf(["Text layer", ""]), 'scan.pdf')).get_json()
+    assert result['degraded'] == "OCR failed on 1 page(s)"
+    assert client.post('/extract', data=upload(make_pdf(["Text layer", ""]), 'scan.pdf')).get_json()['cache_hit'] is False
+
+
+def test_failed_extractions_are_not_cached(client):
+    for _ in range(2):
+        result = client.post('/extract', data=upload(b'%PDF-1.4 truncated', 'broken.pdf')).get_json()
+        assert result['cache_hit'] is False
+        assert result['degraded']
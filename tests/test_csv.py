@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+
+import csv_extraction
+from conftest import upload
+from csv_extraction import CsvTable, iter_csv_events
+
+
+def table(data, **limits):
+    table = CsvTable(io.BytesIO(data), **limits)
+    return table, list(table)
+
+
+@pytest.mark.parametrize('data, delimiter', [
+    (b'name,city\nAda,"London, UK"\n', 'comma'),
+    (b'name;city\nAda;"London, UK"\n', 'semicolon'),
+    (b'name\tcity\nAda\tLondon, UK\n', 'tab'),
+    (b'name|city\nAda|London, UK\n', 'pipe'),
+])
+def test_dialect_is_sniffed(data, delimiter):
+    csv_table, rows = table(data)
+    assert rows == [["name", "city"], ["Ada", "London, UK"]]
+    assert csv_table.info["delimiter"] == delimiter
+
+
+@pytest.mark.parametrize('data, encoding', [
+    ('name,city\nZoë,Zürich\n'.encode('utf-8-sig'), 'utf-8-sig'),
+    ('name,city\nZoë,Zürich\n'.encode('utf-16'), 'utf-16'),
+    ('name,city\nZoë,Zürich\n'.encode('utf-8'), 'utf-8'),
+])
+def test_encoding_is_detected(data, encoding):
+    csv_table, rows = table(data)
+    assert csv_table.encoding == encoding
+    assert rows[1] == ["Zoë", "Zürich"]
+
+
+def test_legacy_encoding_without_charset_detection(monkeypatch):
+    monkeypatch.setattr(csv_extraction, 'from_bytes', None)
+    csv_table, rows = table('name,city\nZoë,Zürich\n'.encode('cp1252'))
+    assert csv_table.encoding == 'cp1252' and rows[1] == ["Zoë", "Zürich"]
+
+
+def test_row_and_column_limits():
+    data = b'\n'.join(b'a,b,c,d' for _ in range(10))
+    csv_table, rows = table(data, max_rows=3, max_columns=2)
+    assert rows == [["a", "b"]] * 3
+    assert csv_table.truncated and csv_table.stats()["rows"] == 3
+
+
+def test_blank_lines_are_skipped():
+    assert table(b'a,b\n\n,\n1,2\n')[1] == [["a", "b"], ["1", "2"]]
+
+
+def test_extract_csv(client):
+    data = b'name,age\nAda,36\nAlan,41\n'
+    result = client.post('/extract', data=upload(data, 'people.csv', mode='raw', csv_rows='1')).get_json()
+    assert result['full_text'] == "name | age\nAda | 36\nAlan | 41"
+    assert result['rows'] == [["name", "age"], ["Ada", "36"], ["Alan", "41"]]
+    assert result['csv_stats']['has_header'] is True
+
+    truncated = client.post('/extract', data=upload(data, 'people.csv', mode='raw', max_rows='2')).get_json()
+    assert truncated['full_text'].endswith("[... truncated after 2 rows, at most 16384 columns per row]")
+    assert 'rows' not in truncated
+
+
+def test_stream_rows_in_batches(monkeypatch):
+    monkeypatch.setattr(csv_extraction, 'STREAM_BATCH_ROWS', 2)
+    data = b'\n'.join(b'%d,x' % i for i in range(5))
+    events = list(iter_csv_events(io.BytesIO(data), 'n.csv', structured=True))
+    assert [event['event'] for event in events] == ['start', 'rows', 'rows', 'rows', 'end']
+    assert [event['first_row'] for event in events[1:4]] == [1, 3, 5]
+    assert events[3]['rows'] == [["4", "x"]]
+    assert events[-1]['rows'] == 5 and events[-1]['batches'] == 3
+
+
+def test_stream_csv_endpoint(client):
+    response = client.post('/extract', data=upload(b'a,b\n1,2\n', 'n.csv', stream='ndjson', max_rows='1'))
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [event['event'] for event in events] == ['start', 'rows', 'end']
+    assert events[1]['text'] == "a | b"
+    assert events[-1]['truncated'] is True
+
+
+def test_unreadable_stream_is_an_error_event():
+    class Broken(io.BytesIO):
+        def read(self, size=-1):
+            raise OSError("disk gone")
+
+    events = list(iter_csv_events(Broken(), 'n.csv'))
+    assert events == [{"event": "error", "filename": 'n.csv', "error": "CSV processing failed: disk gone"}]
@@ -0,0 +1,110 @@
+import csv
+import io
+import time
+import threading
+
+import pytest
+
+import extractors
+from conftest import upload
+
+
+def read_csv(response):
+    assert response.mimetype == 'text/csv'
+    return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+
+@pytest.fixture
+def scanned_pdf(make_pdf, monkeypatch):
+    """A PDF whose second page is read by OCR and whose third has no text at all; OCR calls are counted"""
+    calls = []
+
+    def ocr_pdf_pages(pool, source, page_numbers, dpi, progress):
+        calls.append(page_numbers)
+        return {2: "scanned words", 3: ""}, {}
+
+    monkeypatch.setattr(extractors, 'ocr_pdf_pages', ocr_pdf_pages)
+    return make_pdf(["First page\nsecond line", "", ""]), calls
+
+
+@pytest.mark.parametrize('mode', ['', 'raw'])
+def test_pdf_page_rows_come_from_the_cached_extraction(client, scanned_pdf, mode):
+    pdf, calls = scanned_pdf
+    for _ in range(2):
+        rows = read_csv(client.post('/extract', data=upload(pdf, 'doc.pdf', format='csv', csv_split='page', mode=mode)))
+        assert rows == [
+            ['Filename', 'Extension', 'Part', 'Text', 'Word_Count', 'Char_Count', 'Method'],
+            ['doc.pdf', 'pdf', '1', "First page\nsecond line", '4', '22', 'text_layer'],
+            ['doc.pdf', 'pdf', '2', "scanned words", '2', '13', 'ocr'],
+            ['doc.pdf', 'pdf', '3', "", '0', '0', 'ocr_no_text'],
+        ]
+    # The second request was a cache hit
+    assert calls == [[2, 3]]
+
+
+def test_text_layer_pages_go_out_before_ocr_finishes(client, make_pdf, monkeypatch):
+    released = threading.Event()
+
+    def ocr_pdf_pages(pool, source, page_numbers, dpi, progress):
+        assert released.wait(5)
+        return {2: "scanned words"}, {}
+
+    monkeypatch.setattr(extractors, 'ocr_pdf_pages', ocr_pdf_pages)
+    response = client.post('/extract', data=upload(make_pdf(["First page", ""]), 'doc.pdf', format='csv', csv_split='page'),
+                           buffered=False)
+    lines = iter(response.response)
+    assert next(lines).startswith(b'Filename,')
+    assert next(lines).startswith(b'doc.pdf,pdf,1,First page,')
+    released.set()
+    assert next(lines).startswith(b'doc.pdf,pdf,2,scanned words,')
+    response.close()
+
+
+def test_pdf_paragraph_rows_have_no_banner_text(client, scanned_pdf):
+    pdf, _ = scanned_pdf
+    rows = read_csv(client.post('/extract', data=upload(pdf, 'doc.pdf', format='csv', csv_split='paragraph')))
+    assert [row[2:4] for row in rows[1:]] == [['1', "First page"], ['2', "second line"], ['3', "scanned words"]]
+    assert {row[6] for row in rows[1:]} == {"PDF Hybrid Extraction (1 text layer, 1 OCR pages)"}
+
+
+def test_document_row_holds_the_whole_result(client, scanned_pdf):
+    pdf, _ = scanned_pdf
+    result = client.post('/extract', data=upload(pdf, 'doc.pdf')).get_json()
+    rows = read_csv(client.post('/extract', data=upload(pdf, 'doc.pdf', format='csv')))
+    assert rows[0] == ['Filename', 'Extension', 'Text', 'Word_Count', 'Char_Count', 'Method']
+    assert rows[1] == ['doc.pdf', 'pdf', result['full_text'], str(result['word_count']),
+                       str(result['character_count']), result['extraction_method']]
+
+
+def test_other_formats_split_without_banners(client, docx_bytes):
+    pages = read_csv(client.post('/extract', data=upload(docx_bytes, 'report.docx', format='csv', csv_split='page')))
+    assert len(pages) == 2 and pages[1][2] == '1'
+    assert pages[1][3] == "=== DOCUMENT CONTENT ===\nFirst paragraph\n\n=== TABLES ===\nleft | right"
+
+    lines = read_csv(client.post('/extract', data=upload(docx_bytes, 'report.docx', format='csv', csv_split='paragraph')))
+    assert [row[3] for row in lines[1:]] == ["=== DOCUMENT CONTENT ===", "First paragraph", "=== TABLES ===", "left | right"]
+
+
+def test_unknown_split_is_rejected(client, asgi_client):
+    assert client.post('/extract', data=upload(b'x', 'a.txt', format='csv', csv_split='sheet')).status_code == 400
+    assert asgi_client.post('/extract', files={'file': ('a.txt', b'x')},
+                            data={'format': 'csv', 'csv_split': 'sheet'}).status_code == 400
+
+
+def test_asgi_page_rows(asgi_client, scanned_pdf):
+    pdf, calls = scanned_pdf
+    response = asgi_client.post('/extract', files={'file': ('doc.pdf', pdf)}, data={'format': 'csv', 'csv_split': 'page'})
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert [(row[2], row[6]) for row in rows[1:]] == [('1', 'text_layer'), ('2', 'ocr'), ('3', 'ocr_no_text')]
+    assert calls == [[2, 3]]
+
+
+def test_job_result_as_page_rows(client, scanned_pdf):
+    pdf, _ = scanned_pdf
+    job_id = client.post('/jobs', data=upload(pdf, 'doc.pdf')).get_json()['job_id']
+    deadline = time.time() + 5
+    while client.get(f'/jobs/{job_id}').get_json()['status'] != 'finished':
+        assert time.time() < deadline
+        time.sleep(0.01)
+    rows = read_csv(client.get(f'/jobs/{job_id}/result?format=csv&csv_split=page'))
+    assert [row[3] for row in rows[1:]] == ["First page\nsecond line", "scanned words", ""]
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+import docx_extraction
+from conftest import upload
+from docx_extraction import read_docx, read_docx_python_docx, read_docx_stream
+
+
+@pytest.fixture
+def report_docx():
+    """Two sections sharing a header, a table with horizontally and vertically merged cells"""
+    import docx
+    from docx.enum.section import WD_SECTION
+
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Contract header"
+    document.sections[0].footer.paragraphs[0].text = "Page footer"
+    document.add_paragraph("Intro")
+    document.add_paragraph("")
+    table = document.add_table(rows=3, cols=3)
+    for row, values in enumerate([("a", "b", "c"), ("d", "e", "f"), ("g", "h", "i")]):
+        for column, value in enumerate(values):
+            table.cell(row, column).text = value
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "wide"
+    table.cell(1, 2).merge(table.cell(2, 2)).text = "tall"
+    document.add_section(WD_SECTION.NEW_PAGE)
+    document.add_paragraph("Second section")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_stream_parser_matches_python_docx(report_docx):
+    streamed = read_docx_stream(io.BytesIO(report_docx))
+    reference = read_docx_python_docx(io.BytesIO(report_docx))
+    assert streamed.pop("parser") == "DOCX streaming XML"
+    reference.pop("parser")
+    assert streamed == reference
+    assert streamed["tables"][0] == [["wide", "wide", "c"], ["d", "e", "tall"], ["g", "h", "tall"]]
+    # The second section inherits the first one's header and footer
+    assert streamed["headers_footers"] == ["[HEADER] Contract header", "[FOOTER] Page footer"] * 2
+
+
+def test_unreadable_xml_falls_back_to_python_docx(report_docx, monkeypatch):
+    def broken(f):
+        raise ValueError("unexpected element")
+
+    monkeypatch.setattr(docx_extraction, 'read_docx_stream', broken)
+    doc = read_docx(io.BytesIO(report_docx))
+    assert doc["parser"] == "python-docx"
+    assert "Intro" in doc["paragraphs"]
+
+
+def test_both_endpoints_use_the_shared_extractor(client, report_docx):
+    extract = client.post('/extract', data=upload(report_docx, 'report.docx', mode='raw')).get_json()
+    assert extract['full_text'] == (
+        "=== HEADERS & FOOTERS ===\n[HEADER] Contract header\n[FOOTER] Page footer\n"
+        "[HEADER] Contract header\n[FOOTER] Page footer\n\n"
+        "=== DOCUMENT CONTENT ===\nIntro\nSecond section\n\n"
+        "=== TABLES ===\nwide | wide | c\nd | e | tall\ng | h | tall\n"
+    )
+    assert extract['extraction_method'] == "DOCX streaming XML extraction (2 paragraphs, 1 tables)"
+
+    summary = client.post('/extract/docx', data=upload(report_docx, 'report.docx')).get_json()
+    assert "=== PARAGRAPHS ===\nIntro\nSecond section" in summary['full_text']
+    assert "--- Table 1 ---" in summary['full_text']
+
+
+def test_docx_endpoint_errors(client):
+    assert client.post('/extract/docx', data=upload(b'text', 'notes.txt')).status_code == 400
+    result = client.post('/extract', data=upload(b'PK\x03\x04 broken', 'report.docx', mode='raw')).get_json()
+    assert result['status'] == 'error'
+    assert result['extraction_method'] == "python-docx error"
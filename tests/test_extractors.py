@@ -0,0 +1,88 @@
+import io
+
+import pytest
+
+from extractors import (
+    HEAVY, LIGHT, ExtractionContext, ExtractionResult, Extractor, ExtractorRegistry, ExtractorScheduler, registry
+)
+
+
+def test_registry_maps_formats_to_extractors():
+    assert registry.get('pdf').name == 'pdf'
+    assert registry.get('jpeg').name == 'image_ocr'
+    assert registry.get('md').name == 'markdown'
+    assert registry.get('nothing-like-it').name == 'generic'
+    assert registry.get_by_name('docx_summary').name == 'docx_summary'
+
+
+def test_describe_lists_cost_and_dependencies():
+    described = {extractor['name']: extractor for extractor in registry.describe()}
+    assert described['pdf']['cost'] == HEAVY and 'PyPDF2' in described['pdf']['requires']
+    assert described['text'] == {"name": "text", "extensions": ['txt'], "cost": LIGHT, "requires": []}
+
+
+class Echo(Extractor):
+    name = 'echo'
+    extensions = ('echo',)
+
+    def extract(self, ctx):
+        with ctx.open() as f:
+            return ExtractionResult(f.read().decode(), "Echo", {"echoed": True})
+
+    def render(self, result, ctx):
+        return f"[{result.content}]"
+
+
+class Broken(Extractor):
+    name = 'broken'
+    extensions = ('broken',)
+    requires = ('module_that_is_not_installed',)
+    cost = HEAVY
+    error_method = "Broken error"
+
+    def extract(self, ctx):
+        raise ValueError("cannot parse")
+
+
+@pytest.fixture
+def scheduler():
+    local = ExtractorRegistry()
+    local.register(Echo)
+    local.register(Broken)
+    return ExtractorScheduler(local, light_workers=1, heavy_workers=1)
+
+
+def context(data, filename, options=None):
+    return ExtractionContext(io.BytesIO(data), filename, options)
+
+
+def test_scheduler_renders_and_times(scheduler):
+    result, full_text = scheduler.run(context(b'hi', 'a.txt'), Echo())
+    assert full_text == "[hi]"
+    assert result.details['echoed'] is True
+    assert result.details['extractor']['name'] == 'echo'
+    assert scheduler.timings()['echo']['calls'] == 1
+
+
+def test_raw_mode_skips_rendering(scheduler):
+    result, full_text = scheduler.run(context(b'hi', 'a.txt', {'mode': 'raw'}), Echo())
+    assert full_text == "hi"
+
+
+def test_failed_extraction_becomes_an_error_result(scheduler):
+    result, full_text = scheduler.run(context(b'x', 'a.txt'), Broken())
+    assert result.method == "Broken error"
+    assert result.extras['error'] == "cannot parse" and result.degraded == "cannot parse"
+    assert full_text.startswith("Error processing file: cannot parse")
+    assert scheduler.timings()['broken'] == {**scheduler.timings()['broken'], 'cost': HEAVY, 'calls': 1, 'errors': 1}
+
+
+def test_missing_dependencies():
+    assert Broken.missing_dependencies() == ['module_that_is_not_installed']
+    assert Echo.missing_dependencies() == []
+
+
+def test_extractors_endpoint(client):
+    extractors = {extractor['name']: extractor for extractor in client.get('/extractors').get_json()['extractors']}
+    assert extractors['text']['available'] is True
+    assert set(extractors) >= {'pdf', 'docx', 'xlsx', 'pptx', 'html', 'xml', 'csv', 'json', 'rtf', 'image_ocr', 'generic'}
@@ -0,0 +1,54 @@
+import io
+
+import pytest
+
+import html_extraction
+from conftest import upload
+from html_extraction import html_to_text
+
+PAGE = (
+    b"<html><head><title>Report</title><style>p { color: red }</style>"
+    b"<script>if (a < b) { document.write('<p>no</p>') }</script></head><body>"
+    b"<h1>Heading</h1><p>Some   <b>bold</b>\n text &amp; more</p>"
+    b"<table><tr><th>Name</th><th>Age</th></tr><tr><td>Ada</td><td>36</td></tr></table>"
+    b"<pre>line one\n  indented</pre><p>caf\xc3\xa9</p></body></html>"
+)
+EXPECTED = "Report\nHeading\nSome bold text & more\nName | Age\nAda | 36\nline one\n  indented\ncafé"
+
+
+@pytest.fixture(params=['lxml', 'html.parser'])
+def tokenizer(request, monkeypatch):
+    if request.param == 'html.parser':
+        monkeypatch.setattr(html_extraction, 'etree', None)
+    elif html_extraction.etree is None:
+        pytest.skip("lxml is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64 * 1024])
+def test_text_is_the_same_whatever_the_chunking(tokenizer, chunk_size):
+    assert html_to_text(io.BytesIO(PAGE), chunk_size=chunk_size) == EXPECTED
+
+
+def test_empty_and_text_free_documents(tokenizer):
+    assert html_to_text(io.BytesIO(b'')) == ''
+    assert html_to_text(io.BytesIO(b'<html><script>var x = 1;</script></html>')) == ''
+
+
+def test_unclosed_markup_does_not_grow_the_buffer(monkeypatch):
+    monkeypatch.setattr(html_extraction, 'etree', None)
+    monkeypatch.setattr(html_extraction, 'MAX_PENDING_CHARS', 100)
+    document = b"<p>before</p><script>" + b"x" * 1000 + b"</script><p>after</p>"
+    assert html_to_text(io.BytesIO(document), chunk_size=50) == "before\nafter"
+
+    tokenizer = html_extraction._StdlibTokenizer(html_extraction.HTMLTextBuilder())
+    tokenizer.feed("<p>text</p><!-- never closed ")
+    for _ in range(20):
+        tokenizer.feed("y" * 50)
+        assert len(tokenizer.rawdata) <= 100
+
+
+def test_extract_html(client):
+    result = client.post('/extract', data=upload(PAGE, 'page.html', mode='raw')).get_json()
+    assert result['full_text'] == EXPECTED
+    assert result['extraction_method'] == "HTML text extraction"
@@ -0,0 +1,72 @@
+import time
+
+from conftest import upload
+from jobs import JobManager
+
+
+def wait_for(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in ('finished', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_reports_progress_and_result():
+    manager = JobManager(workers=1)
+    done = []
+
+    def work(value, progress):
+        progress(1, 2)
+        return {"value": value}
+
+    job_id = manager.submit(work, 42, on_done=lambda: done.append(True))
+    job = wait_for(manager, job_id)
+    assert job['result'] == {"value": 42}
+    assert job['progress'] == {"done": 2, "total": 2}
+    assert job['expires_at'] == job['finished_at'] + manager.retention_seconds
+    assert done == [True]
+
+
+def test_failed_job_keeps_the_error():
+    manager = JobManager(workers=1)
+
+    def work(progress):
+        raise ValueError("unreadable")
+
+    job = wait_for(manager, manager.submit(work))
+    assert job['status'] == 'failed' and job['error'] == "unreadable"
+
+
+def test_finished_jobs_expire():
+    manager = JobManager(workers=1, retention_seconds=0)
+    job_id = manager.submit(lambda progress: None)
+    while manager.stats().get('finished') is None:
+        time.sleep(0.01)
+    time.sleep(0.01)
+    assert manager.get(job_id) is None
+
+
+def test_job_api(client):
+    response = client.post('/jobs', data=upload(b'queued text', 'notes.txt'))
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    deadline = time.time() + 5
+    while client.get(f'/jobs/{job_id}').get_json()['status'] != 'finished':
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+    result = client.get(f'/jobs/{job_id}/result').get_json()
+    assert result['full_text'] == "queued text"
+    csv_text = client.get(f'/jobs/{job_id}/result?format=csv').get_data(as_text=True)
+    assert csv_text.splitlines()[1].startswith('notes.txt,txt,queued text,2,11,')
+
+
+def test_job_api_errors(client):
+    assert client.post('/jobs', data={}).status_code == 400
+    assert client.post('/jobs', data=upload(b'x', 'program.exe')).status_code == 400
+    assert client.get('/jobs/unknown').status_code == 404
+    assert client.get('/jobs/unknown/result').status_code == 404
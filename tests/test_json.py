@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+import json_extraction
+from conftest import upload
+from json_extraction import iter_json_strings, json_path
+
+DOCUMENT = b'{"title": "Report", "count": 3, "items": [{"name": "a"}, {"name": " "}, "b"], "odd key": ["c"], "ok": true}'
+
+
+@pytest.fixture(params=['ijson', 'json'])
+def parser(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(json_extraction, 'ijson', None)
+    elif json_extraction.ijson is None:
+        pytest.skip("ijson is not installed")
+    return request.param
+
+
+def test_json_path():
+    assert json_path(['items', 2, 'name']) == '$.items[2].name'
+    assert json_path(['odd key', 0]) == '$["odd key"][0]'
+
+
+def test_only_non_blank_strings_with_their_paths(parser):
+    assert list(iter_json_strings(io.BytesIO(DOCUMENT), with_paths=True)) == [
+        ('$.title', "Report"), ('$.items[0].name', "a"), ('$.items[2]', "b"), ('$["odd key"][0]', "c"),
+    ]
+    assert [value for _, value in iter_json_strings(io.BytesIO(DOCUMENT))] == ["Report", "a", "b", "c"]
+
+
+def test_invalid_json_raises_value_error(parser):
+    with pytest.raises(ValueError):
+        list(iter_json_strings(io.BytesIO(b'{"a": "b", oops}')))
+
+
+def test_json_lines_are_read_one_value_after_another():
+    if json_extraction.ijson is None:
+        pytest.skip("ijson is not installed")
+    assert [value for _, value in iter_json_strings(io.BytesIO(b'{"a": "x"}\n{"a": "y"}\n'))] == ["x", "y"]
+
+
+def test_extract_json(client):
+    result = client.post('/extract', data=upload(DOCUMENT, 'data.json', mode='raw', json_paths='1')).get_json()
+    assert result['full_text'] == '$.title: Report\n$.items[0].name: a\n$.items[2]: b\n$["odd key"][0]: c'
+    assert result['json_stats'] == {"strings": 4, "truncated": False, "max_chars": 10000000}
+
+
+def test_max_chars_truncates_at_a_whole_string(client):
+    result = client.post('/extract', data=upload(DOCUMENT, 'data.json', mode='raw', max_chars='9')).get_json()
+    assert result['full_text'] == "Report\na\n[... truncated after 2 strings, 9 characters]"
+    assert result['json_stats']['truncated'] is True
+
+
+def test_max_chars_is_capped_by_the_config(client):
+    from app import app
+
+    limit = app.config['JSON_CHAR_LIMIT']
+    result = client.post('/extract', data=upload(DOCUMENT, 'data.json', mode='raw', max_chars=str(limit + 1))).get_json()
+    assert result['json_stats']['max_chars'] == limit
+
+
+def test_invalid_json_falls_back_to_raw_text(client):
+    result = client.post('/extract', data=upload(b'{"a": "b", oops}', 'data.json', mode='raw', max_chars='8')).get_json()
+    assert result['status'] == 'success'
+    assert result['extraction_method'] == "JSON text extraction (invalid JSON, raw text)"
+    assert result['full_text'] == '{"a": "b'
+    assert result['json_stats'] == {"strings": 0, "truncated": True, "max_chars": 8}
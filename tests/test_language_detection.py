@@ -0,0 +1,113 @@
+import io
+
+import pytest
+import pytesseract
+
+import ocr
+from extractors import ExtractionContext, ImageOCRExtractor
+
+
+def test_parse_languages():
+    assert ocr.parse_languages('eng+deu') == ['eng', 'deu']
+    assert ocr.parse_languages('eng, fra') == ['eng', 'fra']
+    assert ocr.parse_languages('') == []
+
+
+def test_script_histogram():
+    assert ocr.script_histogram("Hello Привет 1!") == {'Latin': 5, 'Cyrillic': 6}
+
+
+def test_osd_script_picks_installed_languages(no_pool, monkeypatch):
+    monkeypatch.setattr(no_pool, 'image_to_osd', lambda image: {'script': 'Cyrillic', 'script_conf': 12.5})
+    languages, source = ocr.detect_languages(no_pool, object(), ['eng', 'rus', 'ukr'])
+    assert languages == ['rus', 'ukr', 'eng']
+    assert source.startswith('osd (Cyrillic')
+
+
+def test_quick_pass_histogram_when_osd_fails(no_pool, monkeypatch):
+    def no_osd(image):
+        raise RuntimeError("no osd model")
+
+    monkeypatch.setattr(no_pool, 'image_to_osd', no_osd)
+    monkeypatch.setattr(no_pool, 'image_to_data', lambda image, config: {
+        'text': ['Ελληνικά', 'κείμενο', 'ok'], 'conf': [90, 90, 90]
+    })
+    languages, source = ocr.detect_languages(no_pool, object(), ['eng', 'ell'])
+    assert languages == ['ell', 'eng']
+    assert source == "script histogram (Greek, Latin)"
+
+
+@pytest.fixture
+def recorded_passes(monkeypatch):
+    """Configs of the OCR passes an image extraction runs, each answered with a little text"""
+    configs = []
+
+    def image_to_data(image, config):
+        configs.append(config)
+        return {'text': ['Hallo', 'Welt'], 'conf': [70, 70]}
+
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_data', image_to_data)
+    monkeypatch.setattr(pytesseract, 'get_languages', lambda config='': ['eng', 'deu', 'fra', 'osd'])
+    return configs
+
+
+def image_context(png_bytes, options, pool, config):
+    return ExtractionContext(io.BytesIO(png_bytes), 'scan.png', options, ocr_pool=pool, config=config)
+
+
+def test_requested_languages_drive_every_pass(recorded_passes, png_bytes, no_pool, config):
+    config['OCR_EARLY_EXIT_CONFIDENCE'] = 101
+    result = ImageOCRExtractor().extract(image_context(png_bytes, {'languages': 'deu'}, no_pool, config))
+
+    assert result.details['ocr_languages'] == {'languages': ['deu'], 'source': 'request'}
+    assert recorded_passes and all(pass_config.endswith('-l deu') for pass_config in recorded_passes)
+    assert result.content == "Hallo Welt"
+
+
+def test_detected_languages_drive_every_pass(recorded_passes, png_bytes, no_pool, config, monkeypatch):
+    config['OCR_EARLY_EXIT_CONFIDENCE'] = 101
+    monkeypatch.setattr(no_pool, 'image_to_osd', lambda image: {'script': 'Latin', 'script_conf': 9.0})
+    monkeypatch.setitem(ocr.SCRIPT_LANGUAGES, 'Latin', ['fra', 'deu'])
+    result = ImageOCRExtractor().extract(image_context(png_bytes, {}, no_pool, config))
+
+    languages = {pass_config.split(' -l ')[1] for pass_config in recorded_passes}
+    assert languages == {'fra+deu', 'fra'}
+    assert [attempt['method'] for attempt in result.details['ocr_passes']].count('Primary Language') == 1
+
+
+@pytest.mark.parametrize('installed, english_pass', [(['afr', 'deu', 'eng', 'osd'], True), (['afr', 'deu'], False)])
+def test_failed_detection_keeps_an_english_pass(recorded_passes, png_bytes, no_pool, config, monkeypatch,
+                                                installed, english_pass):
+    import extractors
+
+    config['OCR_EARLY_EXIT_CONFIDENCE'] = 101
+    monkeypatch.setattr(pytesseract, 'get_languages', lambda config='': installed)
+    monkeypatch.setattr(extractors, 'detect_languages', lambda pool, image, available: ([], None))
+    result = ImageOCRExtractor().extract(image_context(png_bytes, {}, no_pool, config))
+
+    fallback = '+'.join(lang for lang in installed if lang != 'osd')
+    assert result.details['ocr_languages'] == {'languages': fallback.split('+'), 'source': 'all installed languages'}
+    languages = [pass_config.split(' -l ')[1] for pass_config in recorded_passes]
+    # Never the alphabetically first pack alone
+    assert 'afr' not in languages and not any('osd' in langs for langs in languages)
+    assert ('eng' in languages) is english_pass
+    methods = [attempt['method'] for attempt in result.details['ocr_passes']]
+    assert 'Primary Language' not in methods and ('English Focus' in methods) is english_pass
+
+
+def test_ocr_outage_is_reported_and_not_cached(client, png_bytes, monkeypatch):
+    from conftest import upload
+
+    def broken(image, config):
+        raise RuntimeError("tesseract is not installed")
+
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_data', broken)
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_osd', broken)
+    monkeypatch.setattr(pytesseract, 'get_languages', lambda config='': ['eng'])
+    monkeypatch.setattr('app.ocr_pool', ocr.OCRPool(size=0))
+
+    for _ in range(2):
+        result = client.post('/extract', data=upload(png_bytes, 'scan.png', mode='raw')).get_json()
+        assert result['status'] == 'error' and result['cache_hit'] is False
+        assert "OCR passes failed" in result['error']
+        assert result['degraded'] == result['error']
@@ -0,0 +1,176 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import tesserocr
+
+import ocr
+
+
+class FakeAPI:
+    """Stands in for tesserocr.PyTessBaseAPI and records how it is driven"""
+
+    def __init__(self, path=None, lang=None, oem=None):
+        self.init_args = {'path': path, 'lang': lang, 'oem': oem}
+        self.psm = None
+
+    def SetPageSegMode(self, psm):
+        self.psm = psm
+
+    def SetImage(self, image):
+        pass
+
+    def GetUTF8Text(self):
+        return "engine text"
+
+    def Clear(self):
+        pass
+
+    def End(self):
+        pass
+
+
+@pytest.fixture
+def fake_engines(monkeypatch):
+    monkeypatch.setattr(tesserocr, 'PyTessBaseAPI', FakeAPI)
+    monkeypatch.setattr(ocr, '_engines', ocr.OrderedDict())
+    return ocr._engines
+
+
+def test_parse_config():
+    assert ocr.parse_config('--oem 1 --psm 6 -l eng+deu') == (1, 6, 'eng+deu')
+    assert ocr.parse_config('') == (3, 3, 'eng')
+
+
+def test_engine_gets_plain_int_oem(fake_engines):
+    api = ocr._get_engine('deu', 1)
+    assert api.init_args['oem'] == 1 and type(api.init_args['oem']) is int
+    assert api.init_args['lang'] == 'deu'
+    # Loaded once, then reused
+    assert ocr._get_engine('deu', 1) is api
+
+
+def test_engines_per_worker_are_bounded(fake_engines, monkeypatch):
+    monkeypatch.setattr(ocr, 'MAX_ENGINES_PER_WORKER', 2)
+    for lang in ('eng', 'deu', 'fra'):
+        ocr._get_engine(lang, 3)
+    assert list(fake_engines) == [('deu', 3), ('fra', 3)]
+
+
+def test_worker_image_to_string_sets_plain_int_psm(fake_engines):
+    assert ocr._worker_image_to_string(object(), '--oem 3 --psm 6 -l eng') == "engine text"
+    api = fake_engines[('eng', 3)]
+    assert api.psm == 6 and type(api.psm) is int
+
+
+def test_unloadable_language_is_a_worker_error(monkeypatch):
+    def refuse(**kwargs):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+    monkeypatch.setattr(tesserocr, 'PyTessBaseAPI', refuse)
+    monkeypatch.setattr(ocr, '_engines', ocr.OrderedDict())
+    with pytest.raises(ocr.OCRWorkerError):
+        ocr._get_engine('xxx', 3)
+
+
+@pytest.mark.parametrize('error', [TypeError("bad argument"), ocr.OCRWorkerError("no model"), ValueError("odd")])
+def test_run_falls_back_to_pytesseract_on_any_worker_error(thread_pool, monkeypatch, error):
+    def worker(image, config):
+        raise error
+
+    monkeypatch.setattr(ocr, '_worker_image_to_string', worker)
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_string', lambda image, config: "fallback text")
+    assert thread_pool.image_to_string(object(), '--psm 6') == "fallback text"
+    # A failed call doesn't retire the pool
+    assert thread_pool.pooled
+
+
+def test_broken_pool_is_retired(thread_pool, monkeypatch):
+    def worker(image, config):
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(ocr, '_worker_image_to_string', worker)
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_string', lambda image, config: "fallback text")
+    assert thread_pool.image_to_string(object()) == "fallback text"
+    assert not thread_pool.pooled
+    assert thread_pool.status()['backend'] == "pytesseract subprocess"
+
+
+def test_disabled_pool_uses_pytesseract(no_pool, monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_string', lambda image, config: calls.append(config) or "text")
+    assert no_pool.image_to_string(object(), '--psm 3') == "text"
+    assert calls == ['--psm 3']
+    assert not no_pool.status()['enabled']
+
+
+def test_failed_pool_pass_is_rerun_through_pytesseract(thread_pool, monkeypatch):
+    def worker(image, config):
+        raise TypeError("binding error")
+
+    monkeypatch.setattr(ocr, '_worker_image_to_data', worker)
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_data',
+                        lambda image, config: {'text': ['hello', 'world'], 'conf': [80, 70]})
+    attempts = ocr.run_ocr_passes(thread_pool, object(), [('Auto', '--psm 6'), ('Block', '--psm 4')])
+    assert [attempt['status'] for attempt in attempts] == ['ok', 'ok']
+    assert attempts[0]['text'] == "hello world"
+
+
+def fake_passes(monkeypatch, results, delays=None):
+    """pytesseract stand-in answering per config, optionally after a delay"""
+    import time
+
+    def image_to_data(image, config):
+        time.sleep((delays or {}).get(config, 0))
+        result = results[config]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_data', image_to_data)
+
+
+def test_passes_run_concurrently_and_report_progress(no_pool, monkeypatch):
+    fake_passes(monkeypatch, {
+        '--psm 6': {'text': ['good', 'text'], 'conf': [60, 60]},
+        '--psm 4': {'text': ['x'], 'conf': [10]},
+        '--psm 11': RuntimeError("tesseract crashed"),
+    })
+    progress = []
+    attempts = ocr.run_ocr_passes(no_pool, object(), [('Auto', '--psm 6'), ('Block', '--psm 4'), ('Sparse', '--psm 11')],
+                                  progress=lambda done, total: progress.append((done, total)))
+
+    by_method = {attempt['method']: attempt for attempt in attempts}
+    assert by_method['Auto']['text'] == "good text" and by_method['Auto']['word_count'] == 2
+    assert by_method['Block']['word_count'] == 0
+    assert by_method['Sparse']['status'] == 'error'
+    assert all(attempt['elapsed_ms'] is not None for attempt in attempts)
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_confident_pass_cancels_the_rest(no_pool, monkeypatch):
+    fake_passes(monkeypatch, {
+        '--psm 6': {'text': ['sure', 'thing'], 'conf': [95, 96]},
+        '--psm 4': {'text': ['late'], 'conf': [50]},
+    }, delays={'--psm 4': 0.5})
+    attempts = ocr.run_ocr_passes(no_pool, object(), [('Auto', '--psm 6'), ('Block', '--psm 4')],
+                                  early_exit_confidence=90)
+    assert [(attempt['method'], attempt['status']) for attempt in attempts] == [('Auto', 'ok'), ('Block', 'cancelled')]
+    assert attempts[1]['elapsed_ms'] is None
+
+
+def test_summarize_ocr_data_drops_low_confidence_and_single_characters():
+    data = {'text': ['Hello', 'x', 'noise', 'world'], 'conf': ['91', '99', '5', 80.5]}
+    assert ocr.summarize_ocr_data(data) == ("Hello world", 85.5, 2)
+    assert ocr.summarize_ocr_data({'text': [], 'conf': []}) == ("", 0, 0)
+
+
+def test_all_passes_failing_is_an_error_not_an_empty_result(no_pool, monkeypatch):
+    fake_passes(monkeypatch, {'--psm 6': RuntimeError("tesseract not found"), '--psm 4': RuntimeError("tesseract not found")})
+    with pytest.raises(ocr.OCRFailedError, match="All 2 OCR passes failed"):
+        ocr.run_ocr_passes(no_pool, object(), [('Auto', '--psm 6'), ('Block', '--psm 4')])
+
+
+def test_passes_finding_no_text_are_not_an_error(no_pool, monkeypatch):
+    fake_passes(monkeypatch, {'--psm 6': {'text': [], 'conf': []}})
+    attempts = ocr.run_ocr_passes(no_pool, object(), [('Auto', '--psm 6')])
+    assert attempts[0]['status'] == 'ok' and attempts[0]['text'] == ""
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+import pdf_backends
+from conftest import upload
+from extractors import resolve_pdf_backend
+
+
+@pytest.mark.parametrize('name', sorted(pdf_backends.PDF_BACKENDS))
+def test_backends_read_every_page(name, make_pdf):
+    backend = pdf_backends.get_pdf_backend(name)
+    with backend.open(io.BytesIO(make_pdf(["First page", "", "Third page"]))) as document:
+        assert document.page_count == 3
+        texts = [text.strip() for text in document.iter_page_texts()]
+    assert texts == ["First page", "", "Third page"]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown PDF backend 'nope'"):
+        pdf_backends.get_pdf_backend('nope')
+
+
+def test_missing_library_falls_back_to_pypdf2(monkeypatch):
+    class Uninstalled:
+        def __init__(self):
+            raise ImportError("No module named 'pypdfium2'")
+
+    monkeypatch.setitem(pdf_backends.PDF_BACKENDS, 'pdfium', Uninstalled)
+    backend, note = resolve_pdf_backend({'pdf_backend': 'pdfium'}, {})
+    assert backend.name == 'pypdf2' and "not installed" in note
+
+
+def test_request_option_overrides_config():
+    assert resolve_pdf_backend({}, {'PDF_BACKEND': 'pdfminer'})[0].name == 'pdfminer'
+    assert resolve_pdf_backend({'pdf_backend': 'PDFium'}, {'PDF_BACKEND': 'pdfminer'})[0].name == 'pdfium'
+
+
+@pytest.mark.parametrize('path, form', [
+    ('/extract', {}),
+    ('/extract', {'stream': 'ndjson'}),
+    ('/extract', {'format': 'csv'}),
+    ('/jobs', {}),
+])
+def test_unknown_backend_is_a_bad_request_on_every_path(client, make_pdf, path, form):
+    response = client.post(path, data=upload(make_pdf(["Text"]), 'doc.pdf', pdf_backend='nope', **form))
+    assert response.status_code == 400
+    assert "Unknown PDF backend" in response.get_json()['error']
+
+
+def test_unknown_backend_rejects_a_batch(client, make_pdf):
+    response = client.post('/extract/batch', data={'files': [(io.BytesIO(make_pdf(["Text"])), 'doc.pdf')], 'pdf_backend': 'nope'})
+    assert response.status_code == 400
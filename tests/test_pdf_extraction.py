@@ -0,0 +1,116 @@
+import io
+
+import pytest
+
+import extractors
+from extractors import ExtractionContext, PdfExtractor
+
+
+def pdf_context(pdf, config, options=None, progress=None, pool=None):
+    return ExtractionContext(io.BytesIO(pdf), 'doc.pdf', options, progress, ocr_pool=pool, config=config)
+
+
+@pytest.mark.parametrize('ocr', ['ok', 'unavailable'])
+def test_progress_counts_every_page(make_pdf, config, monkeypatch, ocr):
+    def ocr_pdf_pages(pool, source, page_numbers, dpi, progress):
+        if ocr == 'unavailable':
+            raise RuntimeError("pdftoppm not found")
+        for done, page_number in enumerate(page_numbers, 1):
+            progress(done, len(page_numbers))
+        return {page_number: "scanned text" for page_number in page_numbers}, {}
+
+    monkeypatch.setattr(extractors, 'ocr_pdf_pages', ocr_pdf_pages)
+    config['PDF_OCR_MAX_PAGES'] = 2
+    progress = []
+    PdfExtractor().extract(pdf_context(make_pdf(["Page one text", "", "", ""]), config,
+                                       progress=lambda done, total: progress.append((done, total))))
+
+    # Text page read, then the scanned page past the budget (4), then the two OCR'd pages
+    assert progress[:4] == [(1, 4), (1, 4), (1, 4), (2, 4)]
+    assert progress[-1] == (4, 4)
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+
+
+def test_page_ocr_reports_every_page(no_pool, monkeypatch, tmp_path):
+    import ocr
+    import pdf_extraction
+
+    def render(filepath, page_number, dpi):
+        if page_number == 2:
+            raise RuntimeError("bad page")
+        return None if page_number == 3 else object()
+
+    monkeypatch.setattr(pdf_extraction, 'render_pdf_page', render)
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_string', lambda image, config: "page text")
+    progress = []
+    texts, errors = pdf_extraction._ocr_pdf_file(no_pool, str(tmp_path / 'doc.pdf'), [1, 2, 3, 4], 200, '',
+                                                 lambda done, total: progress.append((done, total)))
+    assert texts == {1: "page text", 4: "page text"}
+    assert errors == {2: "Rendering failed: bad page"}
+    assert progress[-1] == (4, 4)
+
+
+def test_only_requested_pages_are_rendered(no_pool, monkeypatch, make_pdf):
+    import ocr
+    import pdf2image
+    import pdf_extraction
+
+    rendered = []
+    done = [0]
+    waiting = []
+
+    def convert_from_path(filepath, dpi, first_page, last_page):
+        assert open(filepath, 'rb').read(5) == b'%PDF-'
+        rendered.append((first_page, last_page, dpi))
+        # Rendered pages whose OCR result hasn't been collected yet
+        waiting.append(len(rendered) - done[0])
+        return [f"image {first_page}"]
+
+    monkeypatch.setattr(pdf2image, 'convert_from_path', convert_from_path)
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_string', lambda image, config: f"text of {image}")
+    monkeypatch.setattr(ocr.OCRPool, 'parallelism', property(lambda self: 1))
+    # An in-memory upload is written out once for pdftoppm
+    texts, errors = pdf_extraction.ocr_pdf_pages(no_pool, io.BytesIO(make_pdf([""] * 12)), [3, 5, 7, 8, 9, 11], dpi=150,
+                                                 progress=lambda count, total: done.__setitem__(0, count))
+
+    assert [first for first, _, _ in rendered] == [3, 5, 7, 8, 9, 11]
+    assert all(first == last and dpi == 150 for first, last, dpi in rendered)
+    assert texts[7] == "text of image 7" and len(texts) == 6 and errors == {}
+    # At most two pages per OCR worker in flight, plus the one just rendered
+    assert max(waiting) == 3
+
+
+def test_ocr_settings_are_clamped(config):
+    config.update(PDF_OCR_MAX_PAGES=3, PDF_OCR_PAGE_LIMIT=100, PDF_OCR_DPI=200)
+    assert extractors.pdf_ocr_settings({}, config) == (3, 200)
+    assert extractors.pdf_ocr_settings({'ocr_max_pages': '500', 'ocr_dpi': '5000'}, config) == (100, 600)
+    assert extractors.pdf_ocr_settings({'ocr_max_pages': 'many', 'ocr_dpi': '10'}, config) == (3, 72)
+
+
+def test_only_pages_without_text_are_ocrd(make_pdf, config, monkeypatch):
+    requested = []
+
+    def ocr_pdf_pages(pool, source, page_numbers, dpi, progress):
+        requested.extend(page_numbers)
+        return {2: "scanned words", 3: "  "}, {}
+
+    monkeypatch.setattr(extractors, 'ocr_pdf_pages', ocr_pdf_pages)
+    config['PDF_OCR_MAX_PAGES'] = 2
+    result = PdfExtractor().extract(pdf_context(make_pdf(["Text layer", "", "(cid:3)(cid:4)(cid:5)", "", ""]), config))
+
+    assert requested == [2, 3]
+    assert [page['method'] for page in result.details['pages']] == [
+        'text_layer', 'ocr', 'ocr_no_text', 'skipped_ocr_budget', 'skipped_ocr_budget'
+    ]
+    assert result.content == "--- Page 1 ---\nText layer\n--- Page 2 (OCR) ---\nscanned words"
+    assert result.method == "PDF Hybrid Extraction (1 text layer, 1 OCR pages)"
+    assert result.degraded is None
+
+
+def test_garbage_text_layers_need_ocr():
+    from pdf_extraction import page_needs_ocr
+
+    assert page_needs_ocr("")
+    assert page_needs_ocr("(cid:12)(cid:13)(cid:14) a")
+    assert page_needs_ocr("���� ok")
+    assert not page_needs_ocr("A normal sentence, with punctuation.")
@@ -0,0 +1,91 @@
+import gzip
+import json
+
+import pytest
+
+import compression
+from compression import accepted_encoding
+from conftest import upload
+
+LONG_TEXT = b"word " * 2000
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0.5, gzip;q=0.8', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('*', 'br'),
+    ('identity', None),
+    (None, None),
+    ('gzip;q=abc', None),
+])
+def test_accepted_encoding(header, expected):
+    assert accepted_encoding(header) == expected
+
+
+def test_gzip_only_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert accepted_encoding('br, gzip;q=0.1') == 'gzip'
+    assert accepted_encoding('br') is None
+
+
+def test_raw_mode_has_no_banners(client, make_pdf):
+    pdf = make_pdf(["Plain words"])
+    rendered = client.post('/extract', data=upload(pdf, 'doc.pdf')).get_json()
+    raw = client.post('/extract', data=upload(pdf, 'doc.pdf', mode='raw')).get_json()
+    assert "TEXT EXTRACTED SUCCESSFULLY" in rendered['full_text'] and 'note' in rendered
+    assert raw['full_text'] == "--- Page 1 ---\nPlain words" and 'note' not in raw
+    assert raw['status'] == 'success' and raw['total_pages'] == 1
+
+
+def test_raw_mode_reports_failures_as_errors(client):
+    rendered = client.post('/extract', data=upload(b'%PDF-1.4 truncated', 'broken.pdf')).get_json()
+    raw = client.post('/extract', data=upload(b'%PDF-1.4 truncated', 'broken.pdf', mode='raw')).get_json()
+    assert rendered['status'] == 'success' and "PDF Processing Error" in rendered['full_text']
+    assert raw['status'] == 'error' and raw['error'] and raw['full_text'] == ""
+
+
+@pytest.mark.parametrize('coding, decompress', [('gzip', gzip.decompress), ('br', None)])
+def test_flask_json_is_compressed(client, coding, decompress):
+    if coding == 'br':
+        brotli = pytest.importorskip('brotli')
+        decompress = brotli.decompress
+    response = client.post('/extract', data=upload(LONG_TEXT, 'notes.txt', mode='raw'),
+                           headers={'Accept-Encoding': coding})
+    assert response.headers['Content-Encoding'] == coding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(decompress(response.get_data()))['word_count'] == 2000
+
+
+def test_flask_small_or_unaccepted_bodies_are_sent_as_is(client):
+    small = client.post('/extract', data=upload(b'hi', 'notes.txt', mode='raw'), headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers and small.get_json()['full_text'] == "hi"
+    plain = client.post('/extract', data=upload(LONG_TEXT, 'notes.txt', mode='raw'))
+    assert 'Content-Encoding' not in plain.headers
+
+
+def test_flask_streams_are_not_compressed(client, make_pdf):
+    response = client.post('/extract', data=upload(make_pdf(["x " * 1000]), 'doc.pdf', stream='ndjson'),
+                           headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.get_data(as_text=True).splitlines()[0])['event'] == 'start'
+
+
+def test_asgi_json_is_compressed(asgi_client):
+    response = asgi_client.post('/extract', files={'file': ('notes.txt', LONG_TEXT)}, data={'mode': 'raw'},
+                                headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert int(response.headers['content-length']) < len(LONG_TEXT)
+    # The test client decodes it again
+    assert response.json()['word_count'] == 2000
+
+
+def test_asgi_small_bodies_and_streams_are_sent_as_is(asgi_client, make_pdf):
+    small = asgi_client.post('/extract', files={'file': ('notes.txt', b'hi')}, data={'mode': 'raw'},
+                             headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in small.headers
+    stream = asgi_client.post('/extract', files={'file': ('doc.pdf', make_pdf(["x " * 1000]))},
+                              data={'stream': 'ndjson'}, headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in stream.headers
+    assert json.loads(stream.text.splitlines()[-1])['event'] == 'end'
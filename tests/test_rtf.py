@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from conftest import upload
+from rtf_extraction import iter_rtf_text
+
+DOCUMENT = (
+    rb"{\rtf1\ansi\ansicpg1252\deff0{\fonttbl{\f0 Times;}}{\colortbl;\red0\green0\blue0;}"
+    rb"{\info{\title Hidden title}{\author Someone}}"
+    rb"{\*\generator Writer;}"
+    rb"\pard Caf\'e9 \b bold\b0\par" b"\r\n"
+    rb"Tab\tab sep\emdash end\par "
+    rb"{\pict\pngblip 89504e470d0a1a0a}"
+    rb"Unicode \u8364?euro and \uc2\u955 xxlambda\par "
+    rb"Binary \bin4 {}\\ after\par "
+    rb"Escapes \{ \} \\ done}"
+)
+EXPECTED = "Café bold\nTab\tsep—end\nUnicode €euro and λlambda\nBinary  after\nEscapes { } \\ done"
+
+
+def text(data, chunk_size=64 * 1024):
+    return ''.join(iter_rtf_text(io.BytesIO(data), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64 * 1024])
+def test_chunk_boundaries_do_not_change_the_text(chunk_size):
+    assert text(DOCUMENT, chunk_size) == EXPECTED
+
+
+def test_surrogate_pairs():
+    assert text(rb"{\rtf1 \u-10179?\u-8704?}") == "\U0001f600"
+    # A lone surrogate is replaced, not passed through
+    assert text(rb"{\rtf1 \u-10179?x}") == "x"
+
+
+def test_other_codepages():
+    assert text(rb"{\rtf1\ansi\ansicpg1251 \'cf\'f0\'e8}") == "При"
+    assert text(rb"{\rtf1\ansicpg99999 \'e9}") == "é"
+
+
+def test_unknown_destinations_after_star_are_skipped():
+    assert text(rb"{\rtf1 a{\*\unknowndest secret{\nested more}}b}") == "ab"
+
+
+def test_bin_data_spanning_chunks_is_skipped():
+    data = rb"{\rtf1 before\bin20 " + b"{}\\" * 6 + b"xx" + rb"after}"
+    for chunk_size in (1, 4, 16, 1024):
+        assert text(data, chunk_size) == "beforeafter"
+
+
+def test_extract_rtf(client):
+    result = client.post('/extract', data=upload(DOCUMENT, 'letter.rtf', mode='raw')).get_json()
+    assert result['full_text'] == EXPECTED
+    assert result['extraction_method'] == "RTF text extraction"
@@ -0,0 +1,142 @@
+import io
+import zipfile
+
+import pytest
+
+import ocr
+import slides
+from conftest import upload
+from extractors import ExtractionContext, registry
+
+
+def pptx_bytes(count=2, image=None):
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    deck = Presentation()
+    for number in range(1, count + 1):
+        slide = deck.slides.add_slide(deck.slide_layouts[1])
+        slide.shapes.title.text = f"Title {number}"
+        slide.placeholders[1].text = f"Body {number}"
+        slide.notes_slide.notes_text_frame.text = f"Notes {number}"
+    table = deck.slides[0].shapes.add_table(2, 2, Inches(1), Inches(4), Inches(4), Inches(1)).table
+    for row, values in enumerate([("a", "b"), ("c", "d")]):
+        for column, value in enumerate(values):
+            table.cell(row, column).text = value
+    if image is not None:
+        deck.slides[count - 1].shapes.add_picture(io.BytesIO(image), Inches(5), Inches(5))
+    buffer = io.BytesIO()
+    deck.save(buffer)
+    return buffer.getvalue()
+
+
+def odp_bytes():
+    content = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        'xmlns:draw="urn:oasis:names:tc:opendocument:xmlns:drawing:1.0" '
+        'xmlns:presentation="urn:oasis:names:tc:opendocument:xmlns:presentation:1.0" '
+        'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+        'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"><office:body><office:presentation>'
+        '<draw:page draw:name="p1">'
+        '<draw:frame presentation:class="title"><draw:text-box><text:p>Welcome</text:p></draw:text-box></draw:frame>'
+        '<draw:frame presentation:class="outline"><draw:text-box><text:p>Point one</text:p></draw:text-box></draw:frame>'
+        '<draw:frame presentation:class="page-number"><draw:text-box><text:p>1</text:p></draw:text-box></draw:frame>'
+        '<draw:frame><table:table><table:table-row><table:table-cell><text:p>x</text:p></table:table-cell>'
+        '<table:table-cell><text:p>y</text:p></table:table-cell></table:table-row></table:table></draw:frame>'
+        '<presentation:notes><draw:frame><draw:text-box><text:p>Speaker notes</text:p></draw:text-box></draw:frame>'
+        '</presentation:notes></draw:page>'
+        '<draw:page draw:name="p2"><draw:custom-shape><text:p>Loose text</text:p></draw:custom-shape></draw:page>'
+        '</office:presentation></office:body></office:document-content>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('mimetype', 'application/vnd.oasis.opendocument.presentation')
+        archive.writestr('content.xml', content)
+    return buffer.getvalue()
+
+
+def test_pptx_slides_have_titles_text_tables_and_notes():
+    with zipfile.ZipFile(io.BytesIO(pptx_bytes())) as archive:
+        deck = slides.read_pptx(archive)
+    assert [slide["title"] for slide in deck] == ["Title 1", "Title 2"]
+    assert deck[0]["text"] == ["Body 1"]
+    assert deck[0]["tables"] == [[["a", "b"], ["c", "d"]]]
+    assert [slide["notes"] for slide in deck] == ["Notes 1", "Notes 2"]
+
+
+def test_odp_pages_skip_page_numbers_and_keep_loose_shapes():
+    with zipfile.ZipFile(io.BytesIO(odp_bytes())) as archive:
+        deck = slides.read_odp(archive)
+    assert deck[0] == {"slide": 1, "title": "Welcome", "text": ["Point one"], "tables": [[["x", "y"]]],
+                       "notes": "Speaker notes", "images": []}
+    assert deck[1]["text"] == ["Loose text"]
+
+
+def test_large_decks_are_parsed_in_order_by_the_worker_pool(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(slides, '_executor', executor)
+    calls = []
+    monkeypatch.setattr(executor, 'map', lambda function, jobs, chunksize: calls.append(chunksize) or
+                        ThreadPoolExecutor.map(executor, function, jobs))
+    try:
+        with zipfile.ZipFile(io.BytesIO(pptx_bytes(slides.PARALLEL_MIN_SLIDES))) as archive:
+            deck = slides.read_pptx(archive, workers=2)
+    finally:
+        executor.shutdown()
+    assert calls, "the deck was not handed to the worker pool"
+    assert [slide["slide"] for slide in deck] == list(range(1, slides.PARALLEL_MIN_SLIDES + 1))
+    assert deck[-1]["title"] == f"Title {slides.PARALLEL_MIN_SLIDES}"
+
+
+def test_small_decks_stay_in_the_request_thread(monkeypatch):
+    monkeypatch.setattr(slides, '_slide_executor', lambda workers: pytest.fail("pool started for a small deck"))
+    assert slides.slide_map(str, [1, 2], workers=4) == ['1', '2']
+
+
+@pytest.mark.parametrize('data, filename', [(pptx_bytes(), 'deck.pptx'), (odp_bytes(), 'deck.odp')])
+def test_extract_returns_slides(client, data, filename):
+    result = client.post('/extract', data=upload(data, filename, mode='raw')).get_json()
+    assert result['status'] == 'success'
+    assert result['total_pages'] == 2
+    assert result['full_text'].startswith("=== SLIDE 1: ")
+    assert result['presentation_stats']['slides_with_notes'] == 1 + (filename == 'deck.pptx')
+
+
+@pytest.fixture
+def picture():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (80, 60), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('fails', [False, True])
+def test_slide_images_go_to_ocr(config, no_pool, picture, monkeypatch, fails):
+    def image_to_string(image, config):
+        if fails:
+            raise RuntimeError("tesseract not installed")
+        return "picture text\n"
+
+    monkeypatch.setattr(ocr, '_pytesseract_image_to_string', image_to_string)
+    ctx = ExtractionContext(io.BytesIO(pptx_bytes(image=picture)), 'deck.pptx', {'ocr_images': '1'},
+                            ocr_pool=no_pool, config=config)
+    result = registry.get('pptx').extract(ctx)
+
+    assert result.details['presentation_stats']['images_ocr'] == 1
+    if fails:
+        assert result.degraded == "OCR failed on 1 slide image(s)"
+        assert "[IMAGE TEXT]" not in result.content
+    else:
+        assert result.degraded is None
+        assert result.details['slides'][1]['image_text'] == ["picture text"]
+        assert "[IMAGE TEXT] picture text" in result.content
+
+
+def test_corrupted_presentation_is_an_error(client):
+    result = client.post('/extract', data=upload(b'PK\x03\x04 broken', 'deck.pptx', mode='raw')).get_json()
+    assert result['status'] == 'error'
+    assert result['extraction_method'] == "PPTX error"
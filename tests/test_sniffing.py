@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+import sniffing
+from sniffing import detect_format, sniff_source
+
+
+@pytest.fixture(params=['magic', 'signature'])
+def detector(request, monkeypatch):
+    """Run each test with libmagic and with the built-in signatures"""
+    if request.param == 'signature':
+        monkeypatch.setattr(sniffing, 'magic', None)
+    elif sniffing.magic is None:
+        pytest.skip("python-magic is not installed")
+    return request.param
+
+
+def test_content_beats_a_wrong_extension(detector, make_pdf, png_bytes):
+    assert detect_format(make_pdf(["x"]), 'txt')[::2] == ('pdf', detector)
+    assert detect_format(png_bytes, 'pdf')[0] == 'png'
+
+
+def test_zip_containers_use_the_extension_or_their_parts(detector, docx_bytes):
+    assert detect_format(docx_bytes, 'docx')[0] == 'docx'
+    # Renamed: the OOXML parts (or libmagic) still say it is a Word document
+    assert detect_format(docx_bytes, 'zip')[0] in ('docx', 'zip')
+
+
+def test_text_formats_trust_the_extension(detector):
+    assert detect_format(b'a,b\n1,2\n', 'csv')[0] == 'csv'
+    assert detect_format(b'{"a": 1}', 'json')[0] == 'json'
+    assert detect_format(b'# Title\n', 'markdown')[0] == 'md'
+
+
+def test_signatures_for_unlabelled_text(monkeypatch):
+    monkeypatch.setattr(sniffing, 'magic', None)
+    assert detect_format(b'<?xml version="1.0"?><a/>', 'bin')[0] == 'xml'
+    assert detect_format(b'<!DOCTYPE html><html></html>', 'bin')[0] == 'html'
+    assert detect_format(b'{\\rtf1 hi}', 'bin')[0] == 'rtf'
+    # Text that looks like another text format keeps its extension
+    assert detect_format(b'{\\rtf1 hi}', 'txt')[0] == 'txt'
+    assert detect_format(b'\x00\x01\x02binary', 'dat') == ('dat', None, 'extension')
+
+
+def test_sniff_source_reads_only_the_head(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'plain text ' * 10000)
+    assert sniff_source(str(path), 'txt')[0] == 'txt'
+    assert sniff_source(io.BytesIO(b'plain'), 'txt')[0] == 'txt'
+
+
+def test_renamed_upload_is_extracted_by_its_content(client, make_pdf):
+    from conftest import upload
+
+    result = client.post('/extract', data=upload(make_pdf(["Real PDF"]), 'misnamed.txt', mode='raw')).get_json()
+    assert result['full_text'] == "--- Page 1 ---\nReal PDF"
+    assert result['content_type']['format'] == 'pdf' and result['content_type']['matches_extension'] is False
@@ -0,0 +1,118 @@
+import io
+import zipfile
+
+import pytest
+
+from conftest import upload
+from spreadsheets import cell_text, iter_ods_sheets, iter_xlsx_sheets, read_sheets
+
+
+def xlsx_bytes(sheets):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def ods_bytes(sheets):
+    def cell(value):
+        # ODS keeps the displayed text, so numbers are written the way LibreOffice shows them
+        if value is None:
+            return '<table:table-cell/>'
+        return f'<table:table-cell><text:p>{cell_text(value)}</text:p></table:table-cell>'
+
+    tables = ''.join(
+        f'<table:table table:name="{name}">'
+        + ''.join(f'<table:table-row>{"".join(cell(value) for value in row)}</table:table-row>' for row in rows)
+        + '</table:table>'
+        for name, rows in sheets.items()
+    )
+    content = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+        'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">'
+        f'<office:body><office:spreadsheet>{tables}</office:spreadsheet></office:body></office:document-content>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('mimetype', 'application/vnd.oasis.opendocument.spreadsheet')
+        archive.writestr('content.xml', content)
+    return buffer.getvalue()
+
+
+SHEETS = {"People": [["name", "age"], ["Ada", 36], [None, None], ["Alan", 41.0]], "Empty": []}
+
+
+@pytest.mark.parametrize('build, iter_sheets', [(xlsx_bytes, iter_xlsx_sheets), (ods_bytes, iter_ods_sheets)])
+def test_sheets_are_read_as_rows_of_text(build, iter_sheets):
+    sheets = read_sheets(iter_sheets(io.BytesIO(build(SHEETS))), max_rows=100, max_cells=100)
+    assert sheets == [
+        {"name": "People", "rows": [["name", "age"], ["Ada", "36"], ["Alan", "41"]], "truncated": False},
+        {"name": "Empty", "rows": [], "truncated": False},
+    ]
+
+
+def test_repeated_ods_columns_are_not_expanded_past_the_sheet_width():
+    content = ods_bytes({"Wide": [["a"]]})
+    # A trailing run of a million empty cells, as LibreOffice writes for formatted columns
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(content)) as source, zipfile.ZipFile(buffer, 'w') as target:
+        xml = source.read('content.xml').replace(
+            b'</table:table-row>', b'<table:table-cell table:number-columns-repeated="1000000"/></table:table-row>')
+        target.writestr('content.xml', xml)
+    sheets = read_sheets(iter_ods_sheets(io.BytesIO(buffer.getvalue())), max_rows=10, max_cells=10)
+    assert sheets[0]["rows"] == [["a"]]
+
+
+def test_row_and_cell_limits_truncate():
+    rows = [[f"r{i}", i] for i in range(50)]
+    data = xlsx_bytes({"A": rows, "B": rows})
+
+    by_rows = read_sheets(iter_xlsx_sheets(io.BytesIO(data)), max_rows=10, max_cells=1000)
+    assert [len(sheet["rows"]) for sheet in by_rows] == [10, 10]
+    assert all(sheet["truncated"] for sheet in by_rows)
+
+    # The cell limit is for the whole workbook: sheet B is never reached
+    by_cells = read_sheets(iter_xlsx_sheets(io.BytesIO(data)), max_rows=1000, max_cells=15)
+    assert [sheet["name"] for sheet in by_cells] == ["A"]
+    assert sum(len(row) for row in by_cells[0]["rows"]) == 15 and by_cells[0]["truncated"]
+
+
+@pytest.mark.parametrize('build, filename', [(xlsx_bytes, 'book.xlsx'), (ods_bytes, 'book.ods')])
+def test_extract_returns_structured_sheets(client, build, filename):
+    result = client.post('/extract', data=upload(build(SHEETS), filename, mode='raw')).get_json()
+    assert result['status'] == 'success'
+    assert result['full_text'] == "=== SHEET: People ===\nname | age\nAda | 36\nAlan | 41\n\n=== SHEET: Empty ==="
+    assert result['sheets'][0]['rows'][1] == ["Ada", "36"]
+    assert result['spreadsheet_stats']['truncated'] is False
+
+
+def test_request_limits_are_capped_by_the_config(client):
+    from app import app
+
+    data = xlsx_bytes({"A": [[i] for i in range(1, 30)]})
+    result = client.post('/extract', data=upload(data, 'book.xlsx', mode='raw', max_rows='5')).get_json()
+    assert len(result['sheets'][0]['rows']) == 5 and result['spreadsheet_stats']['truncated']
+
+    limit = app.config['SPREADSHEET_ROW_LIMIT']
+    result = client.post('/extract', data=upload(data, 'book.xlsx', mode='raw',
+                                                 max_rows=str(limit * 10))).get_json()
+    assert result['spreadsheet_stats']['max_rows'] == limit
+
+    # Not a number: the configured default
+    result = client.post('/extract', data=upload(data, 'book.xlsx', mode='raw', max_rows='lots')).get_json()
+    assert result['spreadsheet_stats']['max_rows'] == app.config['SPREADSHEET_MAX_ROWS']
+
+
+def test_corrupted_spreadsheet_is_an_error(client):
+    result = client.post('/extract', data=upload(b'PK\x03\x04 not really a zip', 'book.xlsx', mode='raw')).get_json()
+    assert result['status'] == 'error'
+    assert result['extraction_method'] == "openpyxl error"
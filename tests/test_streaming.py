@@ -0,0 +1,48 @@
+import io
+import json
+
+from conftest import upload
+from pdf_extraction import iter_pdf_pages
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_pdf_pages_are_events(make_pdf):
+    events = list(iter_pdf_pages(io.BytesIO(make_pdf(["First page", ""])), 'doc.pdf'))
+    assert [event['event'] for event in events] == ['start', 'page', 'page', 'end']
+    assert events[0]['total_pages'] == 2
+    assert events[1]['text'] == "First page" and not events[1]['needs_ocr']
+    assert events[2]['needs_ocr']
+    assert events[3]['pages_with_text'] == 1 and events[3]['word_count'] == 2
+
+
+def test_unreadable_pdf_is_an_error_event():
+    events = list(iter_pdf_pages(io.BytesIO(b'%PDF-1.4 truncated'), 'doc.pdf'))
+    assert [event['event'] for event in events] == ['error']
+
+
+def test_stream_ndjson(client, make_pdf):
+    response = client.post('/extract', data=upload(make_pdf(["One", "Two"]), 'doc.pdf', stream='ndjson'))
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    events = ndjson(response)
+    assert [event.get('text') for event in events if event['event'] == 'page'] == ["One", "Two"]
+
+
+def test_stream_sse(client, make_pdf):
+    response = client.post('/extract', data=upload(make_pdf(["One"]), 'doc.pdf', stream='sse'))
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.startswith("event: start\ndata: {")
+    assert "event: page\n" in body and body.endswith("\n\n")
+
+
+def test_other_formats_stream_one_result(client):
+    events = ndjson(client.post('/extract', data=upload(b'plain words', 'notes.txt', stream='ndjson')))
+    assert len(events) == 1 and events[0]['event'] == 'result' and events[0]['full_text'] == "plain words"
+
+
+def test_unknown_stream_format(client, make_pdf):
+    assert client.post('/extract', data=upload(make_pdf(["One"]), 'doc.pdf', stream='xml')).status_code == 400
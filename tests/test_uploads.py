@@ -0,0 +1,109 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+from conftest import upload
+from uploads import HashingBuffer, open_source, source_path, source_size, spool_file
+
+
+def test_spool_files_are_unique_and_removed_on_close(tmp_path):
+    first = spool_file(str(tmp_path), 'report.pdf')
+    second = spool_file(str(tmp_path), 'report.pdf')
+    assert first.name != second.name and first.name.endswith('_report.pdf')
+    first.write(b'data')
+    first.close()
+    second.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_open_source_reads_paths_and_buffers(tmp_path):
+    path = tmp_path / 'a.bin'
+    path.write_bytes(b'0123456789')
+    with open_source(str(path)) as f:
+        f.seek(4)
+        assert f.read(3) == b'456'
+    buffer = io.BytesIO(b'abc')
+    buffer.read()
+    with open_source(buffer) as f:
+        assert f.read() == b'abc'
+    # Buffers belong to the caller and stay open
+    assert not buffer.closed
+    assert source_size(str(path)) == 10 and source_size(buffer) == 3
+
+
+def test_empty_files_can_be_opened(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    with open_source(str(path)) as f:
+        assert f.read() == b''
+
+
+def test_source_path_writes_buffers_out_once(tmp_path):
+    with source_path(io.BytesIO(b'pdf bytes'), str(tmp_path)) as path:
+        assert open(path, 'rb').read() == b'pdf bytes'
+    assert os.listdir(tmp_path) == []
+    with source_path('/already/a/path') as path:
+        assert path == '/already/a/path'
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    from app import app
+    monkeypatch.setitem(app.config, 'UPLOAD_SPOOL_DIR', str(tmp_path))
+    monkeypatch.setitem(app.config, 'UPLOAD_MEMORY_LIMIT', 64)
+    return tmp_path
+
+
+def test_small_uploads_stay_in_memory(client, spool_dir):
+    result = client.post('/extract', data=upload(b'tiny', 'a.txt')).get_json()
+    assert result['full_text'] == "tiny"
+    assert os.listdir(spool_dir) == []
+
+
+def test_large_uploads_are_spooled_and_removed(client, spool_dir, monkeypatch):
+    import app as app_module
+
+    seen = []
+    extract = app_module.extract_cached
+    monkeypatch.setattr(app_module, 'extract_cached', lambda ctx, *args, **kwargs: seen.append(ctx.source) or extract(ctx, *args, **kwargs))
+    result = client.post('/extract', data=upload(b'word ' * 100, 'big.txt')).get_json()
+
+    assert result['word_count'] == 100
+    assert isinstance(seen[0], str) and os.path.dirname(seen[0]) == str(spool_dir)
+    assert os.listdir(spool_dir) == []
+
+
+def test_hash_is_computed_while_writing(tmp_path):
+    buffer = HashingBuffer()
+    spooled = spool_file(str(tmp_path))
+    for chunk in (b'first ', b'second'):
+        buffer.write(chunk)
+        spooled.write(chunk)
+    assert buffer.sha256 == spooled.sha256 == hashlib.sha256(b'first second').hexdigest()
+    spooled.close()
+
+
+@pytest.mark.parametrize('size', [10, 200])
+def test_upload_hash_is_the_cache_key(client, spool_dir, monkeypatch, size):
+    import app as app_module
+
+    hashes = []
+    extract = app_module.extract_upload
+    monkeypatch.setattr(app_module, 'extract_upload',
+                        lambda *args, content_hash=None, **kwargs: hashes.append(content_hash) or extract(*args, content_hash=content_hash, **kwargs))
+    data = b'x' * size
+    client.post('/extract', data=upload(data, 'a.txt'))
+    assert hashes == [hashlib.sha256(data).hexdigest()]
+
+
+def test_per_endpoint_upload_limit(client, monkeypatch):
+    from app import app
+
+    monkeypatch.setitem(app.config['UPLOAD_LIMITS'], 'extract_docx_only', 100)
+    response = client.post('/extract/docx', data=upload(b'x' * 500, 'big.docx'))
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "Upload too large", "max_bytes": 100}
+    # Other endpoints keep their own limit
+    assert client.post('/extract', data=upload(b'x' * 500, 'big.txt')).status_code == 200
@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+
+from conftest import upload
+from xml_extraction import iter_xml_events, iter_xml_text, parse_element_filters
+
+FEED = b"""<?xml version="1.0"?>
+<!-- comment -->
+<rss xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>Feed</title>
+<item><title>First</title><dc:creator>Ada</dc:creator><description><![CDATA[<b>raw</b> text]]></description></item>
+<item><title>Second &amp; last</title>tail</item>
+</channel></rss>"""
+
+
+def lines(filters=None, chunk=FEED):
+    return list(iter_xml_text(io.BytesIO(chunk), parse_element_filters(filters)))
+
+
+def test_every_text_node_in_order():
+    assert lines() == ["Feed", "First", "Ada", "<b>raw</b> text", "Second & last", "tail"]
+
+
+@pytest.mark.parametrize('filters, expected', [
+    ('title', ["Feed", "First", "Second & last"]),
+    ('//title', ["Feed", "First", "Second & last"]),
+    ('item/title', ["First", "Second & last"]),
+    ('/rss/channel/title', ["Feed"]),
+    ('dc:creator, description', ["Ada", "<b>raw</b> text"]),
+    ('item', ["First Ada <b>raw</b> text", "Second & last tail"]),
+    ('channel/*/creator', ["Ada"]),
+])
+def test_element_filters(filters, expected):
+    assert lines(filters) == expected
+
+
+@pytest.mark.parametrize('expression', ['item[@id]', 'item/@id', 'text()', 'a//b'])
+def test_unsupported_filters(expression):
+    with pytest.raises(ValueError, match="Unsupported element filter"):
+        parse_element_filters(expression)
+
+
+def test_malformed_xml_is_an_error_event():
+    events = list(iter_xml_events(io.BytesIO(b"<a><b>text</a>"), 'bad.xml'))
+    assert events[0]['event'] == 'start' and events[-1]['event'] == 'error'
+
+
+def test_extract_xml(client):
+    result = client.post('/extract', data=upload(FEED, 'feed.xml', mode='raw', xml_elements='item/title')).get_json()
+    assert result['full_text'] == "First\nSecond & last"
+    assert result['xml_stats'] == {"lines": 2, "xml_elements": ["item/title"]}
+
+
+def test_stream_xml(client):
+    response = client.post('/extract', data=upload(FEED, 'feed.xml', stream='ndjson', xml_elements='title'))
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [event['event'] for event in events] == ['start', 'text', 'end']
+    assert events[1]['text'] == "Feed\nFirst\nSecond & last"
+
+
+@pytest.mark.parametrize('form', [{}, {'stream': 'ndjson'}, {'format': 'csv'}])
+def test_invalid_filter_is_rejected_before_extraction(client, result_cache, form):
+    response = client.post('/extract', data=upload(FEED, 'feed.xml', xml_elements='item[@id]', **form))
+    assert response.status_code == 400
+    assert "Unsupported element filter 'item[@id]'" in response.get_json()['error']
+    assert not result_cache._entries
+
+
+@pytest.mark.parametrize('path', ['/extract/batch', '/jobs'])
+def test_invalid_filter_is_rejected_by_batches_and_jobs(client, path):
+    field = 'files' if path == '/extract/batch' else 'file'
+    response = client.post(path, data={field: (io.BytesIO(FEED), 'feed.xml'), 'xml_elements': 'item[@id]'})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('form', [{}, {'stream': 'ndjson'}])
+def test_asgi_rejects_invalid_filter(asgi_client, form):
+    response = asgi_client.post('/extract', files={'file': ('feed.xml', FEED)},
+                                data={'xml_elements': 'item[@id]', **form})
+    assert response.status_code == 400
+    assert "Unsupported element filter" in response.json()['error']
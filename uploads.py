@@ -0,0 +1,174 @@
+import io
+import os
+import mmap
+import shutil
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+from flask import Request, current_app
+from werkzeug.utils import secure_filename
+
+
+def default_spool_dir():
+    """tmpfs (/dev/shm) when available, else the system temp directory"""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+class _HashingWrites:
+    """Mixin updating a SHA-256 with every chunk written, so the hash is ready when the upload is"""
+
+    def write(self, data):
+        self.digest.update(data)
+        return super().write(data)
+
+    @property
+    def sha256(self):
+        return self.digest.hexdigest()
+
+
+class HashingBuffer(_HashingWrites, io.BytesIO):
+    """In-memory upload buffer"""
+
+    def __init__(self):
+        super().__init__()
+        self.digest = hashlib.sha256()
+
+
+class SpoolFile(_HashingWrites, io.BufferedRandom):
+    """Uniquely named temp file, deleted when closed"""
+
+    def __init__(self, directory, filename=None):
+        suffix = f"_{secure_filename(filename)}" if filename else ''
+        fd, path = tempfile.mkstemp(dir=directory, prefix='upload_', suffix=suffix)
+        os.close(fd)
+        super().__init__(io.FileIO(path, 'r+b'))
+        self.digest = hashlib.sha256()
+
+    def close(self):
+        if self.closed:
+            return
+        path = self.name
+        try:
+            super().close()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def spool_file(directory, filename=None):
+    return SpoolFile(directory, filename)
+
+
+class SpoolingRequest(Request):
+    """Keeps small uploads in memory and writes larger ones straight to a named temp file
+
+    Werkzeug's multipart parser streams each file part into the object
+    returned here chunk by chunk, so a large upload is written once, to a
+    unique file in UPLOAD_SPOOL_DIR that is deleted when the request closes
+    its files, and its SHA-256 is computed on the way.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        if total_content_length is not None and total_content_length <= config['UPLOAD_MEMORY_LIMIT']:
+            return HashingBuffer()
+        return spool_file(config['UPLOAD_SPOOL_DIR'], filename)
+
+
+def upload_source(file):
+    """What extractors read for a FileStorage: its path if spooled, else the buffer itself"""
+    stream = file.stream
+    if isinstance(getattr(stream, 'name', None), str):
+        stream.flush()
+        return stream.name
+    stream.seek(0)
+    return stream
+
+
+def upload_hash(file):
+    """SHA-256 computed while the upload was received, or None"""
+    return getattr(file.stream, 'sha256', None)
+
+
+def source_size(source):
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer().nbytes
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+class MappedFile(io.RawIOBase):
+    """Read-only raw file over an mmap: the OS pages the file in as it is read"""
+
+    def __init__(self, mapping):
+        self._mapping = mapping
+        self._view = memoryview(mapping)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+            self._mapping.close()
+        super().close()
+
+
+@contextmanager
+def open_source(source):
+    """Binary file object for a path (memory-mapped) or an in-memory buffer (not closed)"""
+    if not isinstance(source, str):
+        source.seek(0)
+        yield source
+        return
+
+    with open(source, 'rb') as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            yield f
+            return
+        with io.BufferedReader(MappedFile(mapping)) as mapped:
+            yield mapped
+
+
+@contextmanager
+def source_path(source, directory=None):
+    """A filesystem path for tools that only take paths; buffers are written out once"""
+    if isinstance(source, str):
+        yield source
+        return
+    with spool_file(directory or default_spool_dir()) as f:
+        source.seek(0)
+        shutil.copyfileobj(source, f)
+        f.flush()
+        yield f.name
@@ -0,0 +1,182 @@
+import re
+import time
+from xml.etree import ElementTree
+
+from uploads import open_source, source_size
+
+# One step of an element filter: a name (namespace prefix optional) or *
+STEP = re.compile(r'^(?:[\w.\-]+:)?(?:[\w.\-]+|\*)$')
+
+# Stream events carry the text in chunks of about this many characters
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+def local_name(tag):
+    """Element name without its {namespace}"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_element_filters(value):
+    """[(expression, anchored, steps)] from a comma-separated xml_elements option
+
+    Each expression is an XPath-style element path: "title" matches title
+    elements anywhere (as does "//title"), "item/title" only those directly
+    under an item and "/rss/channel/item" that exact path from the root.
+    "*" matches any one element. Names are compared without namespaces, so
+    "dc:creator" and "creator" are the same filter. Predicates, attributes
+    and functions are not supported and raise ValueError.
+    """
+    filters = []
+    for expression in (value or '').split(','):
+        expression = expression.strip()
+        if not expression:
+            continue
+        anchored = expression.startswith('/') and not expression.startswith('//')
+        steps = expression.lstrip('/').split('/')
+        if not all(STEP.match(step) for step in steps):
+            raise ValueError(f"Unsupported element filter '{expression}': use name, parent/name or /root/.../name")
+        filters.append((expression, anchored, tuple(step.rsplit(':', 1)[-1] for step in steps)))
+    return filters
+
+
+def _matches(filters, path):
+    for _, anchored, steps in filters:
+        if len(steps) > len(path) or (anchored and len(steps) != len(path)):
+            continue
+        if all(step in ('*', name) for step, name in zip(steps, path[-len(steps):])):
+            return True
+    return False
+
+
+def _normalized(text):
+    return ' '.join(text.split()) if text else ''
+
+
+def iter_xml_text(stream, filters=()):
+    """Yield the text of an XML document line by line, as it is parsed
+
+    Without filters every non-blank text node is a line, in document order.
+    With filters (from parse_element_filters) each matching element is one
+    line holding all the text inside it, and everything else is skipped.
+    Elements are dropped from the tree once read, so memory stays flat on
+    multi-GB files. CDATA is text like any other, comments and processing
+    instructions are ignored and entities are expanded by the parser (never
+    fetched from outside the document).
+    """
+    path = []
+    parents = []
+    matched = None
+    # Cheap first test before matching the whole path
+    last_steps = {steps[-1] for _, _, steps in filters}
+    # Element whose tail text is known only once the parser moves past it
+    pending = None
+
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        if pending is not None:
+            tail = _normalized(pending.tail)
+            if tail:
+                yield tail
+            parents[-1].remove(pending)
+            pending = None
+
+        if event == 'start':
+            if filters:
+                name = local_name(element.tag)
+                path.append(name)
+                if matched is None and (name in last_steps or '*' in last_steps) and _matches(filters, path):
+                    matched = element
+            elif parents and parents[-1].text is not None:
+                # Text before the parent's first child
+                text = _normalized(parents[-1].text)
+                parents[-1].text = None
+                if text:
+                    yield text
+            parents.append(element)
+            continue
+
+        parents.pop()
+        if filters:
+            path.pop()
+            if element is matched:
+                matched = None
+                text = _normalized(' '.join(element.itertext()))
+                if text:
+                    yield text
+            if matched is None and parents:
+                parents[-1].remove(element)
+            continue
+
+        text = _normalized(element.text)
+        if text:
+            yield text
+        if parents:
+            pending = element
+
+
+def _batches(lines, size):
+    """Lists of consecutive lines holding about size characters each"""
+    batch = []
+    batch_chars = 0
+    for line in lines:
+        batch.append(line)
+        batch_chars += len(line) + 1
+        if batch_chars >= size:
+            yield batch
+            batch = []
+            batch_chars = 0
+    if batch:
+        yield batch
+
+
+def iter_xml_events(source, filename, filters=()):
+    """Yield XML extraction events as the document is parsed
+
+    Like iter_pdf_pages: one "start", then "text" events carrying about
+    STREAM_CHUNK_CHARS of lines each, then "end" (or "error"). Nothing is
+    kept once sent, so memory stays flat however large the document is.
+    """
+    start = time.perf_counter()
+
+    try:
+        yield {
+            "event": "start",
+            "filename": filename,
+            "file_size_bytes": source_size(source),
+            "xml_elements": [expression for expression, _, _ in filters]
+        }
+
+        chunks = 0
+        lines = 0
+        total_words = 0
+        total_chars = 0
+
+        with open_source(source) as f:
+            for batch in _batches(iter_xml_text(f, filters), STREAM_CHUNK_CHARS):
+                text = '\n'.join(batch)
+                word_count = len(text.split())
+                chunks += 1
+                lines += len(batch)
+                total_words += word_count
+                total_chars += len(text)
+
+                yield {
+                    "event": "text",
+                    "chunk": chunks,
+                    "text": text,
+                    "lines": len(batch),
+                    "word_count": word_count,
+                    "character_count": len(text)
+                }
+
+        yield {
+            "event": "end",
+            "filename": filename,
+            "chunks": chunks,
+            "lines": lines,
+            "word_count": total_words,
+            "character_count": total_chars,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+
+    except Exception as e:
+        yield {"event": "error", "filename": filename, "error": f"XML processing failed: {str(e)}"}